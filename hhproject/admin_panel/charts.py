@@ -0,0 +1,189 @@
+import hashlib
+import io
+import json
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class ChartRenderer:
+    """
+    Графики статистики для экспорта. Два способа отрисовки:
+    - matplotlib: PNG/SVG на одной заранее созданной фигуре с холстом Agg
+      на процесс (без pyplot и создания фигуры на каждый график), готовые
+      байты кэшируются по хэшу входных данных;
+    - reportlab: векторные графики reportlab.graphics, которые строятся
+      сразу в PDF без растеризации.
+    Способ по умолчанию задается настройкой STATISTICS_CHART_BACKEND.
+    """
+
+    CACHE_PREFIX = 'statistics_chart'
+    DPI = 150
+    SIZES = {
+        'pie': (8, 6),
+        'bar': (10, 6),
+        'line': (10, 6),
+    }
+
+    _figure = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(chart_type, series, fmt, options):
+        payload = json.dumps([chart_type, series, fmt, options, ChartRenderer.DPI], sort_keys=True, ensure_ascii=False)
+        return f'{ChartRenderer.CACHE_PREFIX}:{hashlib.sha1(payload.encode()).hexdigest()}'
+
+    @staticmethod
+    def _get_figure():
+        """Общая фигура процесса, создается при первом графике"""
+        if ChartRenderer._figure is None:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            figure = Figure()
+            FigureCanvasAgg(figure)
+            ChartRenderer._figure = figure
+        return ChartRenderer._figure
+
+    @staticmethod
+    def _draw(axes, chart_type, series, options):
+        labels, data = series['labels'], series['data']
+        if chart_type == 'pie':
+            axes.pie(data, labels=labels, colors=series.get('colors'), autopct='%1.1f%%', startangle=90)
+            axes.axis('equal')
+        elif chart_type == 'bar':
+            bars = axes.bar(labels, data, color=series.get('colors'))
+            axes.tick_params(axis='x', labelrotation=45)
+            for label in axes.get_xticklabels():
+                label.set_horizontalalignment('right')
+            for bar in bars:
+                height = bar.get_height()
+                axes.text(bar.get_x() + bar.get_width() / 2., height, f'{int(height)}', ha='center', va='bottom')
+        elif chart_type == 'line':
+            axes.plot(labels, data, marker='o', linewidth=2, markersize=6)
+            axes.grid(True, alpha=0.3)
+            for label, value in zip(labels, data):
+                axes.annotate(str(value), (label, value), textcoords="offset points", xytext=(0, 10), ha='center')
+        else:
+            raise ValueError(f'Неизвестный тип графика: {chart_type}')
+
+        axes.set_title(options.get('title', ''), fontsize=14, fontweight='bold')
+        if options.get('xlabel'):
+            axes.set_xlabel(options['xlabel'])
+        if options.get('ylabel'):
+            axes.set_ylabel(options['ylabel'])
+
+    @staticmethod
+    def _render(chart_type, series, fmt, options):
+        with ChartRenderer._lock:
+            return ChartRenderer._render_locked(chart_type, series, fmt, options)
+
+    @staticmethod
+    def _render_locked(chart_type, series, fmt, options):
+        figure = ChartRenderer._get_figure()
+        figure.set_size_inches(*ChartRenderer.SIZES[chart_type])
+        try:
+            ChartRenderer._draw(figure.add_subplot(), chart_type, series, options)
+            if chart_type != 'pie':
+                figure.tight_layout()
+            buffer = io.BytesIO()
+            figure.savefig(buffer, format=fmt, dpi=ChartRenderer.DPI, bbox_inches='tight')
+            return buffer.getvalue()
+        finally:
+            figure.clear()
+
+    @staticmethod
+    def render(chart_type, series, fmt='png', **options):
+        """
+        Байты графика (png или svg). series - {'labels', 'data', 'colors'},
+        options - подписи (title, xlabel, ylabel). Возвращает None, если
+        график построить нельзя (например, все значения круговой диаграммы
+        нулевые).
+        """
+        if chart_type == 'pie' and not any(series['data']):
+            return None
+        key = ChartRenderer.cache_key(chart_type, series, fmt, options)
+        content = cache.get(key)
+        if content is None:
+            try:
+                content = ChartRenderer._render(chart_type, series, fmt, options)
+            except Exception as e:
+                print(f"Ошибка при создании графика «{options.get('title', chart_type)}»: {e}")
+                return None
+            cache.set(key, content, settings.STATISTICS_CHART_CACHE_TIMEOUT)
+        return content
+
+    @staticmethod
+    def drawing(chart_type, series, width, height, font_name='Helvetica', **options):
+        """Векторный график reportlab (Drawing) того же вида"""
+        from reportlab.graphics.charts.barcharts import VerticalBarChart
+        from reportlab.graphics.charts.linecharts import HorizontalLineChart
+        from reportlab.graphics.charts.piecharts import Pie
+        from reportlab.graphics.shapes import Drawing, String
+        from reportlab.graphics.widgets.markers import makeMarker
+        from reportlab.lib import colors
+
+        labels, data = list(series['labels']), list(series['data'])
+        if not data or (chart_type == 'pie' and not any(data)):
+            return None
+
+        drawing = Drawing(width, height)
+        title_height = 24
+        plot_height = height - title_height - 40
+        drawing.add(String(
+            width / 2, height - 16, options.get('title', ''),
+            fontName=font_name, fontSize=12, textAnchor='middle'
+        ))
+
+        if chart_type == 'pie':
+            chart = Pie()
+            size = min(width, plot_height) * 0.7
+            chart.x, chart.y = (width - size) / 2, 30
+            chart.width = chart.height = size
+            chart.data = data
+            total = sum(data)
+            chart.labels = [f'{label} ({value / total * 100:.1f}%)' for label, value in zip(labels, data)]
+            chart.slices.fontName = font_name
+            chart.slices.strokeColor = colors.white
+            for index, color in enumerate(series.get('colors') or []):
+                chart.slices[index].fillColor = colors.HexColor(color)
+        else:
+            chart = VerticalBarChart() if chart_type == 'bar' else HorizontalLineChart()
+            chart.x, chart.y = 40, 50
+            chart.width, chart.height = width - 60, plot_height - 20
+            chart.data = [data]
+            chart.categoryAxis.categoryNames = [str(label) for label in labels]
+            chart.categoryAxis.labels.fontName = font_name
+            chart.valueAxis.labels.fontName = font_name
+            chart.valueAxis.valueMin = 0
+            if chart_type == 'bar':
+                chart.categoryAxis.labels.angle = 30
+                chart.categoryAxis.labels.boxAnchor = 'ne'
+                for index, color in enumerate(series.get('colors') or []):
+                    chart.bars[(0, index)].fillColor = colors.HexColor(color)
+                chart.barLabelFormat = '%d'
+                chart.barLabels.fontName = font_name
+                chart.barLabels.nudge = 7
+            else:
+                chart.lines[0].strokeWidth = 2
+                chart.lines[0].symbol = makeMarker('FilledCircle')
+                chart.lines[0].strokeColor = colors.HexColor('#3b82f6')
+            if len(set(data)) == 1:
+                chart.valueAxis.valueMax = max(data) + 1
+        drawing.add(chart)
+        return drawing
+
+    @staticmethod
+    def flowable(chart_type, series, width, height, backend=None, font_name='Helvetica', **options):
+        """Элемент PDF-документа с графиком выбранным способом или None"""
+        backend = backend or settings.STATISTICS_CHART_BACKEND
+        if backend == 'reportlab':
+            return ChartRenderer.drawing(chart_type, series, width, height, font_name, **options)
+
+        from reportlab.platypus import Image
+
+        content = ChartRenderer.render(chart_type, series, 'png', **options)
+        if content is None:
+            return None
+        return Image(io.BytesIO(content), width=width, height=height)
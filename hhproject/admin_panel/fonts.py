@@ -0,0 +1,103 @@
+import importlib.util
+import os
+import threading
+
+
+def _matplotlib_font(filename):
+    """Путь к шрифту DejaVu из поставки matplotlib (без импорта matplotlib)"""
+    spec = importlib.util.find_spec('matplotlib')
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    return os.path.join(spec.submodule_search_locations[0], 'mpl-data', 'fonts', 'ttf', filename)
+
+
+class PdfFontRegistry:
+    """
+    Шрифты с кириллицей для PDF-отчетов. Семейства перебираются по порядку
+    один раз на процесс: первое, у которого нашлись обычное и полужирное
+    начертания, регистрируется в reportlab и используется всеми следующими
+    экспортами без поиска файлов и разбора TTF. Если ни одно не нашлось,
+    используются встроенные Times-Roman/Times-Bold (без кириллицы).
+    """
+
+    # Семейство: (имя, [пути к обычному начертанию], [пути к полужирному])
+    FAMILIES = [
+        ('TimesNewRoman', [
+            'times.ttf',
+            'Times New Roman.ttf',
+            '/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf',
+            '/Library/Fonts/Times New Roman.ttf',
+        ], [
+            'timesbd.ttf',
+            'Times New Roman Bold.ttf',
+            '/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman_Bold.ttf',
+            '/Library/Fonts/Times New Roman Bold.ttf',
+        ]),
+        ('DejaVuSerif', [
+            '/usr/share/fonts/truetype/dejavu/DejaVuSerif.ttf',
+            lambda: _matplotlib_font('DejaVuSerif.ttf'),
+        ], [
+            '/usr/share/fonts/truetype/dejavu/DejaVuSerif-Bold.ttf',
+            lambda: _matplotlib_font('DejaVuSerif-Bold.ttf'),
+        ]),
+        ('DejaVuSans', [
+            '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+            lambda: _matplotlib_font('DejaVuSans.ttf'),
+        ], [
+            '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
+            lambda: _matplotlib_font('DejaVuSans-Bold.ttf'),
+        ]),
+    ]
+    BUILTIN = ('Times-Roman', 'Times-Bold')
+
+    _fonts = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _load(name, candidates):
+        """Первый загружаемый TTF из списка путей или None"""
+        from reportlab.pdfbase.ttfonts import TTFont
+
+        for candidate in candidates:
+            path = candidate() if callable(candidate) else candidate
+            if not path:
+                continue
+            try:
+                return TTFont(name, path)
+            except Exception:
+                continue
+        return None
+
+    @staticmethod
+    def _resolve():
+        from reportlab.lib.fonts import addMapping
+        from reportlab.pdfbase import pdfmetrics
+
+        for family, regular_paths, bold_paths in PdfFontRegistry.FAMILIES:
+            bold_name = f'{family}-Bold'
+            regular = PdfFontRegistry._load(family, regular_paths)
+            bold = regular and PdfFontRegistry._load(bold_name, bold_paths)
+            if not bold:
+                continue
+            pdfmetrics.registerFont(regular)
+            pdfmetrics.registerFont(bold)
+            addMapping(family, 0, 0, family)
+            addMapping(family, 1, 0, bold_name)
+            return family, bold_name
+        print("❌ [PDF] Не найдены шрифты с кириллицей, используется Times-Roman")
+        return PdfFontRegistry.BUILTIN
+
+    @staticmethod
+    def fonts():
+        """(обычный, полужирный) - имена зарегистрированных шрифтов"""
+        if PdfFontRegistry._fonts is None:
+            with PdfFontRegistry._lock:
+                if PdfFontRegistry._fonts is None:
+                    PdfFontRegistry._fonts = PdfFontRegistry._resolve()
+        return PdfFontRegistry._fonts
+
+    @staticmethod
+    def reset():
+        """Сброс выбора (для тестов и смены шрифтов без перезапуска)"""
+        with PdfFontRegistry._lock:
+            PdfFontRegistry._fonts = None
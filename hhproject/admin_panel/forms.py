@@ -15,9 +15,9 @@ class CompanyModerationForm(forms.ModelForm):
 class BackupUploadForm(forms.Form):
     backup_file = forms.FileField(
         label='Файл бэкапа',
-        help_text='Поддерживаемые форматы: .zip, .json',
+        help_text='Поддерживаемые форматы: .zip, .jsonl.gz, .json',
         widget=forms.FileInput(attrs={
-            'accept': '.zip,.json',
+            'accept': '.zip,.gz,.json',
             'class': 'file-input'
         })
     )
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from admin_panel.statistics_export import StatisticsExportService
+
+
+class Command(BaseCommand):
+    help = 'Формирует файлы экспорта статистики из очереди statistics_exports'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5, help='Заданий в одной пачке')
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно, опрашивая очередь')
+        parser.add_argument('--interval', type=int, default=2, help='Пауза между опросами пустой очереди, сек.')
+
+    def handle(self, *args, **options):
+        total = 0
+        purged = StatisticsExportService.purge_expired()
+        while True:
+            processed = StatisticsExportService.process_batch(options['batch_size'])
+            total += processed
+            if processed:
+                continue
+            if not options['loop']:
+                break
+            purged += StatisticsExportService.purge_expired()
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Выполнено заданий экспорта: {total}, удалено старых: {purged}'))
@@ -1,10 +1,14 @@
+import gzip
 import os
 import zipfile
 import json
 from datetime import datetime
-from django.db import connection
+from django.db import connection, transaction
 from django.conf import settings
 from django.core import serializers
+from django.core.cache import cache
+from django.core.management.color import no_style
+from django.db.models.constants import OnConflict
 from pathlib import Path
 import shutil
 import tempfile
@@ -13,29 +17,35 @@ import django
 from io import BytesIO
 import time
 
+from home.rollups import StatisticsRollup
+
 class DjangoBackupManager:
+    DATABASE_BACKUP_SUFFIX = '.jsonl.gz'
+    DATABASE_ARCHIVE_NAME = 'database.jsonl.gz'
+
     def __init__(self):
         self.backup_dir = Path(settings.MEDIA_ROOT) / 'backups'
         self.backup_dir.mkdir(parents=True, exist_ok=True)
         
-        # Замените 'yourapp' на имя вашего приложения!
+        # Модели в порядке зависимостей: связанные объекты восстанавливаются раньше
         self.models_to_backup = [
-            'auth.User',
-            'auth.Group', 
             'auth.Permission',
-            'yourapp.Role',
-            'yourapp.Company',
-            'yourapp.Applicant',
-            'yourapp.Employee',
-            'yourapp.WorkConditions',
-            'yourapp.StatusVacancies',
-            'yourapp.StatusResponse',
-            'yourapp.Vacancy',
-            'yourapp.Complaint',
-            'yourapp.Response',
-            'yourapp.Favorites',
-            'yourapp.AdminLog',
-            'yourapp.Backup',
+            'auth.Group',
+            'home.Role',
+            'home.User',
+            'home.Company',
+            'home.Applicant',
+            'home.Employee',
+            'home.WorkConditions',
+            'home.StatusVacancies',
+            'home.StatusResponse',
+            'home.Vacancy',
+            'home.Complaint',
+            'home.Response',
+            'home.Favorites',
+            'home.ActionType',
+            'home.AdminLog',
+            'home.Backup',
         ]
         
         # Для отслеживания прогресса
@@ -69,59 +79,66 @@ class DjangoBackupManager:
             self._update_progress(f"Ошибка создания бэкапа: {str(e)}")
             return {'success': False, 'error': str(e)}
 
+    def _iterate_model(self, model, counter):
+        """Объекты модели пачками через iterator() со счетчиком"""
+        for obj in model._default_manager.order_by('pk').iterator(chunk_size=settings.BACKUP_CHUNK_SIZE):
+            counter[0] += 1
+            yield obj
+
     def _create_database_backup(self, base_name, user):
-        """Создание бэкапа базы данных через Django serializers"""
-        filename = f"{base_name}.json"
+        """
+        Потоковый бэкап базы данных: JSON Lines в gzip. Первая строка -
+        метаданные, далее по одному объекту на строку. Объекты читаются
+        пачками и сразу пишутся в сжатый файл, поэтому память не зависит
+        от размера таблиц.
+        """
+        filename = f"{base_name}{self.DATABASE_BACKUP_SUFFIX}"
         filepath = self.backup_dir / filename
         
         self._update_progress("Начинаем бэкап базы данных...", 10)
         
         try:
-            backup_data = {}
-            total_models = len(self.models_to_backup)
-            
-            # Собираем данные из всех моделей
-            for i, model_path in enumerate(self.models_to_backup):
+            models = []
+            for model_path in self.models_to_backup:
                 try:
-                    app_label, model_name = model_path.split('.')
-                    model = apps.get_model(app_label, model_name)
-                    
-                    self._update_progress(f"Бэкап модели: {model_path}...", 10 + (i * 70 // total_models))
-                    
-                    # Сериализуем данные модели
-                    data = serializers.serialize('json', model.objects.all())
-                    backup_data[model_path] = json.loads(data)
-                    
-                    self._update_progress(f"Модель {model_path} завершена ({len(json.loads(data))} объектов)")
-                    
-                except Exception as e:
+                    models.append((model_path, apps.get_model(model_path)))
+                except LookupError as e:
                     print(f"Warning: Could not backup {model_path}: {e}")
                     self._update_progress(f"Предупреждение: не удалось создать бэкап {model_path}: {e}")
-                    continue
-            
-            self._update_progress("Сохраняем данные в файл...", 80)
             
-            # Сохраняем в файл
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump({
+            total_objects = 0
+            with gzip.open(filepath, 'wt', encoding='utf-8') as f:
+                f.write(json.dumps({
                     'metadata': {
                         'created_at': datetime.now().isoformat(),
                         'backup_type': 'database',
+                        'format': 'jsonl',
                         'django_version': django.get_version(),
-                        'models_backed_up': list(backup_data.keys())
-                    },
-                    'data': backup_data
-                }, f, ensure_ascii=False, indent=2)
+                        'models_backed_up': [model_path for model_path, _ in models]
+                    }
+                }, ensure_ascii=False) + '\n')
+                
+                for i, (model_path, model) in enumerate(models):
+                    self._update_progress(f"Бэкап модели: {model_path}...", 10 + (i * 80 // len(models)))
+                    
+                    counter = [0]
+                    serializers.serialize('jsonl', self._iterate_model(model, counter), stream=f)
+                    total_objects += counter[0]
+                    
+                    self._update_progress(f"Модель {model_path} завершена ({counter[0]} объектов)")
             
             file_size = filepath.stat().st_size
             
-            self._update_progress(f"Бэкап базы данных завершен! Размер: {self._format_file_size(file_size)}", 100)
+            self._update_progress(
+                f"Бэкап базы данных завершен! Объектов: {total_objects}, размер: {self._format_file_size(file_size)}", 100
+            )
             
             return {
                 'success': True,
                 'filepath': str(filepath),
                 'filename': filename,
                 'file_size': file_size,
+                'total_objects': total_objects,
                 'backup_type': 'database',
                 'method': 'django_serializer',
                 'created_at': datetime.now()
@@ -211,7 +228,8 @@ class DjangoBackupManager:
             with zipfile.ZipFile(filepath, 'w', zipfile.ZIP_DEFLATED) as zipf:
                 # Добавляем бэкап базы данных
                 self._update_progress("Добавляем бэкап базы данных в архив...", 60)
-                zipf.write(db_backup['filepath'], 'database.json')
+                # Файл уже сжат gzip, повторно не сжимаем
+                zipf.write(db_backup['filepath'], self.DATABASE_ARCHIVE_NAME, zipfile.ZIP_STORED)
                 
                 # Добавляем медиа файлы
                 self._update_progress("Добавляем медиа файлы в архив...", 70)
@@ -267,19 +285,18 @@ class DjangoBackupManager:
         self._update_progress("Начинаем восстановление из бэкапа...")
         
         try:
-            # Читаем все содержимое файла в память
-            file_content = backup_file.read()
             file_name = backup_file.name
             
-            self._update_progress(f"Файл прочитан: {file_name}, размер: {self._format_file_size(len(file_content))}")
-            
-            # Определяем тип бэкапа и восстанавливаем
+            # Бэкап читается из файла потоком, без загрузки целиком в память
             if file_name.endswith('.zip'):
-                result = self._restore_full_backup_from_memory(file_content, file_name, user)
+                result = self._restore_full_backup(backup_file, user)
+            elif file_name.endswith(self.DATABASE_BACKUP_SUFFIX):
+                with gzip.open(backup_file, 'rt', encoding='utf-8') as stream:
+                    result = self._restore_database_backup_from_stream(stream, user)
             elif file_name.endswith('.json'):
-                result = self._restore_database_backup_from_memory(file_content, file_name, user)
+                result = self._restore_database_backup_from_memory(backup_file.read(), file_name, user)
             else:
-                raise Exception("Unsupported backup format. Use .zip or .json")
+                raise Exception("Unsupported backup format. Use .zip, .jsonl.gz or .json")
             
             self._update_progress("Восстановление завершено успешно!")
             return result
@@ -288,95 +305,166 @@ class DjangoBackupManager:
             self._update_progress(f"Ошибка восстановления: {str(e)}")
             raise Exception(f"Restore failed: {str(e)}")
 
+    def _read_backup_metadata(self, stream):
+        """Метаданные из первой строки потокового бэкапа"""
+        header = json.loads(stream.readline() or '{}')
+        if 'metadata' not in header:
+            raise Exception("Invalid backup format: missing metadata line")
+        return header['metadata']
+
+    def _insert_objects(self, model, objects):
+        """
+        Вставка пачки объектов одной модели одним запросом. Вставка raw,
+        как при save() десериализатора: pre_save() полей не вызывается и
+        auto_now/auto_now_add сохраняют значения из бэкапа. Существующие
+        строки с тем же ключом обновляются.
+        """
+        meta = model._meta
+        fields = meta.local_concrete_fields
+        update_fields = [field for field in fields if not field.primary_key]
+        instances = [deserialized_obj.object for deserialized_obj in objects]
+        model._base_manager._insert(
+            instances,
+            fields,
+            raw=True,
+            on_conflict=OnConflict.UPDATE if update_fields else OnConflict.IGNORE,
+            update_fields=update_fields or None,
+            unique_fields=[meta.pk] if update_fields else None,
+        )
+        
+        # Связи многие-ко-многим пишутся напрямую в промежуточные таблицы
+        for field in meta.many_to_many:
+            restored = [obj for obj in objects if field.name in obj.m2m_data]
+            if not restored:
+                continue
+            through = field.remote_field.through
+            source = through._meta.get_field(field.m2m_field_name()).attname
+            target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+            through._base_manager.filter(**{f'{source}__in': [obj.object.pk for obj in restored]}).delete()
+            through._base_manager.bulk_create([
+                through(**{source: obj.object.pk, target: value})
+                for obj in restored
+                for value in obj.m2m_data[field.name]
+            ], batch_size=settings.BACKUP_CHUNK_SIZE, ignore_conflicts=True)
+
+    def _restore_objects(self, deserialized_objects):
+        """
+        Восстановление потока десериализованных объектов: пачки по
+        BACKUP_CHUNK_SIZE объектов одной модели вставляются через
+        bulk_create в порядке бэкапа (порядок зависимостей) в одной
+        транзакции с отложенной проверкой внешних ключей. При любой ошибке
+        транзакция откатывается целиком. Возвращает {модель: число объектов}.
+        """
+        counts = {}
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET CONSTRAINTS ALL DEFERRED')
+            
+            model, batch = None, []
+            for deserialized_obj in deserialized_objects:
+                obj_model = type(deserialized_obj.object)
+                if batch and (obj_model is not model or len(batch) >= settings.BACKUP_CHUNK_SIZE):
+                    self._insert_objects(model, batch)
+                    batch = []
+                if obj_model is not model:
+                    model = obj_model
+                    self._update_progress(f"Восстанавливаем модель: {model._meta.label}...")
+                batch.append(deserialized_obj)
+                counts[model] = counts.get(model, 0) + 1
+            if batch:
+                self._insert_objects(model, batch)
+            
+            # Объекты вставлены с явными ключами, последовательности сдвигаем за максимум
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), list(counts)):
+                    cursor.execute(sql)
+        
+        # bulk_create не отправляет сигналы, поэтому производные данные пересчитываются целиком.
+        # Кэш (счетчики, страницы вакансий, буфер просмотров) относится к прежней базе
+        # и очищается полностью - восстановление выполняется редко
+        StatisticsRollup.rebuild()
+        cache.clear()
+        return {model._meta.label: count for model, count in counts.items()}
+
+    def _restore_result(self, counts):
+        success_message = (
+            f'База данных успешно восстановлена: {len(counts)} моделей, {sum(counts.values())} объектов'
+        )
+        self._update_progress(success_message, 100)
+        return {
+            'success': True,
+            'message': success_message
+        }
+
+    def _restore_database_backup_from_stream(self, stream, user):
+        """Восстановление базы данных из JSON Lines (текстовый поток)"""
+        self._update_progress("Восстанавливаем базу данных из JSON Lines...")
+        
+        try:
+            self._read_backup_metadata(stream)
+            return self._restore_result(self._restore_objects(serializers.deserialize('jsonl', stream)))
+            
+        except Exception as e:
+            self._update_progress(f"Ошибка восстановления базы данных: {str(e)}")
+            raise Exception(f"Database restore failed: {str(e)}")
+
     def _restore_database_backup_from_memory(self, file_content, file_name, user):
-        """Восстановление базы данных из JSON в памяти"""
+        """Восстановление базы данных из JSON старого формата (один документ)"""
         self._update_progress("Восстанавливаем базу данных из JSON...")
         
         try:
-            # Декодируем JSON из памяти
             backup_data = json.loads(file_content.decode('utf-8'))
             
             if 'data' not in backup_data:
                 raise Exception("Invalid backup format: missing 'data' section")
             
-            restored_models = 0
-            total_objects = 0
-            total_models = len(backup_data['data'])
-            
-            # Восстанавливаем данные для каждой модели
-            for i, (model_path, objects_data) in enumerate(backup_data['data'].items()):
-                try:
-                    progress = 10 + (i * 80 // total_models)
-                    self._update_progress(f"Восстанавливаем модель: {model_path} ({len(objects_data)} объектов)...", progress)
-                    
-                    app_label, model_name = model_path.split('.')
-                    model = apps.get_model(app_label, model_name)
-                    
-                    # Восстанавливаем объекты
-                    for obj_data in objects_data:
-                        try:
-                            # Используем Django deserializer
-                            obj = serializers.deserialize('json', json.dumps([obj_data]))
-                            for deserialized_obj in obj:
-                                deserialized_obj.save()
-                            total_objects += 1
-                        except Exception as e:
-                            print(f"Warning: Could not restore object in {model_path}: {e}")
-                            continue
-                    
-                    restored_models += 1
-                    self._update_progress(f"Модель {model_path} восстановлена ({len(objects_data)} объектов)")
-                    
-                except Exception as e:
-                    print(f"Warning: Could not restore model {model_path}: {e}")
-                    self._update_progress(f"Предупреждение: не удалось восстановить модель {model_path}: {e}")
-                    continue
+            # Модели из списка бэкапа идут в порядке зависимостей, остальные - в конце
+            order = {model_path: i for i, model_path in enumerate(self.models_to_backup)}
+            model_paths = sorted(backup_data['data'], key=lambda model_path: order.get(model_path, len(order)))
             
-            success_message = f'База данных успешно восстановлена: {restored_models} моделей, {total_objects} объектов'
-            self._update_progress(success_message, 100)
+            def objects():
+                for model_path in model_paths:
+                    yield from serializers.deserialize('python', backup_data['data'][model_path])
             
-            return {
-                'success': True, 
-                'message': success_message
-            }
+            return self._restore_result(self._restore_objects(objects()))
             
         except Exception as e:
             self._update_progress(f"Ошибка восстановления базы данных: {str(e)}")
             raise Exception(f"Database restore failed: {str(e)}")
 
-    def _restore_full_backup_from_memory(self, file_content, file_name, user):
-        """Восстановление полного бэкапа из памяти"""
+    def _restore_full_backup(self, backup_file, user):
+        """Восстановление полного бэкапа: ZIP читается прямо из файла"""
         self._update_progress("Восстанавливаем полный бэкап...")
         
         try:
-            # Используем BytesIO для работы с ZIP в памяти
-            zip_buffer = BytesIO(file_content)
-            
-            with zipfile.ZipFile(zip_buffer, 'r') as zipf:
+            with zipfile.ZipFile(backup_file, 'r') as zipf:
                 self._update_progress("ZIP архив открыт, ищем файлы...")
                 
-                # Ищем файл базы данных
-                db_file_info = None
+                # Ищем файл базы данных (database.json - формат старых бэкапов)
+                db_file_name = None
                 media_files_count = 0
                 
                 for file_info in zipf.filelist:
-                    if file_info.filename == 'database.json':
-                        db_file_info = file_info
+                    if file_info.filename in (self.DATABASE_ARCHIVE_NAME, 'database.json'):
+                        db_file_name = file_info.filename
                     elif file_info.filename.startswith('media/') and not file_info.is_dir():
                         media_files_count += 1
                 
-                self._update_progress(f"Найдено: database.json и {media_files_count} медиа файлов")
+                self._update_progress(f"Найдено: {db_file_name} и {media_files_count} медиа файлов")
                 
-                if not db_file_info:
+                if not db_file_name:
                     return {'success': False, 'error': 'Database backup not found in full backup'}
                 
-                # Читаем базу данных из ZIP
-                with zipf.open('database.json') as db_file:
-                    db_content = db_file.read()
-                
                 # Восстанавливаем базу данных
                 self._update_progress("Восстанавливаем базу данных...", 30)
-                db_result = self._restore_database_backup_from_memory(db_content, 'database.json', user)
+                if db_file_name == self.DATABASE_ARCHIVE_NAME:
+                    with gzip.open(zipf.open(db_file_name), 'rt', encoding='utf-8') as stream:
+                        db_result = self._restore_database_backup_from_stream(stream, user)
+                else:
+                    with zipf.open(db_file_name) as db_file:
+                        db_content = db_file.read()
+                    db_result = self._restore_database_backup_from_memory(db_content, db_file_name, user)
                 if not db_result['success']:
                     return db_result
                 
@@ -512,6 +600,14 @@ class DjangoBackupManager:
     def validate_backup(self, backup_file):
         """Проверка целостности бэкапа"""
         try:
+            if backup_file.name.endswith(self.DATABASE_BACKUP_SUFFIX):
+                # Проверяем метаданные и распаковываем поток целиком, не храня его
+                with gzip.open(backup_file, 'rt', encoding='utf-8') as stream:
+                    self._read_backup_metadata(stream)
+                    for _ in iter(lambda: stream.read(1024 * 1024), ''):
+                        pass
+                return True
+            
             file_content = backup_file.read()
             
             if backup_file.name.endswith('.json'):
@@ -707,7 +803,8 @@ class DjangoBackupManager:
             
             with zipfile.ZipFile(filepath, 'w', zipfile.ZIP_DEFLATED) as zipf:
                 # Добавляем бэкап базы данных
-                zipf.write(db_backup['filepath'], 'database.json')
+                # Файл уже сжат gzip, повторно не сжимаем
+                zipf.write(db_backup['filepath'], self.DATABASE_ARCHIVE_NAME, zipfile.ZIP_STORED)
                 
                 # Добавляем медиа файлы
                 media_dir = Path(settings.MEDIA_ROOT)
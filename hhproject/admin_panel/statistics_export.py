@@ -0,0 +1,439 @@
+import io
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from home.models import StatisticsExport
+from .charts import ChartRenderer
+from .fonts import PdfFontRegistry
+from .statistics_service import StatisticsSnapshot
+
+
+# Размер графика в пунктах PDF (6 x 4 дюйма)
+CHART_WIDTH = 6 * 72
+CHART_HEIGHT = 4 * 72
+
+
+def create_user_distribution_chart(user_distribution, font_name='Helvetica'):
+    """Круговая диаграмма распределения пользователей по типам"""
+    return ChartRenderer.flowable(
+        'pie',
+        {key: user_distribution[key] for key in ('labels', 'data', 'colors')},
+        CHART_WIDTH, CHART_HEIGHT, font_name=font_name,
+        title='Распределение пользователей по типам',
+    )
+
+def create_company_status_chart(company_stats, font_name='Helvetica'):
+    """Круговая диаграмма статусов компаний"""
+    distribution = company_stats['status_distribution']
+    return ChartRenderer.flowable(
+        'pie',
+        {key: distribution[key] for key in ('labels', 'data', 'colors')},
+        CHART_WIDTH, CHART_HEIGHT, font_name=font_name,
+        title='Статусы компаний',
+    )
+
+def create_vacancy_categories_chart(vacancy_stats, font_name='Helvetica'):
+    """Столбчатая диаграмма категорий вакансий"""
+    category = vacancy_stats['category']
+    return ChartRenderer.flowable(
+        'bar',
+        {key: category[key] for key in ('labels', 'data', 'colors')},
+        CHART_WIDTH, CHART_HEIGHT, font_name=font_name,
+        title='Категории вакансий', xlabel='Категории', ylabel='Количество вакансий',
+    )
+
+def create_response_activity_chart(response_stats, font_name='Helvetica'):
+    """Линейный график активности откликов"""
+    days = response_stats['daily_activity']
+    return ChartRenderer.flowable(
+        'line',
+        {'labels': [day['date'] for day in days], 'data': [day['count'] for day in days]},
+        CHART_WIDTH, CHART_HEIGHT, font_name=font_name,
+        title='Активность откликов', xlabel='Дата', ylabel='Количество откликов',
+    )
+
+
+def build_statistics_pdf(start_date=None, end_date=None):
+    """PDF-отчет по статистике за период, возвращает содержимое файла"""
+    # reportlab нужен только воркеру экспорта, поэтому импортируется здесь,
+    # а не при загрузке модуля (см. check_import_time)
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    snapshot = StatisticsSnapshot.get(start_date, end_date)
+    main_stats = snapshot['main_stats']
+    user_distribution = snapshot['user_distribution']
+    vacancy_stats = snapshot['vacancy_stats']
+    company_stats = snapshot['company_stats']
+    response_stats = snapshot['response_stats']
+    
+    # Создаем PDF
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=30)
+    elements = []
+
+    # Шрифты с кириллицей регистрируются один раз на процесс
+    font_name, bold_font_name = PdfFontRegistry.fonts()
+
+    # Стили
+    styles = getSampleStyleSheet()
+
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontName=bold_font_name,
+        fontSize=16,
+        spaceAfter=30,
+        alignment=1
+    )
+
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontName=bold_font_name,
+        fontSize=12,
+        spaceAfter=12
+    )
+
+    normal_style = ParagraphStyle(
+        'CustomNormal',
+        parent=styles['Normal'],
+        fontName=font_name,
+        fontSize=10
+    )
+
+    # Заголовок
+    title = Paragraph("Статистика платформы трудоустройства", title_style)
+    elements.append(title)
+
+    period_info = f"Дата экспорта: {datetime.now().strftime('%d.%m.%Y %H:%M')}"
+    if start_date and end_date:
+        period_info += f" | Период: {start_date} - {end_date}"
+
+    elements.append(Paragraph(period_info, normal_style))
+    elements.append(Spacer(1, 20))
+
+    # Основная статистика
+    elements.append(Paragraph("Основная статистика", heading_style))
+
+    main_data = [
+        ['Показатель', 'Значение'],
+        ['Всего пользователей', str(main_stats['total_users'])],
+        ['Всего компаний', str(main_stats['total_companies'])],
+        ['Всего вакансий', str(main_stats['total_vacancies'])],
+        ['Всего откликов', str(main_stats['total_responses'])],
+        ['Активных компаний', str(main_stats['active_companies'])],
+    ]
+
+    # Добавляем информацию о периоде, если он указан
+    if not start_date or not end_date:
+        main_data.extend([
+            ['Новых пользователей (неделя)', str(main_stats['new_users_week'])],
+            ['Новых компаний (неделя)', str(main_stats['new_companies_week'])],
+            ['Новых вакансий (неделя)', str(main_stats['new_vacancies_week'])],
+        ])
+
+    main_table = Table(main_data, colWidths=[250, 100])
+    main_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), bold_font_name),
+        ('FONTNAME', (0, 1), (-1, -1), font_name),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    elements.append(main_table)
+    elements.append(Spacer(1, 20))
+
+    # Остальные графики и таблицы (аналогично вашему коду)
+    # График распределения пользователей
+    elements.append(Paragraph("Распределение пользователей по типам", heading_style))
+    user_chart = create_user_distribution_chart(user_distribution, font_name)
+    if user_chart:
+        elements.append(user_chart)
+    elements.append(Spacer(1, 10))
+
+    # Таблица распределения пользователей
+    user_data = [['Тип пользователя', 'Количество', 'Процент']]
+    for i, label in enumerate(user_distribution['labels']):
+        user_data.append([
+            label,
+            str(user_distribution['data'][i]),
+            f"{user_distribution['percentages'][i]}%"
+        ])
+
+    user_table = Table(user_data, colWidths=[200, 80, 80])
+    user_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), bold_font_name),
+        ('FONTNAME', (0, 1), (-1, -1), font_name),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    elements.append(user_table)
+    elements.append(Spacer(1, 20))
+
+    # График статусов компаний
+    elements.append(Paragraph("Статусы компаний", heading_style))
+    company_chart = create_company_status_chart(company_stats, font_name)
+    if company_chart:
+        elements.append(company_chart)
+    elements.append(Spacer(1, 10))
+
+    # Таблица статусов компаний
+    company_data = [['Статус', 'Количество', 'Процент']]
+    for i, label in enumerate(company_stats['status_distribution']['labels']):
+        company_data.append([
+            label,
+            str(company_stats['status_distribution']['data'][i]),
+            f"{company_stats['status_distribution']['percentages'][i]}%"
+        ])
+
+    company_table = Table(company_data, colWidths=[200, 80, 80])
+    company_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), bold_font_name),
+        ('FONTNAME', (0, 1), (-1, -1), font_name),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    elements.append(company_table)
+    elements.append(Spacer(1, 20))
+
+    # График категорий вакансий
+    elements.append(Paragraph("Категории вакансий", heading_style))
+    vacancy_chart = create_vacancy_categories_chart(vacancy_stats, font_name)
+    if vacancy_chart:
+        elements.append(vacancy_chart)
+    elements.append(Spacer(1, 10))
+
+    # Таблица категорий вакансий
+    vacancy_data = [['Категория', 'Количество']]
+    for i, label in enumerate(vacancy_stats['category']['labels']):
+        vacancy_data.append([
+            label,
+            str(vacancy_stats['category']['data'][i])
+        ])
+
+    vacancy_table = Table(vacancy_data, colWidths=[200, 80])
+    vacancy_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), bold_font_name),
+        ('FONTNAME', (0, 1), (-1, -1), font_name),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    elements.append(vacancy_table)
+    elements.append(Spacer(1, 20))
+
+    # График активности откликов
+    elements.append(Paragraph("Активность откликов", heading_style))
+    response_chart = create_response_activity_chart(response_stats, font_name)
+    if response_chart:
+        elements.append(response_chart)
+
+    # Собираем PDF
+    doc.build(elements)
+    
+    return buffer.getvalue()
+
+
+def statistics_rows(start_date=None, end_date=None):
+    """Строки табличного экспорта статистики за период (CSV/XLSX)"""
+    snapshot = StatisticsSnapshot.get(start_date, end_date)
+    main_stats = snapshot['main_stats']
+    user_distribution = snapshot['user_distribution']
+    vacancy_stats = snapshot['vacancy_stats']
+    company_stats = snapshot['company_stats']
+    response_stats = snapshot['response_stats']
+    complaint_stats = snapshot['complaint_stats']
+    
+    # Заголовок
+    yield ['Статистика платформы трудоустройства']
+    period_info = f"Дата экспорта: {datetime.now().strftime('%d.%m.%Y %H:%M')}"
+    if start_date and end_date:
+        period_info += f" | Период: {start_date} - {end_date}"
+    yield [period_info]
+    yield []
+
+    # Основная статистика
+    yield ['ОСНОВНАЯ СТАТИСТИКА']
+    yield ['Показатель', 'Значение']
+    yield ['Всего пользователей', main_stats['total_users']]
+    yield ['Всего компаний', main_stats['total_companies']]
+    yield ['Всего вакансий', main_stats['total_vacancies']]
+    yield ['Всего откликов', main_stats['total_responses']]
+    yield ['Активных компаний', main_stats['active_companies']]
+
+    if not start_date or not end_date:
+        yield ['Новых пользователей (неделя)', main_stats['new_users_week']]
+        yield ['Новых компаний (неделя)', main_stats['new_companies_week']]
+        yield ['Новых вакансий (неделя)', main_stats['new_vacancies_week']]
+
+    yield []
+
+    # Распределение пользователей
+    yield ['РАСПРЕДЕЛЕНИЕ ПОЛЬЗОВАТЕЛЕЙ ПО ТИПАМ']
+    yield ['Тип пользователя', 'Количество', 'Процент']
+    for i, label in enumerate(user_distribution['labels']):
+        yield [
+            label,
+            user_distribution['data'][i],
+            f"{user_distribution['percentages'][i]}%"
+        ]
+    yield []
+
+    # Статусы компаний
+    yield ['СТАТУСЫ КОМПАНИЙ']
+    yield ['Статус', 'Количество', 'Процент']
+    for i, label in enumerate(company_stats['status_distribution']['labels']):
+        yield [
+            label,
+            company_stats['status_distribution']['data'][i],
+            f"{company_stats['status_distribution']['percentages'][i]}%"
+        ]
+    yield []
+
+    # Категории вакансий
+    yield ['КАТЕГОРИИ ВАКАНСИЙ']
+    yield ['Категория', 'Количество']
+    for i, label in enumerate(vacancy_stats['category']['labels']):
+        yield [label, vacancy_stats['category']['data'][i]]
+    yield []
+
+    # Активность откликов
+    yield ['АКТИВНОСТЬ ОТКЛИКОВ']
+    yield ['Дата', 'Количество откликов']
+    for day in response_stats['daily_activity']:
+        yield [day['date'], day['count']]
+    yield []
+
+    # Типы жалоб
+    yield ['ТИПЫ ЖАЛОБ']
+    yield ['Тип жалобы', 'Количество']
+    for i, label in enumerate(complaint_stats['type_distribution']['labels']):
+        yield [label, complaint_stats['type_distribution']['data'][i]]
+
+
+class StatisticsExportService:
+    """
+    Экспорт статистики в фоне: представление ставит задание в очередь,
+    команда process_statistics_exports формирует файл в MEDIA_ROOT, а
+    страница опрашивает статус задания до появления ссылки на скачивание.
+    Задание за тот же период, созданное не раньше чем
+    STATISTICS_EXPORT_REUSE_TIMEOUT секунд назад, используется повторно.
+    Задание, которое выполняется дольше STATISTICS_EXPORT_RUNNING_TIMEOUT
+    (обработчик упал), помечается ошибкой и больше не переиспользуется;
+    задания и файлы старше STATISTICS_EXPORT_RETENTION удаляются.
+    """
+
+    BUILDERS = {
+        StatisticsExport.FORMAT_PDF: build_statistics_pdf,
+    }
+
+    @staticmethod
+    def request(export_format, start_date=None, end_date=None, user=None):
+        """Задание на экспорт за период: готовое или ожидающее, либо новое"""
+        if not (start_date and end_date):
+            start_date = end_date = None
+        now = timezone.now()
+        reuse_since = now - timedelta(seconds=settings.STATISTICS_EXPORT_REUSE_TIMEOUT)
+        running_since = now - timedelta(seconds=settings.STATISTICS_EXPORT_RUNNING_TIMEOUT)
+        job = StatisticsExport.objects.filter(
+            Q(status__in=[StatisticsExport.STATUS_PENDING, StatisticsExport.STATUS_DONE])
+            | Q(status=StatisticsExport.STATUS_RUNNING, started_at__gte=running_since),
+            export_format=export_format,
+            start_date=start_date,
+            end_date=end_date,
+            created_at__gte=reuse_since,
+        ).order_by('-created_at').first()
+        if job is None:
+            job = StatisticsExport.objects.create(
+                export_format=export_format,
+                start_date=start_date,
+                end_date=end_date,
+                requested_by=user,
+            )
+        return job
+
+    @staticmethod
+    def filename(job):
+        name = "statistics"
+        if job.start_date and job.end_date:
+            name += f"_{job.start_date}_to_{job.end_date}"
+        return f"{name}_{timezone.localtime(job.created_at).strftime('%Y%m%d_%H%M%S')}.{job.export_format}"
+
+    @staticmethod
+    def render(job):
+        """Формирование файла задания"""
+        start_date = job.start_date.isoformat() if job.start_date else None
+        end_date = job.end_date.isoformat() if job.end_date else None
+        try:
+            content = StatisticsExportService.BUILDERS[job.export_format](start_date, end_date)
+            job.file.save(StatisticsExportService.filename(job), ContentFile(content), save=False)
+            job.status = StatisticsExport.STATUS_DONE
+        except Exception as e:
+            print(f"❌ [EXPORT] Ошибка экспорта статистики #{job.pk}: {e}")
+            job.status = StatisticsExport.STATUS_FAILED
+            job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['file', 'status', 'error', 'finished_at'])
+
+    @staticmethod
+    def fail_stale():
+        """Задания, зависшие в статусе running, помечаются ошибкой"""
+        running_since = timezone.now() - timedelta(seconds=settings.STATISTICS_EXPORT_RUNNING_TIMEOUT)
+        return StatisticsExport.objects.filter(
+            status=StatisticsExport.STATUS_RUNNING, started_at__lt=running_since
+        ).update(
+            status=StatisticsExport.STATUS_FAILED,
+            error='Превышено время формирования экспорта',
+            finished_at=timezone.now(),
+        )
+
+    @staticmethod
+    def purge_expired():
+        """Удаление старых заданий вместе с файлами, возвращает число заданий"""
+        expired_before = timezone.now() - timedelta(seconds=settings.STATISTICS_EXPORT_RETENTION)
+        jobs = list(StatisticsExport.objects.filter(
+            created_at__lt=expired_before,
+            status__in=[StatisticsExport.STATUS_DONE, StatisticsExport.STATUS_FAILED],
+        ))
+        for job in jobs:
+            if job.file:
+                job.file.delete(save=False)
+        StatisticsExport.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+        return len(jobs)
+
+    @staticmethod
+    def process_batch(batch_size=5):
+        """Выполнение заданий из очереди, возвращает число выполненных"""
+        StatisticsExportService.fail_stale()
+        with transaction.atomic():
+            jobs = list(
+                StatisticsExport.objects.select_for_update(skip_locked=True)
+                .filter(status=StatisticsExport.STATUS_PENDING)
+                .order_by('created_at')[:batch_size]
+            )
+            StatisticsExport.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                status=StatisticsExport.STATUS_RUNNING, started_at=timezone.now()
+            )
+        for job in jobs:
+            StatisticsExportService.render(job)
+        return len(jobs)
@@ -1,106 +1,60 @@
-from django.db.models import Count, Q
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta, datetime
-from home.models import (
-    User, Company, Applicant, Vacancy, Response, 
-    Complaint, Favorites, StatusVacancies, StatusResponse
-)
-import io
-import csv
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg') 
-from django.http import HttpResponse
-from django.contrib.auth.decorators import login_required
-from django.contrib.admin.views.decorators import user_passes_test
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
+from home.models import User, Company, Applicant, Complaint, Favorites, DailyRollup
+from home.response_counts import ResponseStatusChoices
+from home.rollups import StatisticsRollup
 
 class StatisticsService:
     
     @staticmethod
     def get_main_statistics(start_date=None, end_date=None):
-        """Основная статистика с поддержкой периода"""
+        """Основная статистика с поддержкой периода (по дневным итогам, одним запросом)"""
         today = timezone.now().date()
         week_ago = today - timedelta(days=7)
         
-        # Базовые запросы
-        base_filters = {}
-        if start_date and end_date:
-            base_filters = {
-                'date_joined__date__range': [start_date, end_date]
-            }
-        
-        user_count = User.objects.filter(**base_filters).count()
-        
-        # Для компаний, вакансий и откликов используем соответствующие поля дат
-        company_filters = {}
-        vacancy_filters = {}
-        response_filters = {}
-        
-        if start_date and end_date:
-            company_filters = {'created_at__date__range': [start_date, end_date]}
-            vacancy_filters = {'created_date__date__range': [start_date, end_date]}
-            response_filters = {'response_date__date__range': [start_date, end_date]}
-        
-        company_count = Company.objects.filter(**company_filters).count()
-        vacancy_count = Vacancy.objects.filter(**vacancy_filters).count()
-        response_count = Response.objects.filter(**response_filters).count()
-        
-        # Статистика за неделю (всегда за последние 7 дней)
-        new_users_week = User.objects.filter(
-            date_joined__date__gte=week_ago
-        ).count()
-        new_companies_week = Company.objects.filter(
-            created_at__date__gte=week_ago
-        ).count()
-        new_vacancies_week = Vacancy.objects.filter(
-            created_date__date__gte=week_ago
-        ).count()
-        new_responses_week = Response.objects.filter(
-            response_date__date__gte=week_ago
-        ).count()
+        period = StatisticsRollup.period_filter(start_date, end_date)
+        week = Q(day__gte=week_ago)
+        total = StatisticsRollup.total
         
-        return {
-            'total_users': user_count,
-            'total_companies': company_count,
-            'total_applicants': Applicant.objects.count(),  # Всего
-            'total_vacancies': vacancy_count,
-            'total_responses': response_count,
-            'total_favorites': Favorites.objects.count(),  # Всего
-            'total_complaints': Complaint.objects.count(),  # Всего
+        stats = DailyRollup.objects.aggregate(
+            total_users=total('user', period),
+            total_companies=total('company', period),
+            total_vacancies=total('vacancy', period),
+            total_responses=total('response', period),
+            total_complaints=total('complaint'),  # Всего
             
-            'new_users_week': new_users_week,
-            'new_companies_week': new_companies_week,
-            'new_vacancies_week': new_vacancies_week,
-            'new_responses_week': new_responses_week,
+            new_users_week=total('user', week),
+            new_companies_week=total('company', week),
+            new_vacancies_week=total('vacancy', week),
+            new_responses_week=total('response', week),
             
-            'active_companies': Company.objects.filter(status='approved').count(),  # Всего
-            'pending_companies': Company.objects.filter(status='pending').count(),  # Всего
-            'rejected_companies': Company.objects.filter(status='rejected').count(),  # Всего
-        }
+            active_companies=total('company', Q(key='approved')),  # Всего
+            pending_companies=total('company', Q(key='pending')),  # Всего
+            rejected_companies=total('company', Q(key='rejected')),  # Всего
+        )
+        stats['total_applicants'] = Applicant.objects.count()  # Всего
+        stats['total_favorites'] = Favorites.objects.count()  # Всего
+        return stats
     
     @staticmethod
     def get_user_type_distribution(start_date=None, end_date=None):
         """Распределение пользователей по типам с поддержкой периода"""
-        base_filters = {}
-        if start_date and end_date:
-            base_filters = {'date_joined__date__range': [start_date, end_date]}
-        
-        distribution = User.objects.filter(**base_filters).values('user_type').annotate(
-            count=Count('id')
-        ).order_by('-count')
+        distribution = StatisticsRollup.distribution('user', start_date, end_date)
         
         colors = ['#3b82f6', '#f59e0b', '#10b981', '#ef4444', '#8b5cf6']
         
         labels = []
         data = []
-        for item in distribution:
-            labels.append(dict(User.USER_TYPE_CHOICES).get(item['user_type'], item['user_type']))
-            data.append(item['count'])
+        for user_type, count in distribution:
+            labels.append(dict(User.USER_TYPE_CHOICES).get(user_type, user_type))
+            data.append(count)
         
         total = sum(data)
         percentages = [round((count / total * 100), 1) for count in data] if total > 0 else []
@@ -116,21 +70,15 @@ class StatisticsService:
     @staticmethod
     def get_vacancy_statistics(start_date=None, end_date=None):
         """Статистика по вакансиям с поддержкой периода"""
-        base_filters = {}
-        if start_date and end_date:
-            base_filters = {'created_date__date__range': [start_date, end_date]}
-        
-        category_stats = Vacancy.objects.filter(**base_filters).values('category').annotate(
-            count=Count('id')
-        ).order_by('-count')
+        category_stats = StatisticsRollup.distribution('vacancy', start_date, end_date)
         
         category_colors = ['#3b82f6', '#f59e0b', '#10b981', '#8b5cf6', '#06b6d4', '#84cc16']
         
         category_labels = []
         category_data = []
-        for item in category_stats:
-            category_labels.append(item['category'])
-            category_data.append(item['count'])
+        for category, count in category_stats:
+            category_labels.append(category)
+            category_data.append(count)
         
         if not category_data:
             category_labels = ['IT', 'Маркетинг', 'Продажи', 'HR']
@@ -148,13 +96,7 @@ class StatisticsService:
     @staticmethod
     def get_company_statistics(start_date=None, end_date=None):
         """Статистика по компаниям с поддержкой периода"""
-        base_filters = {}
-        if start_date and end_date:
-            base_filters = {'created_at__date__range': [start_date, end_date]}
-        
-        status_stats = Company.objects.filter(**base_filters).values('status').annotate(
-            count=Count('id')
-        )
+        status_stats = StatisticsRollup.distribution('company', start_date, end_date)
         
         status_colors = {
             'approved': '#10b981',
@@ -165,11 +107,10 @@ class StatisticsService:
         labels = []
         data = []
         colors = []
-        for item in status_stats:
-            status_key = item['status']
+        for status_key, count in status_stats:
             label = dict(Company.STATUS_CHOICES).get(status_key, status_key)
             labels.append(label)
-            data.append(item['count'])
+            data.append(count)
             colors.append(status_colors.get(status_key, '#3b82f6'))
         
         total = sum(data)
@@ -188,48 +129,32 @@ class StatisticsService:
     @staticmethod
     def get_response_statistics(start_date=None, end_date=None):
         """Статистика по откликам с поддержкой периода"""
-        base_filters = {}
-        if start_date and end_date:
-            base_filters = {'response_date__date__range': [start_date, end_date]}
-        
-        status_stats = Response.objects.filter(**base_filters).values('status__status_response_name').annotate(
-            count=Count('id')
-        ).order_by('-count')
+        status_stats = StatisticsRollup.distribution('response', start_date, end_date)
         
         today = timezone.now().date()
-        daily_data = []
         
-        # Если указан период, используем его для daily_activity
+        # Если указан период, используем его для daily_activity (не больше 30 дней)
         if start_date and end_date:
             start = datetime.strptime(start_date, '%Y-%m-%d').date()
             end = datetime.strptime(end_date, '%Y-%m-%d').date()
-            days_diff = (end - start).days
-            
-            for i in range(min(days_diff + 1, 30)):  # Ограничиваем 30 днями
-                day = start + timedelta(days=i)
-                if day <= end:
-                    count = Response.objects.filter(response_date__date=day).count()
-                    daily_data.append({
-                        'date': day.strftime('%d.%m'),
-                        'count': count
-                    })
+            end = min(end, start + timedelta(days=29))
         else:
             # По умолчанию последние 7 дней
-            for i in range(7):
-                day = today - timedelta(days=6-i)
-                count = Response.objects.filter(response_date__date=day).count()
-                daily_data.append({
-                    'date': day.strftime('%d.%m'),
-                    'count': count
-                })
+            start, end = today - timedelta(days=6), today
+        
+        daily_data = [
+            {'date': day.strftime('%d.%m'), 'count': count}
+            for day, count in StatisticsRollup.series('response', start, end)
+        ]
         
         status_colors = ['#10b981', '#3b82f6', '#f59e0b', '#ef4444', '#8b5cf6']
         
         status_labels = []
         status_data = []
-        for item in status_stats:
-            status_labels.append(item['status__status_response_name'])
-            status_data.append(item['count'])
+        status_names = dict(ResponseStatusChoices.get())
+        for status_id, count in status_stats:
+            status_labels.append(status_names.get(int(status_id), status_id))
+            status_data.append(count)
         
         total = sum(status_data)
         
@@ -247,21 +172,15 @@ class StatisticsService:
     @staticmethod
     def get_complaint_statistics(start_date=None, end_date=None):
         """Статистика по жалобам с поддержкой периода"""
-        base_filters = {}
-        if start_date and end_date:
-            base_filters = {'created_at__date__range': [start_date, end_date]}
-        
-        type_stats = Complaint.objects.filter(**base_filters).values('complaint_type').annotate(
-            count=Count('id')
-        ).order_by('-count')
+        type_stats = StatisticsRollup.distribution('complaint', start_date, end_date)
         
         type_colors = ['#3b82f6', '#f59e0b', '#ef4444', '#10b981', '#8b5cf6', '#06b6d4']
         
         type_labels = []
         type_data = []
-        for item in type_stats:
-            type_labels.append(dict(Complaint.COMPLAINT_TYPES).get(item['complaint_type'], item['complaint_type']))
-            type_data.append(item['count'])
+        for complaint_type, count in type_stats:
+            type_labels.append(dict(Complaint.COMPLAINT_TYPES).get(complaint_type, complaint_type))
+            type_data.append(count)
         
         # Если данных нет, создаем демо-данные для тестирования
         if not type_data:
@@ -275,4 +194,87 @@ class StatisticsService:
                 'colors': type_colors[:len(type_labels)],
                 'max': max(type_data) if type_data else 1
             }
-        }
\ No newline at end of file
+        }
+
+
+class StatisticsSnapshot:
+    """
+    Снимок всей статистики за период (start_date, end_date) в кэше.
+    Страница статистики и экспорт в PDF/CSV строятся из одного снимка.
+    Снимок свежий STATISTICS_SNAPSHOT_TIMEOUT секунд, после этого еще
+    STATISTICS_SNAPSHOT_STALE_TIMEOUT секунд отдается устаревший снимок,
+    а пересчет запускается в фоновом потоке (stale-while-revalidate).
+    Общим для веб-сервера и process_statistics_exports снимок будет только
+    в общем кэше (Redis, Memcached); с LocMemCache у каждого процесса свой.
+    Период без одной из дат считается периодом "за все время".
+    """
+
+    CACHE_PREFIX = 'statistics_snapshot'
+    REFRESH_THREAD_NAME = 'statistics-snapshot-refresh'
+
+    @staticmethod
+    def period(start_date=None, end_date=None):
+        if not (start_date and end_date):
+            return None, None
+        return start_date, end_date
+
+    @staticmethod
+    def cache_key(start_date=None, end_date=None):
+        start_date, end_date = StatisticsSnapshot.period(start_date, end_date)
+        return f'{StatisticsSnapshot.CACHE_PREFIX}:{start_date or ""}:{end_date or ""}'
+
+    @staticmethod
+    def compute(start_date=None, end_date=None):
+        return {
+            'main_stats': StatisticsService.get_main_statistics(start_date, end_date),
+            'user_distribution': StatisticsService.get_user_type_distribution(start_date, end_date),
+            'vacancy_stats': StatisticsService.get_vacancy_statistics(start_date, end_date),
+            'company_stats': StatisticsService.get_company_statistics(start_date, end_date),
+            'response_stats': StatisticsService.get_response_statistics(start_date, end_date),
+            'complaint_stats': StatisticsService.get_complaint_statistics(start_date, end_date),
+        }
+
+    @staticmethod
+    def refresh(start_date=None, end_date=None):
+        """Пересчет снимка и сохранение в кэш"""
+        start_date, end_date = StatisticsSnapshot.period(start_date, end_date)
+        data = StatisticsSnapshot.compute(start_date, end_date)
+        entry = {
+            'data': data,
+            'fresh_until': time.time() + settings.STATISTICS_SNAPSHOT_TIMEOUT,
+        }
+        timeout = settings.STATISTICS_SNAPSHOT_TIMEOUT + settings.STATISTICS_SNAPSHOT_STALE_TIMEOUT
+        cache.set(StatisticsSnapshot.cache_key(start_date, end_date), entry, timeout)
+        return data
+
+    @staticmethod
+    def _refresh_in_background(start_date, end_date):
+        lock_key = f'{StatisticsSnapshot.cache_key(start_date, end_date)}:lock'
+        # Пересчет одного периода выполняет только один поток
+        if not cache.add(lock_key, True, settings.STATISTICS_SNAPSHOT_TIMEOUT):
+            return
+
+        def run():
+            try:
+                StatisticsSnapshot.refresh(start_date, end_date)
+            except Exception as e:
+                print(f"❌ [STATS] Ошибка пересчета статистики: {e}")
+            finally:
+                cache.delete(lock_key)
+                connection.close()
+
+        threading.Thread(target=run, name=StatisticsSnapshot.REFRESH_THREAD_NAME, daemon=True).start()
+
+    @staticmethod
+    def get(start_date=None, end_date=None):
+        """
+        Данные снимка: свежий - из кэша, устаревший - из кэша с фоновым
+        пересчетом, отсутствующий - пересчет сразу.
+        """
+        start_date, end_date = StatisticsSnapshot.period(start_date, end_date)
+        entry = cache.get(StatisticsSnapshot.cache_key(start_date, end_date))
+        if entry is None:
+            return StatisticsSnapshot.refresh(start_date, end_date)
+        if entry['fresh_until'] <= time.time():
+            StatisticsSnapshot._refresh_in_background(start_date, end_date)
+        return entry['data']
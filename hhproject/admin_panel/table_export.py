@@ -0,0 +1,150 @@
+import csv
+import tempfile
+from datetime import datetime
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from home.models import AdminLog, Response, Vacancy
+from home.timeseries import TimeSeries
+
+
+class EchoBuffer:
+    """Буфер для csv.writer, который возвращает строку вместо записи"""
+
+    def write(self, value):
+        return value
+
+
+class TableExport:
+    """
+    Потоковая выгрузка строк в CSV и XLSX. Строки читаются из базы через
+    values_list().iterator() пачками, поэтому память не зависит от числа
+    строк. CSV отдается StreamingHttpResponse и начинает скачиваться сразу;
+    XLSX собирается openpyxl в режиме write-only во временный файл (формат
+    - zip-архив, его нельзя отдавать до окончания записи) и затем
+    отдается потоком из файла.
+    """
+
+    CHUNK_SIZE = 2000
+    FORMATS = ('csv', 'xlsx')
+
+    # Таблица: (название, модель, поле даты для периода, [(поле, заголовок), ...])
+    TABLES = {
+        'vacancies': ('Вакансии', Vacancy, 'created_date', [
+            ('id', 'ID'),
+            ('company__name', 'Компания'),
+            ('position', 'Должность'),
+            ('category', 'Категория'),
+            ('city', 'Город'),
+            ('experience', 'Опыт'),
+            ('salary_min', 'Зарплата от'),
+            ('salary_max', 'Зарплата до'),
+            ('status__status_vacancies_name', 'Статус'),
+            ('views', 'Просмотры'),
+            ('created_date', 'Дата создания'),
+        ]),
+        'responses': ('Отклики', Response, 'response_date', [
+            ('id', 'ID'),
+            ('vacancy_id', 'ID вакансии'),
+            ('vacancy__position', 'Вакансия'),
+            ('vacancy__company__name', 'Компания'),
+            ('applicants_id', 'ID соискателя'),
+            ('status__status_response_name', 'Статус'),
+            ('response_date', 'Дата отклика'),
+        ]),
+        'admin_logs': ('Журнал действий', AdminLog, 'created_at', [
+            ('id', 'ID'),
+            ('admin__email', 'Пользователь'),
+            ('action__name', 'Действие'),
+            ('target_company__name', 'Компания'),
+            ('target_content_type', 'Тип объекта'),
+            ('target_object_id', 'ID объекта'),
+            ('details', 'Детали'),
+            ('ip_address', 'IP-адрес'),
+            ('created_at', 'Дата'),
+        ]),
+    }
+
+    @staticmethod
+    def _cell(value):
+        # Excel не хранит часовой пояс, даты выгружаются в местном времени
+        if isinstance(value, datetime) and timezone.is_aware(value):
+            return timezone.make_naive(value)
+        return value
+
+    @staticmethod
+    def _xlsx_cell(value, illegal_characters):
+        # openpyxl не принимает управляющие символы в строках (IllegalCharacterError)
+        if isinstance(value, str):
+            return illegal_characters.sub('', value)
+        return value
+
+    @staticmethod
+    def table_rows(table, start_date=None, end_date=None):
+        """Заголовок и строки таблицы за период (даты - объекты date или None)"""
+        title, model, date_field, columns = TableExport.TABLES[table]
+        queryset = TimeSeries.filter_period(model.objects.order_by('pk'), date_field, start_date, end_date)
+        yield [header for _, header in columns]
+        for row in queryset.values_list(*[field for field, _ in columns]).iterator(chunk_size=TableExport.CHUNK_SIZE):
+            yield [TableExport._cell(value) for value in row]
+
+    @staticmethod
+    def csv_response(filename, rows):
+        """StreamingHttpResponse с CSV (UTF-8 с BOM, как ожидает Excel)"""
+        writer = csv.writer(EchoBuffer())
+
+        def stream():
+            yield '\ufeff'
+            for row in rows:
+                yield writer.writerow(row)
+
+        response = StreamingHttpResponse(stream(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+        return response
+
+    @staticmethod
+    def xlsx_response(filename, sheets):
+        """FileResponse с XLSX, sheets - [(название листа, строки), ...]"""
+        from openpyxl import Workbook
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+        workbook = Workbook(write_only=True)
+        for title, rows in sheets:
+            sheet = workbook.create_sheet(title=title[:31])
+            for row in rows:
+                sheet.append([TableExport._xlsx_cell(value, ILLEGAL_CHARACTERS_RE) for value in row])
+
+        file = tempfile.TemporaryFile()
+        workbook.save(file)
+        file.seek(0)
+        return FileResponse(
+            file,
+            as_attachment=True,
+            filename=f'{filename}.xlsx',
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+
+    @staticmethod
+    def response(export_format, filename, sheets):
+        """Ответ в нужном формате; CSV содержит строки всех листов подряд"""
+        if export_format == 'xlsx':
+            return TableExport.xlsx_response(filename, sheets)
+
+        def all_rows():
+            for index, (_, rows) in enumerate(sheets):
+                if index:
+                    yield []
+                yield from rows
+
+        return TableExport.csv_response(filename, all_rows())
+
+    @staticmethod
+    def export(table, export_format, start_date=None, end_date=None):
+        """Выгрузка таблицы целиком или за период"""
+        title = TableExport.TABLES[table][0]
+        filename = table
+        if start_date and end_date:
+            filename += f"_{start_date}_to_{end_date}"
+        filename += f"_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        return TableExport.response(export_format, filename, [(title, TableExport.table_rows(table, start_date, end_date))])
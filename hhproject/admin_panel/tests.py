@@ -1,3 +1,344 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import datetime, timedelta
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from home.detail_cache import VacancyDetailCache
+from home.models import (
+    Applicant, Company, Response, StatisticsExport, StatusResponse, StatusVacancies, User, Vacancy, WorkConditions,
+)
+from home.response_counts import ResponseStatusCounts
+from .charts import ChartRenderer
+from .fonts import PdfFontRegistry
+from .procedure_manager import DjangoBackupManager
+from .statistics_export import StatisticsExportService, build_statistics_pdf
+from .statistics_service import StatisticsSnapshot
+
+
+class AdminTestMixin:
+    def create_admin(self):
+        self.admin = User.objects.create_user(
+            email='admin@example.com',
+            username='adminuser',
+            phone='+70000000000',
+            password='testpass123',
+            user_type='adminsite'
+        )
+        self.client.force_login(self.admin)
+
+
+class StatisticsSnapshotTest(AdminTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.create_admin()
+
+    def test_page_and_export_share_snapshot(self):
+        """Тест построения страницы и экспорта из одного снимка статистики"""
+        response = self.client.get(reverse('admin_statistics'))
+        self.assertEqual(response.context['main_stats']['total_users'], 1)
+
+        User.objects.create_user(
+            email='new@example.com', username='newuser', phone='+70000000001', password='testpass123'
+        )
+        # Новый пользователь попадет в статистику после пересчета снимка
+        response = self.client.get(reverse('export_statistics_excel') + '?format=csv')
+        self.assertIn('Всего пользователей,1', b''.join(response.streaming_content).decode('utf-8-sig'))
+        print("✅ test_page_and_export_share_snapshot - ПРОЙДЕН")
+
+    def test_stale_snapshot_is_served_while_refreshing(self):
+        """Тест отдачи устаревшего снимка без ожидания пересчета"""
+        StatisticsSnapshot.refresh()
+        key = StatisticsSnapshot.cache_key()
+        entry = cache.get(key)
+        entry['fresh_until'] = time.time() - 1
+        entry['data']['main_stats']['total_users'] = 100
+        cache.set(key, entry)
+
+        with self.assertNumQueries(0):
+            data = StatisticsSnapshot.get()
+        self.assertEqual(data['main_stats']['total_users'], 100)
+
+        for thread in threading.enumerate():
+            if thread.name == StatisticsSnapshot.REFRESH_THREAD_NAME:
+                thread.join()
+        self.assertGreater(cache.get(key)['fresh_until'], time.time())
+        print("✅ test_stale_snapshot_is_served_while_refreshing - ПРОЙДЕН")
+
+    def test_incomplete_period_shares_snapshot(self):
+        """Тест: период без одной из дат использует снимок за все время"""
+        self.assertEqual(StatisticsSnapshot.cache_key('2025-01-01', None), StatisticsSnapshot.cache_key())
+        StatisticsSnapshot.get()
+        with self.assertNumQueries(0):
+            StatisticsSnapshot.get(start_date='2025-01-01')
+        print("✅ test_incomplete_period_shares_snapshot - ПРОЙДЕН")
+
+
+class StatisticsExportTest(AdminTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.create_admin()
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_pdf_export_job(self):
+        """Тест фонового экспорта в PDF: очередь, формирование, скачивание"""
+        url = reverse('export_statistics_pdf') + '?start_date=2025-01-01&end_date=2025-01-31'
+        job = self.client.get(url).json()
+        self.assertEqual(job['status'], StatisticsExport.STATUS_PENDING)
+        self.assertIsNone(job['download_url'])
+        # Повторный запрос за тот же период не создает новое задание
+        self.assertEqual(self.client.get(url).json()['id'], job['id'])
+
+        self.assertEqual(StatisticsExportService.process_batch(), 1)
+        status = self.client.get(job['status_url']).json()
+        self.assertEqual(status['status'], StatisticsExport.STATUS_DONE)
+
+        response = self.client.get(status['download_url'])
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        self.assertIn('statistics_2025-01-01_to_2025-01-31', response['Content-Disposition'])
+
+        # Готовый файл отдается повторно без нового задания
+        self.assertEqual(self.client.get(url).json()['download_url'], status['download_url'])
+        self.assertEqual(StatisticsExport.objects.count(), 1)
+        print("✅ test_pdf_export_job - ПРОЙДЕН")
+
+    def test_stale_jobs_and_expired_files(self):
+        """Тест зависших заданий и удаления старых файлов экспорта"""
+        url = reverse('export_statistics_pdf')
+        job = StatisticsExport.objects.get(pk=self.client.get(url).json()['id'])
+        StatisticsExport.objects.filter(pk=job.pk).update(
+            status=StatisticsExport.STATUS_RUNNING, started_at=timezone.now() - timedelta(hours=1)
+        )
+        # Зависшее задание не переиспользуется и помечается ошибкой
+        self.assertNotEqual(self.client.get(url).json()['id'], job.pk)
+        self.assertEqual(StatisticsExportService.process_batch(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, StatisticsExport.STATUS_FAILED)
+
+        done = StatisticsExport.objects.get(status=StatisticsExport.STATUS_DONE)
+        path = done.file.path
+        StatisticsExport.objects.update(created_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(StatisticsExportService.purge_expired(), 2)
+        self.assertFalse(StatisticsExport.objects.exists())
+        self.assertFalse(os.path.exists(path))
+        print("✅ test_stale_jobs_and_expired_files - ПРОЙДЕН")
+
+
+class ChartRendererTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.series = {'labels': ['Соискатели', 'Компании'], 'data': [3, 1], 'colors': ['#3b82f6', '#f59e0b']}
+
+    def test_rendered_charts_are_cached(self):
+        """Тест кэширования графиков по входным данным"""
+        png = ChartRenderer.render('pie', self.series, title='Пользователи')
+        self.assertTrue(png.startswith(b'\x89PNG'))
+        self.assertEqual(cache.get(ChartRenderer.cache_key('pie', self.series, 'png', {'title': 'Пользователи'})), png)
+
+        svg = ChartRenderer.render('bar', self.series, 'svg', title='Пользователи')
+        self.assertIn(b'<svg', svg)
+        self.assertIsNone(ChartRenderer.render('pie', dict(self.series, data=[0, 0])))
+        print("✅ test_rendered_charts_are_cached - ПРОЙДЕН")
+
+    @override_settings(STATISTICS_CHART_BACKEND='reportlab')
+    def test_pdf_with_vector_charts(self):
+        """Тест PDF-отчета с векторными графиками reportlab"""
+        self.assertIsNotNone(ChartRenderer.flowable('line', self.series, 400, 300, title='Отклики'))
+        self.assertTrue(build_statistics_pdf().startswith(b'%PDF'))
+        print("✅ test_pdf_with_vector_charts - ПРОЙДЕН")
+
+
+class TableExportTest(AdminTestMixin, TestCase):
+    def setUp(self):
+        self.create_admin()
+        company = Company.objects.create(
+            user=self.admin, name='Яндекс', number='1234567890', industry='IT', status=Company.STATUS_APPROVED
+        )
+        for index in range(3):
+            Vacancy.objects.create(
+                company=company,
+                work_conditions=WorkConditions.objects.get_or_create(work_conditions_name='Офис')[0],
+                status=StatusVacancies.objects.get_or_create(status_vacancies_name='Активна')[0],
+                position=f'Разработчик {index}',
+                description='Описание',
+                requirements='Требования',
+                salary_min=50000,
+                salary_max=100000,
+                # Управляющий символ, который openpyxl не записывает в XLSX
+                city='Москва\x1fbad' if index == 1 else 'Москва',
+            )
+
+    def test_csv_is_streamed(self):
+        """Тест потоковой выгрузки вакансий в CSV"""
+        response = self.client.get(reverse('export_table', args=['vacancies']) + '?format=csv')
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertTrue(lines[0].startswith('ID,Компания,Должность'))
+        self.assertEqual(len(lines), 4)
+        self.assertIn('Разработчик 2', lines[3])
+
+        response = self.client.get(
+            reverse('export_table', args=['vacancies']) + '?format=csv&start_date=2000-01-01&end_date=2000-01-31'
+        )
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 1)
+        self.assertEqual(self.client.get(reverse('export_table', args=['users'])).status_code, 404)
+        print("✅ test_csv_is_streamed - ПРОЙДЕН")
+
+    def test_xlsx_export(self):
+        """Тест выгрузки в XLSX: таблица и статистика"""
+        from openpyxl import load_workbook
+
+        response = self.client.get(reverse('export_table', args=['vacancies']) + '?format=xlsx')
+        sheet = load_workbook(io.BytesIO(b''.join(response.streaming_content))).active
+        self.assertEqual(sheet.title, 'Вакансии')
+        self.assertEqual(sheet.max_row, 4)
+        self.assertEqual(sheet.cell(row=2, column=3).value, 'Разработчик 0')
+        self.assertEqual(sheet.cell(row=3, column=5).value, 'Москваbad')
+
+        response = self.client.get(reverse('export_statistics_excel'))
+        sheet = load_workbook(io.BytesIO(b''.join(response.streaming_content))).active
+        self.assertEqual(sheet.cell(row=1, column=1).value, 'Статистика платформы трудоустройства')
+        print("✅ test_xlsx_export - ПРОЙДЕН")
+
+
+class PdfFontRegistryTest(TestCase):
+    def test_fonts_registered_once(self):
+        """Тест однократной регистрации шрифтов с кириллицей"""
+        from reportlab.pdfbase import pdfmetrics
+
+        PdfFontRegistry.reset()
+        fonts = PdfFontRegistry.fonts()
+        self.assertIs(PdfFontRegistry.fonts(), fonts)
+        self.assertIn(fonts[0], pdfmetrics.getRegisteredFontNames())
+        self.assertIn(fonts[0].encode(), build_statistics_pdf())
+        print("✅ test_fonts_registered_once - ПРОЙДЕН")
+
+
+class DatabaseBackupTest(AdminTestMixin, TestCase):
+    def setUp(self):
+        self.create_admin()
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root, BACKUP_CHUNK_SIZE=2)
+        self.override.enable()
+        for name in ('Офис', 'Удаленно', 'Гибрид'):
+            WorkConditions.objects.create(work_conditions_name=name)
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_streaming_backup_and_restore(self):
+        """Тест потокового бэкапа в JSON Lines с gzip и восстановления из него"""
+        manager = DjangoBackupManager()
+        result = manager.create_backup('database')
+        self.assertTrue(result['success'])
+        self.assertTrue(result['filename'].endswith('.jsonl.gz'))
+
+        with gzip.open(result['filepath'], 'rt', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        metadata = json.loads(lines[0])['metadata']
+        self.assertIn('home.WorkConditions', metadata['models_backed_up'])
+        self.assertEqual(len(lines) - 1, result['total_objects'])
+        conditions = [json.loads(line) for line in lines[1:] if '"home.workconditions"' in line]
+        self.assertEqual([obj['fields']['work_conditions_name'] for obj in conditions], ['Офис', 'Удаленно', 'Гибрид'])
+
+        WorkConditions.objects.filter(work_conditions_name='Гибрид').delete()
+        with open(result['filepath'], 'rb') as f:
+            self.assertTrue(manager.validate_backup(f))
+            self.assertTrue(manager.restore_backup(f, self.admin)['success'])
+        self.assertEqual(WorkConditions.objects.count(), 3)
+        print("✅ test_streaming_backup_and_restore - ПРОЙДЕН")
+
+    def test_full_backup_contains_database(self):
+        """Тест полного бэкапа с потоковым файлом базы данных внутри"""
+        result = DjangoBackupManager().create_backup('full')
+        with zipfile.ZipFile(result['filepath']) as zipf:
+            self.assertIn(DjangoBackupManager.DATABASE_ARCHIVE_NAME, zipf.namelist())
+        print("✅ test_full_backup_contains_database - ПРОЙДЕН")
+
+    def test_bulk_restore(self):
+        """Тест восстановления пачками: связи, последовательности, атомарность"""
+        from django.contrib.auth.models import Group
+
+        group = Group.objects.create(name='Модераторы')
+        self.admin.groups.add(group)
+        company = Company.objects.create(user=self.admin, name='Яндекс', number='1234567890', industry='IT')
+        vacancy = Vacancy.objects.create(
+            company=company,
+            work_conditions=WorkConditions.objects.get(work_conditions_name='Офис'),
+            status=StatusVacancies.objects.create(status_vacancies_name='Активна'),
+            position='Разработчик',
+            description='Описание',
+            requirements='Требования',
+            salary_min=50000,
+            salary_max=100000,
+        )
+        applicant = Applicant.objects.create(
+            user=User.objects.create_user(email='a@example.com', username='applicant', phone='+70000000002', password='x'),
+            first_name='Иван',
+            last_name='Иванов',
+            birth_date='1990-01-01',
+        )
+        response = Response.objects.create(
+            applicants=applicant, vacancy=vacancy, status=StatusResponse.objects.create(status_response_name='Новый')
+        )
+        old_date = timezone.make_aware(datetime(2020, 1, 1, 12, 0))
+        Vacancy.objects.filter(pk=vacancy.pk).update(created_date=old_date, updated_date=old_date)
+        Response.objects.filter(pk=response.pk).update(response_date=old_date)
+        manager = DjangoBackupManager()
+        result = manager.create_backup('database')
+
+        self.admin.groups.clear()
+        WorkConditions.objects.exclude(pk=vacancy.work_conditions_id).delete()
+        Response.objects.all().delete()
+        self.assertEqual(ResponseStatusCounts.get(company.pk)['total'], 0)
+        VacancyDetailCache.get_version(vacancy.pk)
+        with open(result['filepath'], 'rb') as f:
+            manager.restore_backup(f, self.admin)
+        # Кэш прежней базы очищен
+        self.assertEqual(ResponseStatusCounts.get(company.pk)['total'], 1)
+        self.assertIsNone(cache.get(VacancyDetailCache.VERSION_KEY.format(vacancy.pk)))
+        # Даты auto_now/auto_now_add сохраняют значения из бэкапа
+        self.assertEqual(Response.objects.get(pk=response.pk).response_date, old_date)
+        vacancy.refresh_from_db()
+        self.assertEqual((vacancy.created_date, vacancy.updated_date), (old_date, old_date))
+        self.assertEqual(list(self.admin.groups.all()), [group])
+        self.assertEqual(WorkConditions.objects.count(), 3)
+        # Последовательность сдвинута за восстановленные ключи
+        created = WorkConditions.objects.create(work_conditions_name='Вахта')
+        self.assertGreater(created.pk, WorkConditions.objects.exclude(pk=created.pk).order_by('-pk')[0].pk)
+
+        # Объект без обязательных полей откатывает восстановление целиком
+        broken = result['filepath'].replace('.jsonl.gz', '_broken.jsonl.gz')
+        with gzip.open(result['filepath'], 'rt', encoding='utf-8') as source, \
+                gzip.open(broken, 'wt', encoding='utf-8') as target:
+            target.write(source.read() + '{"model": "home.vacancy", "pk": 1, "fields": {}}\n')
+        WorkConditions.objects.all().delete()
+        with open(broken, 'rb') as f, self.assertRaises(Exception):
+            manager.restore_backup(f, self.admin)
+        self.assertEqual(WorkConditions.objects.count(), 0)
+
+        # Бэкап старого формата (один JSON-документ) восстанавливается тем же способом
+        legacy = {'metadata': {}, 'data': {'home.WorkConditions': [
+            {'model': 'home.workconditions', 'pk': 1, 'fields': {'work_conditions_name': 'Офис'}},
+        ]}}
+        manager.restore_backup(SimpleUploadedFile('legacy.json', json.dumps(legacy).encode()), self.admin)
+        self.assertEqual(WorkConditions.objects.get(pk=1).work_conditions_name, 'Офис')
+        print("✅ test_bulk_restore - ПРОЙДЕН")
@@ -33,7 +33,10 @@ urlpatterns = [
     
     path('statistics/', admin_statistics, name='admin_statistics'),
     path('admin/statistics/export-pdf/', export_statistics_pdf, name='export_statistics_pdf'),
+    path('admin/statistics/exports/<int:job_id>/', export_statistics_status, name='export_statistics_status'),
+    path('admin/statistics/exports/<int:job_id>/download/', export_statistics_download, name='export_statistics_download'),
     path('admin/statistics/export-excel/', export_statistics_excel, name='export_statistics_excel'),
+    path('admin/exports/<str:table>/', export_table, name='export_table'),
 
     path('complaints/', admin_complaints, name='admin_complaints'),
     path('complaints/<int:complaint_id>/', complaint_detail, name='complaint_detail'),
@@ -3,19 +3,19 @@ import subprocess
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import user_passes_test
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
 from django.core.files import File
 from datetime import timedelta
 import os
 
 from django.urls import reverse
-from matplotlib import pyplot as plt
 
 from .procedure_manager import DjangoBackupManager
 from .forms import AdminProfileEditForm, BackupUploadForm, SiteAdminCreateForm, SiteAdminEditForm
 
 from home.models import Company, Complaint, User, Employee, Vacancy, StatusVacancies
 from home.models import Backup, AdminLog
+from home.detail_cache import VacancyDetailCache
 from .forms import CompanyModerationForm
 
 def is_admin(user):
@@ -68,7 +68,9 @@ def admin_dashboard(request):
     })
     return render(request, 'admin_panel/dashboard.html', context)
 
-from django.core.mail import send_mail
+from django.db import transaction
+from home.email_outbox import EmailOutboxService
+from home.emails import EmailRenderer
 from django.conf import settings
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
@@ -91,11 +93,12 @@ def company_moderation(request):
                 
                 old_status = company.status
                 company.status = status
-                company.save()
+                with transaction.atomic():
+                    company.save()
+                    # Письмо ставится в очередь в одной транзакции со сменой статуса
+                    email_sent = old_status != company.status and send_company_status_email(company, old_status)
                 
                 if old_status != company.status:
-                    # Отправка email уведомления
-                    email_sent = send_company_status_email(company, old_status)
                     
                     if company.status == Company.STATUS_APPROVED:
                         action = 'company_approved'
@@ -139,10 +142,12 @@ def company_detail(request, company_id):
         form = CompanyModerationForm(request.POST, instance=company)
         if form.is_valid():
             old_status = company.status
-            company = form.save()
+            with transaction.atomic():
+                company = form.save()
+                if old_status != company.status:
+                    send_company_status_email(company, old_status)
             
             if old_status != company.status:
-                send_company_status_email(company, old_status)
                 
                 if company.status == Company.STATUS_APPROVED:
                     action = 'company_approved'
@@ -197,227 +202,17 @@ def send_company_status_email(company, old_status):
     try:
         subject = f'Статус вашей компании на HR-Lab изменен'
         
-        html_message = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <style>
-                body {{
-                    font-family: 'Inter', 'Arial', sans-serif;
-                    line-height: 1.6;
-                    color: #1e293b;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 0;
-                    background: linear-gradient(135deg, #2563eb 0%, #1e293b 100%);
-                }}
-                .container {{
-                    background: white;
-                    margin: 20px;
-                    border-radius: 20px;
-                    overflow: hidden;
-                    box-shadow: 0 15px 35px rgba(0, 0, 0, 0.2);
-                }}
-                .header {{
-                    background: linear-gradient(135deg, #2563eb 0%, #1e293b 100%);
-                    color: white;
-                    padding: 40px 30px;
-                    text-align: center;
-                }}
-                .header h1 {{
-                    margin: 0;
-                    font-size: 28px;
-                    font-weight: 700;
-                }}
-                .header p {{
-                    margin: 10px 0 0 0;
-                    opacity: 0.9;
-                    font-size: 16px;
-                }}
-                .content {{
-                    padding: 40px 30px;
-                }}
-                .status-card {{
-                    background: rgba(37, 99, 235, 0.05);
-                    border: 1px solid rgba(37, 99, 235, 0.2);
-                    border-radius: 15px;
-                    padding: 25px;
-                    margin: 25px 0;
-                    text-align: center;
-                }}
-                .status-icon {{
-                    font-size: 48px;
-                    margin-bottom: 15px;
-                }}
-                .status-title {{
-                    font-size: 20px;
-                    font-weight: 700;
-                    color: #1e293b;
-                    margin-bottom: 10px;
-                }}
-                .status-description {{
-                    color: #64748b;
-                    font-size: 16px;
-                    line-height: 1.5;
-                }}
-                .approved {{
-                    background: rgba(16, 185, 129, 0.05);
-                    border-color: rgba(16, 185, 129, 0.2);
-                }}
-                .approved .status-title {{
-                    color: #065f46;
-                }}
-                .rejected {{
-                    background: rgba(239, 68, 68, 0.05);
-                    border-color: rgba(239, 68, 68, 0.2);
-                }}
-                .rejected .status-title {{
-                    color: #991b1b;
-                }}
-                .action-button {{
-                    display: inline-block;
-                    background: linear-gradient(45deg, #2563eb, #1e40af);
-                    color: white;
-                    padding: 14px 32px;
-                    text-decoration: none;
-                    border-radius: 25px;
-                    font-weight: 600;
-                    font-size: 16px;
-                    margin: 20px 0;
-                    transition: all 0.3s ease;
-                }}
-                .action-button:hover {{
-                    background: linear-gradient(45deg, #1e40af, #2563eb);
-                    transform: translateY(-2px);
-                    box-shadow: 0 5px 15px rgba(37, 99, 235, 0.3);
-                }}
-                .info-section {{
-                    background: #f8fafc;
-                    border-radius: 12px;
-                    padding: 20px;
-                    margin: 25px 0;
-                }}
-                .info-item {{
-                    display: flex;
-                    justify-content: space-between;
-                    padding: 10px 0;
-                    border-bottom: 1px solid #e2e8f0;
-                }}
-                .info-item:last-child {{
-                    border-bottom: none;
-                }}
-                .info-label {{
-                    color: #64748b;
-                    font-weight: 500;
-                }}
-                .info-value {{
-                    color: #1e293b;
-                    font-weight: 600;
-                }}
-                .footer {{
-                    background: #f1f5f9;
-                    padding: 30px;
-                    text-align: center;
-                    border-top: 1px solid #e2e8f0;
-                }}
-                .footer p {{
-                    margin: 5px 0;
-                    color: #64748b;
-                    font-size: 14px;
-                }}
-                .contact-info {{
-                    margin-top: 15px;
-                    padding-top: 15px;
-                    border-top: 1px solid #e2e8f0;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>HR-Lab</h1>
-                    <p>Уведомление о статусе компании</p>
-                </div>
-                
-                <div class="content">
-                    <h2 style="color: #1e293b; margin-top: 0;">Уважаемый представитель компании!</h2>
-                    <p style="color: #64748b; font-size: 16px;">
-                        Статус вашей компании <strong>"{company_name}"</strong> на платформе HR-Lab был обновлен.
-                    </p>
-                    
-                    <div class="status-card {new_status}">
-                        <div class="status-icon">{status_icon}</div>
-                        <div class="status-title">{status_title}</div>
-                        <div class="status-description">{status_description}</div>
-                    </div>
-                    
-                    <div class="info-section">
-                        <div class="info-item">
-                            <span class="info-label">Компания:</span>
-                            <span class="info-value">{company_name}</span>
-                        </div>
-                        <div class="info-item">
-                            <span class="info-label">Новый статус:</span>
-                            <span class="info-value" style="color: {status_color}; font-weight: 700;">
-                                {status_display}
-                            </span>
-                        </div>
-                        <div class="info-item">
-                            <span class="info-label">Дата обновления:</span>
-                            <span class="info-value">{company.created_at.strftime('%d.%m.%Y')}</span>
-                        </div>
-                    </div>
-                    
-                    <p style="color: #64748b; font-size: 15px; text-align: center;">
-                        Если у вас возникли вопросы, не стесняйтесь обращаться в нашу службу поддержки.
-                    </p>
-                </div>
-                
-                <div class="footer">
-                    <p><strong>С уважением, команда HR-Lab</strong></p>
-                    <p>Мы помогаем компаниям находить лучших сотрудников</p>
-                    <div class="contact-info">
-                        <p>Email: hr-labogency@mail.ru</p>
-                    </div>
-                    <p style="font-size: 12px; margin-top: 20px; color: #94a3b8;">
-                        Это автоматическое сообщение, пожалуйста, не отвечайте на него.
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Текстовая версия для почтовых клиентов, которые не поддерживают HTML
-        plain_message = f"""
-        Уважаемый представитель компании "{company_name}"!
-
-        Статус вашей компании на платформе HR-Lab был изменен.
-
-        Новый статус: {status_display}
-
-        {status_description}
-
-        Для управления вашей компанией перейдите в личный кабинет:
-        http://127.0.0.1:8000/compani/
-
-        С уважением,
-        Команда HR-Lab
-
-        ---
-        Email: support@hr-lab.ru
-        Телефон: +7 (999) 123-45-67
-        """
-        
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user_email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+        plain_message, html_message = EmailRenderer.render('company_status', {
+            'company': company,
+            'company_name': company_name,
+            'new_status': new_status,
+            'status_display': status_display,
+            'status_title': status_title,
+            'status_description': status_description,
+            'status_icon': status_icon,
+            'status_color': status_color,
+        })
+        EmailOutboxService.enqueue(subject, plain_message, user_email, html_message)
         
         return True
         
@@ -1041,13 +836,6 @@ from datetime import timedelta
 from django.http import HttpResponse
 import json
 from home.models import User, Company, Vacancy, Applicant, Employee, Response
-import io
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from openpyxl import Workbook
 from django.views.decorators.http import require_http_methods
 
 from django.contrib.auth.decorators import login_required
@@ -1073,42 +861,41 @@ from django.http import HttpResponse, JsonResponse
 from django.contrib.auth.decorators import login_required, user_passes_test
 import json
 from datetime import datetime
-from .statistics_service import StatisticsService
+from .statistics_service import StatisticsSnapshot
+from .statistics_export import StatisticsExportService, statistics_rows
+from .table_export import TableExport
+from home.models import StatisticsExport
 
-# Добавьте эти импорты для экспорта
-import csv
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-import io
+
+def get_statistics_period(request):
+    """Период статистики из GET-параметров, неполный или некорректный период сбрасывается"""
+    start_date = request.GET.get('start_date')
+    end_date = request.GET.get('end_date')
+    
+    if not (start_date and end_date):
+        return None, None
+    try:
+        start_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
+        if start_obj > end_obj:
+            return None, None
+    except ValueError:
+        return None, None
+    return start_date, end_date
 
 @login_required
 @user_passes_test(is_admin)
 def admin_statistics(request):
     """Страница статистики с поддержкой периода"""
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
+    start_date, end_date = get_statistics_period(request)
     
-    # Валидация дат
-    if start_date and end_date:
-        try:
-            start_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
-            end_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
-            if start_obj > end_obj:
-                start_date, end_date = None, None
-        except ValueError:
-            start_date, end_date = None, None
-    
-    main_stats = StatisticsService.get_main_statistics(start_date, end_date)
-    user_distribution = StatisticsService.get_user_type_distribution(start_date, end_date)
-    vacancy_stats = StatisticsService.get_vacancy_statistics(start_date, end_date)
-    company_stats = StatisticsService.get_company_statistics(start_date, end_date)
-    response_stats = StatisticsService.get_response_statistics(start_date, end_date)
-    complaint_stats = StatisticsService.get_complaint_statistics(start_date, end_date)
+    snapshot = StatisticsSnapshot.get(start_date, end_date)
+    main_stats = snapshot['main_stats']
+    user_distribution = snapshot['user_distribution']
+    vacancy_stats = snapshot['vacancy_stats']
+    company_stats = snapshot['company_stats']
+    response_stats = snapshot['response_stats']
+    complaint_stats = snapshot['complaint_stats']
     
     # Подготавливаем данные для круговых диаграмм
     user_chart_data = []
@@ -1234,488 +1021,87 @@ def admin_statistics(request):
         
         'start_date': start_date,
         'end_date': end_date,
+        'export_tables': [(table, spec[0]) for table, spec in TableExport.TABLES.items()],
     }
     
     return render(request, 'admin_panel/statistics.html', context)
 
-from reportlab.platypus import Image
-from reportlab.lib.units import inch
+def statistics_export_payload(job):
+    """Состояние задания на экспорт для опроса со страницы статистики"""
+    payload = {
+        'id': job.pk,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'status_url': reverse('export_statistics_status', args=[job.pk]),
+        'download_url': None,
+        'error': job.error,
+    }
+    if job.status == StatisticsExport.STATUS_DONE:
+        payload['download_url'] = reverse('export_statistics_download', args=[job.pk])
+    return payload
 
 @login_required
 @user_passes_test(is_admin)
 def export_statistics_pdf(request):
-    """Экспорт статистики в PDF с поддержкой периода"""
-    try:
-        start_date = request.GET.get('start_date')
-        end_date = request.GET.get('end_date')
-        
-        # Валидация дат
-        if start_date and end_date:
-            try:
-                start_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
-                end_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
-                if start_obj > end_obj:
-                    start_date, end_date = None, None
-            except ValueError:
-                start_date, end_date = None, None
-        
-        # Собираем данные с учетом периода
-        main_stats = StatisticsService.get_main_statistics(start_date, end_date)
-        user_distribution = StatisticsService.get_user_type_distribution(start_date, end_date)
-        vacancy_stats = StatisticsService.get_vacancy_statistics(start_date, end_date)
-        company_stats = StatisticsService.get_company_statistics(start_date, end_date)
-        response_stats = StatisticsService.get_response_statistics(start_date, end_date)
-        complaint_stats = StatisticsService.get_complaint_statistics(start_date, end_date)
-        
-        # Создаем PDF
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=30)
-        elements = []
-        
-        # Регистрируем шрифты
-        from reportlab.pdfbase import pdfmetrics
-        from reportlab.pdfbase.ttfonts import TTFont
-        from reportlab.lib.fonts import addMapping
-        
-        font_name = 'Times-Roman'
-        bold_font_name = 'Times-Bold'
-        
-        try:
-            # Пробуем найти и зарегистрировать Times New Roman
-            font_variants = [
-                'times.ttf', 'timesbd.ttf', 'timesi.ttf', 'timesbi.ttf',
-                'Times New Roman.ttf', 'Times New Roman Bold.ttf',
-                '/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf',
-                '/Library/Fonts/Times New Roman.ttf',
-            ]
-            
-            for font_variant in font_variants:
-                try:
-                    if 'timesbd' in font_variant or 'Bold' in font_variant:
-                        pdfmetrics.registerFont(TTFont('TimesNewRoman-Bold', font_variant))
-                        bold_font_name = 'TimesNewRoman-Bold'
-                    else:
-                        pdfmetrics.registerFont(TTFont('TimesNewRoman', font_variant))
-                        font_name = 'TimesNewRoman'
-                except:
-                    continue
-            
-            if font_name == 'TimesNewRoman' and bold_font_name == 'TimesNewRoman-Bold':
-                addMapping('TimesNewRoman', 0, 0, 'TimesNewRoman')
-                addMapping('TimesNewRoman', 1, 0, 'TimesNewRoman-Bold')
-            else:
-                font_name = 'Times-Roman'
-                bold_font_name = 'Times-Bold'
-                
-        except Exception as e:
-            print(f"Font registration error: {e}")
-            font_name = 'Times-Roman'
-            bold_font_name = 'Times-Bold'
-        
-        # Стили
-        styles = getSampleStyleSheet()
-        
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontName=bold_font_name,
-            fontSize=16,
-            spaceAfter=30,
-            alignment=1
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontName=bold_font_name,
-            fontSize=12,
-            spaceAfter=12
-        )
-        
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontName=font_name,
-            fontSize=10
-        )
-        
-        # Заголовок
-        title = Paragraph("Статистика платформы трудоустройства", title_style)
-        elements.append(title)
-        
-        period_info = f"Дата экспорта: {datetime.now().strftime('%d.%m.%Y %H:%M')}"
-        if start_date and end_date:
-            period_info += f" | Период: {start_date} - {end_date}"
-        
-        elements.append(Paragraph(period_info, normal_style))
-        elements.append(Spacer(1, 20))
-        
-        # Основная статистика
-        elements.append(Paragraph("Основная статистика", heading_style))
-        
-        main_data = [
-            ['Показатель', 'Значение'],
-            ['Всего пользователей', str(main_stats['total_users'])],
-            ['Всего компаний', str(main_stats['total_companies'])],
-            ['Всего вакансий', str(main_stats['total_vacancies'])],
-            ['Всего откликов', str(main_stats['total_responses'])],
-            ['Активных компаний', str(main_stats['active_companies'])],
-        ]
-        
-        # Добавляем информацию о периоде, если он указан
-        if not start_date or not end_date:
-            main_data.extend([
-                ['Новых пользователей (неделя)', str(main_stats['new_users_week'])],
-                ['Новых компаний (неделя)', str(main_stats['new_companies_week'])],
-                ['Новых вакансий (неделя)', str(main_stats['new_vacancies_week'])],
-            ])
-        
-        main_table = Table(main_data, colWidths=[250, 100])
-        main_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), bold_font_name),
-            ('FONTNAME', (0, 1), (-1, -1), font_name),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        elements.append(main_table)
-        elements.append(Spacer(1, 20))
-        
-        # Остальные графики и таблицы (аналогично вашему коду)
-        # График распределения пользователей
-        elements.append(Paragraph("Распределение пользователей по типам", heading_style))
-        user_chart_buffer = create_user_distribution_chart(user_distribution)
-        if user_chart_buffer:
-            user_chart = Image(user_chart_buffer, width=6*inch, height=4*inch)
-            elements.append(user_chart)
-        elements.append(Spacer(1, 10))
-        
-        # Таблица распределения пользователей
-        user_data = [['Тип пользователя', 'Количество', 'Процент']]
-        for i, label in enumerate(user_distribution['labels']):
-            user_data.append([
-                label,
-                str(user_distribution['data'][i]),
-                f"{user_distribution['percentages'][i]}%"
-            ])
-        
-        user_table = Table(user_data, colWidths=[200, 80, 80])
-        user_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), bold_font_name),
-            ('FONTNAME', (0, 1), (-1, -1), font_name),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        elements.append(user_table)
-        elements.append(Spacer(1, 20))
-        
-        # График статусов компаний
-        elements.append(Paragraph("Статусы компаний", heading_style))
-        company_chart_buffer = create_company_status_chart(company_stats)
-        if company_chart_buffer:
-            company_chart = Image(company_chart_buffer, width=6*inch, height=4*inch)
-            elements.append(company_chart)
-        elements.append(Spacer(1, 10))
-        
-        # Таблица статусов компаний
-        company_data = [['Статус', 'Количество', 'Процент']]
-        for i, label in enumerate(company_stats['status_distribution']['labels']):
-            company_data.append([
-                label,
-                str(company_stats['status_distribution']['data'][i]),
-                f"{company_stats['status_distribution']['percentages'][i]}%"
-            ])
-        
-        company_table = Table(company_data, colWidths=[200, 80, 80])
-        company_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), bold_font_name),
-            ('FONTNAME', (0, 1), (-1, -1), font_name),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        elements.append(company_table)
-        elements.append(Spacer(1, 20))
-        
-        # График категорий вакансий
-        elements.append(Paragraph("Категории вакансий", heading_style))
-        vacancy_chart_buffer = create_vacancy_categories_chart(vacancy_stats)
-        if vacancy_chart_buffer:
-            vacancy_chart = Image(vacancy_chart_buffer, width=6*inch, height=4*inch)
-            elements.append(vacancy_chart)
-        elements.append(Spacer(1, 10))
-        
-        # Таблица категорий вакансий
-        vacancy_data = [['Категория', 'Количество']]
-        for i, label in enumerate(vacancy_stats['category']['labels']):
-            vacancy_data.append([
-                label,
-                str(vacancy_stats['category']['data'][i])
-            ])
-        
-        vacancy_table = Table(vacancy_data, colWidths=[200, 80])
-        vacancy_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), bold_font_name),
-            ('FONTNAME', (0, 1), (-1, -1), font_name),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        elements.append(vacancy_table)
-        elements.append(Spacer(1, 20))
-        
-        # График активности откликов
-        elements.append(Paragraph("Активность откликов", heading_style))
-        response_chart_buffer = create_response_activity_chart(response_stats)
-        if response_chart_buffer:
-            response_chart = Image(response_chart_buffer, width=6*inch, height=4*inch)
-            elements.append(response_chart)
-        
-        # Собираем PDF
-        doc.build(elements)
-        
-        # Возвращаем файл
-        buffer.seek(0)
-        filename = "statistics"
-        if start_date and end_date:
-            filename += f"_{start_date}_to_{end_date}"
-        filename += f"_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        
-        response = HttpResponse(buffer, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        return response
-        
-    except Exception as e:
-        return HttpResponse(f"Ошибка при создании PDF: {str(e)}")
+    """Постановка экспорта статистики в PDF в очередь с поддержкой периода"""
+    start_date, end_date = get_statistics_period(request)
+    job = StatisticsExportService.request(StatisticsExport.FORMAT_PDF, start_date, end_date, request.user)
+    return JsonResponse(statistics_export_payload(job))
+
+@login_required
+@user_passes_test(is_admin)
+def export_statistics_status(request, job_id):
+    """Статус задания на экспорт статистики"""
+    job = get_object_or_404(StatisticsExport, pk=job_id)
+    return JsonResponse(statistics_export_payload(job))
+
+@login_required
+@user_passes_test(is_admin)
+def export_statistics_download(request, job_id):
+    """Скачивание готового файла экспорта статистики"""
+    job = get_object_or_404(StatisticsExport, pk=job_id, status=StatisticsExport.STATUS_DONE)
+    return FileResponse(job.file.open('rb'), as_attachment=True, filename=os.path.basename(job.file.name))
 
 @login_required
 @user_passes_test(is_admin)
 def export_statistics_excel(request):
-    """Экспорт статистики в Excel (CSV) с поддержкой периода"""
+    """Экспорт статистики в Excel (XLSX) или CSV с поддержкой периода"""
     try:
-        start_date = request.GET.get('start_date')
-        end_date = request.GET.get('end_date')
-        
-        # Валидация дат
-        if start_date and end_date:
-            try:
-                start_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
-                end_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
-                if start_obj > end_obj:
-                    start_date, end_date = None, None
-            except ValueError:
-                start_date, end_date = None, None
-        
-        # Собираем данные с учетом периода
-        main_stats = StatisticsService.get_main_statistics(start_date, end_date)
-        user_distribution = StatisticsService.get_user_type_distribution(start_date, end_date)
-        vacancy_stats = StatisticsService.get_vacancy_statistics(start_date, end_date)
-        company_stats = StatisticsService.get_company_statistics(start_date, end_date)
-        response_stats = StatisticsService.get_response_statistics(start_date, end_date)
-        complaint_stats = StatisticsService.get_complaint_statistics(start_date, end_date)
-        
-        response = HttpResponse(content_type='text/csv; charset=utf-8-sig')
+        start_date, end_date = get_statistics_period(request)
+        export_format = request.GET.get('format', 'xlsx')
+        if export_format not in TableExport.FORMATS:
+            export_format = 'xlsx'
         
         filename = "statistics"
         if start_date and end_date:
             filename += f"_{start_date}_to_{end_date}"
-        filename += f"_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        # Создаем CSV writer с поддержкой русского
-        writer = csv.writer(response)
-        
-        # Заголовок
-        writer.writerow(['Статистика платформы трудоустройства'])
-        period_info = f"Дата экспорта: {datetime.now().strftime('%d.%m.%Y %H:%M')}"
-        if start_date and end_date:
-            period_info += f" | Период: {start_date} - {end_date}"
-        writer.writerow([period_info])
-        writer.writerow([])
-        
-        # Основная статистика
-        writer.writerow(['ОСНОВНАЯ СТАТИСТИКА'])
-        writer.writerow(['Показатель', 'Значение'])
-        writer.writerow(['Всего пользователей', main_stats['total_users']])
-        writer.writerow(['Всего компаний', main_stats['total_companies']])
-        writer.writerow(['Всего вакансий', main_stats['total_vacancies']])
-        writer.writerow(['Всего откликов', main_stats['total_responses']])
-        writer.writerow(['Активных компаний', main_stats['active_companies']])
-        
-        if not start_date or not end_date:
-            writer.writerow(['Новых пользователей (неделя)', main_stats['new_users_week']])
-            writer.writerow(['Новых компаний (неделя)', main_stats['new_companies_week']])
-            writer.writerow(['Новых вакансий (неделя)', main_stats['new_vacancies_week']])
-        
-        writer.writerow([])
-        
-        # Распределение пользователей
-        writer.writerow(['РАСПРЕДЕЛЕНИЕ ПОЛЬЗОВАТЕЛЕЙ ПО ТИПАМ'])
-        writer.writerow(['Тип пользователя', 'Количество', 'Процент'])
-        for i, label in enumerate(user_distribution['labels']):
-            writer.writerow([
-                label,
-                user_distribution['data'][i],
-                f"{user_distribution['percentages'][i]}%"
-            ])
-        writer.writerow([])
+        filename += f"_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        # Статусы компаний
-        writer.writerow(['СТАТУСЫ КОМПАНИЙ'])
-        writer.writerow(['Статус', 'Количество', 'Процент'])
-        for i, label in enumerate(company_stats['status_distribution']['labels']):
-            writer.writerow([
-                label,
-                company_stats['status_distribution']['data'][i],
-                f"{company_stats['status_distribution']['percentages'][i]}%"
-            ])
-        writer.writerow([])
-        
-        # Категории вакансий
-        writer.writerow(['КАТЕГОРИИ ВАКАНСИЙ'])
-        writer.writerow(['Категория', 'Количество'])
-        for i, label in enumerate(vacancy_stats['category']['labels']):
-            writer.writerow([label, vacancy_stats['category']['data'][i]])
-        writer.writerow([])
-        
-        # Активность откликов
-        writer.writerow(['АКТИВНОСТЬ ОТКЛИКОВ'])
-        writer.writerow(['Дата', 'Количество откликов'])
-        for day in response_stats['daily_activity']:
-            writer.writerow([day['date'], day['count']])
-        writer.writerow([])
-        
-        # Типы жалоб
-        writer.writerow(['ТИПЫ ЖАЛОБ'])
-        writer.writerow(['Тип жалобы', 'Количество'])
-        for i, label in enumerate(complaint_stats['type_distribution']['labels']):
-            writer.writerow([label, complaint_stats['type_distribution']['data'][i]])
-        
-        return response
+        return TableExport.response(export_format, filename, [('Статистика', statistics_rows(start_date, end_date))])
         
     except Exception as e:
         return HttpResponse(f"Ошибка при создании Excel: {str(e)}")
 
-# Функции для создания графиков (остаются без изменений)
-def create_user_distribution_chart(user_distribution):
-    """Создает круговую диаграмму распределения пользователей"""
-    try:
-        plt.figure(figsize=(8, 6))
-        plt.pie(
-            user_distribution['data'],
-            labels=user_distribution['labels'],
-            colors=user_distribution['colors'],
-            autopct='%1.1f%%',
-            startangle=90
-        )
-        plt.title('Распределение пользователей по типам', fontsize=14, fontweight='bold')
-        plt.axis('equal')
-        
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-        buffer.seek(0)
-        plt.close()
-        return buffer
-    except Exception as e:
-        print(f"Ошибка при создании графика пользователей: {e}")
-        return None
-
-def create_company_status_chart(company_stats):
-    """Создает круговую диаграмму статусов компаний"""
-    try:
-        plt.figure(figsize=(8, 6))
-        plt.pie(
-            company_stats['status_distribution']['data'],
-            labels=company_stats['status_distribution']['labels'],
-            colors=company_stats['status_distribution']['colors'],
-            autopct='%1.1f%%',
-            startangle=90
-        )
-        plt.title('Статусы компаний', fontsize=14, fontweight='bold')
-        plt.axis('equal')
-        
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-        buffer.seek(0)
-        plt.close()
-        return buffer
-    except Exception as e:
-        print(f"Ошибка при создании графика компаний: {e}")
-        return None
-
-def create_vacancy_categories_chart(vacancy_stats):
-    """Создает столбчатую диаграмму категорий вакансий"""
-    try:
-        plt.figure(figsize=(10, 6))
-        bars = plt.bar(
-            vacancy_stats['category']['labels'],
-            vacancy_stats['category']['data'],
-            color=vacancy_stats['category']['colors']
-        )
-        plt.title('Категории вакансий', fontsize=14, fontweight='bold')
-        plt.xlabel('Категории')
-        plt.ylabel('Количество вакансий')
-        plt.xticks(rotation=45, ha='right')
-        
-        for bar in bars:
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{int(height)}',
-                    ha='center', va='bottom')
-        
-        plt.tight_layout()
-        
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-        buffer.seek(0)
-        plt.close()
-        return buffer
-    except Exception as e:
-        print(f"Ошибка при создании графика вакансий: {e}")
-        return None
-
-def create_response_activity_chart(response_stats):
-    """Создает линейный график активности откликов"""
-    try:
-        dates = [day['date'] for day in response_stats['daily_activity']]
-        counts = [day['count'] for day in response_stats['daily_activity']]
-        
-        plt.figure(figsize=(10, 6))
-        plt.plot(dates, counts, marker='o', linewidth=2, markersize=6)
-        plt.title('Активность откликов', fontsize=14, fontweight='bold')
-        plt.xlabel('Дата')
-        plt.ylabel('Количество откликов')
-        plt.grid(True, alpha=0.3)
-        
-        for i, count in enumerate(counts):
-            plt.annotate(str(count), (dates[i], count), 
-                        textcoords="offset points", 
-                        xytext=(0,10), 
-                        ha='center')
-        
-        plt.tight_layout()
-        
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-        buffer.seek(0)
-        plt.close()
-        return buffer
-    except Exception as e:
-        print(f"Ошибка при создании графика откликов: {e}")
-        return None
+@login_required
+@user_passes_test(is_admin)
+def export_table(request, table):
+    """Потоковая выгрузка вакансий, откликов или журнала действий за период"""
+    if table not in TableExport.TABLES:
+        raise Http404("Неизвестная таблица")
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in TableExport.FORMATS:
+        export_format = 'csv'
+    
+    start_date, end_date = get_statistics_period(request)
+    if not (start_date and end_date):
+        start_date = end_date = None
+    else:
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
     
+    return TableExport.export(table, export_format, start_date, end_date)
+
+# Функции для создания графиков (остаются без изменений)
 from django.core.paginator import Paginator
 @login_required
 @admin_required
@@ -1818,258 +1204,15 @@ def send_vacancy_archive_email(vacancy, archive_reason=""):
     try:
         subject = f'Вакансия "{vacancy_title}" перемещена в архив - HR-Lab'
         
-        html_message = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <style>
-                body {{
-                    font-family: 'Inter', 'Arial', sans-serif;
-                    line-height: 1.6;
-                    color: #1e293b;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 0;
-                    background: linear-gradient(135deg, #2563eb 0%, #1e293b 100%);
-                }}
-                .container {{
-                    background: white;
-                    margin: 20px;
-                    border-radius: 20px;
-                    overflow: hidden;
-                    box-shadow: 0 15px 35px rgba(0, 0, 0, 0.2);
-                }}
-                .header {{
-                    background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%);
-                    color: white;
-                    padding: 40px 30px;
-                    text-align: center;
-                }}
-                .header h1 {{
-                    margin: 0;
-                    font-size: 28px;
-                    font-weight: 700;
-                }}
-                .header p {{
-                    margin: 10px 0 0 0;
-                    opacity: 0.9;
-                    font-size: 16px;
-                }}
-                .content {{
-                    padding: 40px 30px;
-                }}
-                .warning-card {{
-                    background: rgba(245, 158, 11, 0.05);
-                    border: 2px solid rgba(245, 158, 11, 0.3);
-                    border-radius: 15px;
-                    padding: 25px;
-                    margin: 25px 0;
-                    text-align: center;
-                }}
-                .warning-icon {{
-                    font-size: 48px;
-                    margin-bottom: 15px;
-                }}
-                .warning-title {{
-                    font-size: 20px;
-                    font-weight: 700;
-                    color: #92400e;
-                    margin-bottom: 10px;
-                }}
-                .warning-description {{
-                    color: #92400e;
-                    font-size: 16px;
-                    line-height: 1.5;
-                }}
-                .vacancy-info {{
-                    background: #f8fafc;
-                    border-radius: 12px;
-                    padding: 20px;
-                    margin: 25px 0;
-                }}
-                .info-item {{
-                    display: flex;
-                    justify-content: space-between;
-                    padding: 10px 0;
-                    border-bottom: 1px solid #e2e8f0;
-                }}
-                .info-item:last-child {{
-                    border-bottom: none;
-                }}
-                .info-label {{
-                    color: #64748b;
-                    font-weight: 500;
-                }}
-                .info-value {{
-                    color: #1e293b;
-                    font-weight: 600;
-                }}
-                .reason-section {{
-                    background: rgba(239, 68, 68, 0.05);
-                    border: 1px solid rgba(239, 68, 68, 0.2);
-                    border-radius: 12px;
-                    padding: 20px;
-                    margin: 20px 0;
-                }}
-                .reason-title {{
-                    color: #dc2626;
-                    font-weight: 600;
-                    margin-bottom: 10px;
-                }}
-                .action-buttons {{
-                    text-align: center;
-                    margin: 30px 0;
-                }}
-                .action-button {{
-                    display: inline-block;
-                    background: linear-gradient(45deg, #2563eb, #1e40af);
-                    color: white;
-                    padding: 14px 32px;
-                    text-decoration: none;
-                    border-radius: 25px;
-                    font-weight: 600;
-                    font-size: 16px;
-                    margin: 10px;
-                    transition: all 0.3s ease;
-                }}
-                .action-button:hover {{
-                    background: linear-gradient(45deg, #1e40af, #2563eb);
-                    transform: translateY(-2px);
-                    box-shadow: 0 5px 15px rgba(37, 99, 235, 0.3);
-                }}
-                .secondary-button {{
-                    background: linear-gradient(45deg, #64748b, #475569);
-                }}
-                .secondary-button:hover {{
-                    background: linear-gradient(45deg, #475569, #64748b);
-                }}
-                .footer {{
-                    background: #f1f5f9;
-                    padding: 30px;
-                    text-align: center;
-                    border-top: 1px solid #e2e8f0;
-                }}
-                .footer p {{
-                    margin: 5px 0;
-                    color: #64748b;
-                    font-size: 14px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>📋 HR-Lab</h1>
-                    <p>Уведомление об архивации вакансии</p>
-                </div>
-                
-                <div class="content">
-                    <h2 style="color: #1e293b; margin-top: 0;">Уважаемый представитель компании {company_name}!</h2>
-                    
-                    <div class="warning-card">
-                        <div class="warning-icon">📁</div>
-                        <div class="warning-title">Вакансия перемещена в архив</div>
-                        <div class="warning-description">
-                            Ваша вакансия "<strong>{vacancy_title}</strong>" была перемещена в архив модератором платформы.
-                        </div>
-                    </div>
-                    
-                    <div class="vacancy-info">
-                        <div class="info-item">
-                            <span class="info-label">Вакансия:</span>
-                            <span class="info-value">{vacancy_title}</span>
-                        </div>
-                        <div class="info-item">
-                            <span class="info-label">Компания:</span>
-                            <span class="info-value">{company_name}</span>
-                        </div>
-                        <div class="info-item">
-                            <span class="info-label">Дата архивации:</span>
-                            <span class="info-value">{timezone.now().strftime('%d.%m.%Y в %H:%M')}</span>
-                        </div>
-                        <div class="info-item">
-                            <span class="info-label">Статус:</span>
-                            <span class="info-value" style="color: #f59e0b; font-weight: 700;">Архивирована</span>
-                        </div>
-                    </div>
-                    
-                    {f'''
-                    <div class="reason-section">
-                        <div class="reason-title">📝 Причина архивации:</div>
-                        <p style="color: #1e293b; margin: 0; line-height: 1.5;">{archive_reason}</p>
-                    </div>
-                    ''' if archive_reason else ''}
-                    
-                    <div class="action-buttons">
-                        <p style="color: #64748b; margin-bottom: 20px;">
-                            Вы можете создать новую вакансию или связаться с поддержкой для уточнения деталей.
-                        </p>
-                        <a href="http://127.0.0.1:8000/create_vacancy/" class="action-button">
-                            📝 Создать новую вакансию
-                        </a>
-                        <a href="http://127.0.0.1:8000/contact/" class="action-button secondary-button">
-                            📞 Связаться с поддержкой
-                        </a>
-                    </div>
-                    
-                    <p style="color: #64748b; font-size: 14px; text-align: center;">
-                        <strong>Важно:</strong> Архивные вакансии не отображаются в поиске и не получают откликов от соискателей.
-                    </p>
-                </div>
-                
-                <div class="footer">
-                    <p><strong>С уважением, команда HR-Lab</strong></p>
-                    <p>Мы заботимся о качестве вакансий на нашей платформе</p>
-                    <div style="margin-top: 15px; padding-top: 15px; border-top: 1px solid #e2e8f0;">
-                        <p>Email: hr-labogency@mail.ru</p>
-                    </div>
-                    <p style="font-size: 12px; margin-top: 20px; color: #94a3b8;">
-                        Это автоматическое сообщение, пожалуйста, не отвечайте на него.
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Текстовая версия
-        plain_message = f"""
-        Уважаемый представитель компании "{company_name}"!
-
-        Ваша вакансия "{vacancy_title}" была перемещена в архив модератором платформы HR-Lab.
-
-        Информация о вакансии:
-        - Вакансия: {vacancy_title}
-        - Компания: {company_name}
-        - Дата архивации: {timezone.now().strftime('%d.%m.%Y в %H:%M')}
-        - Статус: Архивирована
-
-        {f'Причина архивации: {archive_reason}' if archive_reason else ''}
-
-        Важно: Архивные вакансии не отображаются в поиске и не получают откликов от соискателей.
-
-        Вы можете:
-        - Создать новую вакансию: http://127.0.0.1:8000/create_vacancy/
-        - Связаться с поддержкой: http://127.0.0.1:8000/contact/
-
-        С уважением,
-        Команда HR-Lab
-
-        ---
-        Email: hr-labogency@mail.ru
-        """
-
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[company_email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+        plain_message, html_message = EmailRenderer.render('vacancy_archive', {
+            'company_name': company_name,
+            'vacancy_title': vacancy_title,
+            'archive_reason': archive_reason,
+            'archived_at': vacancy.archived_at or timezone.now(),
+        })
+        EmailOutboxService.enqueue(subject, plain_message, company_email, html_message)
         
-        print(f"✅ [EMAIL] Уведомление об архивации отправлено для {vacancy_title}")
+        print(f"✅ [EMAIL] Уведомление об архивации поставлено в очередь для {vacancy_title}")
         return True
         
     except Exception as e:
@@ -2100,10 +1243,11 @@ def archive_vacancy(request, vacancy_id):
         vacancy.status = archived_status
         vacancy.archived_at = timezone.now()
         vacancy.archive_reason = archive_reason
-        vacancy.save()
-        
-        # Отправляем email уведомление
-        email_sent = send_vacancy_archive_email(vacancy, archive_reason)
+        # Письмо ставится в очередь в одной транзакции с архивацией
+        with transaction.atomic():
+            vacancy.save()
+            email_sent = send_vacancy_archive_email(vacancy, archive_reason)
+        VacancyDetailCache.invalidate(vacancy)
         
         # Создаем лог действия
         AdminLog.objects.create(
@@ -2146,6 +1290,7 @@ def unarchive_vacancy(request, vacancy_id):
         vacancy.archived_at = None
         vacancy.archive_reason = ''
         vacancy.save()
+        VacancyDetailCache.invalidate(vacancy)
         
         # Создаем лог действия
         AdminLog.objects.create(
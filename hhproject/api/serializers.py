@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from home.models import *
+from home.interactions import ApplicantInteractionMap
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, validators=[validate_password])
@@ -83,7 +84,34 @@ class StatusResponseSerializer(serializers.ModelSerializer):
         model = StatusResponse
         fields = '__all__'
 
-class VacancyListSerializer(serializers.ModelSerializer):
+class ApplicantInteractionMixin:
+    """
+    Отклики и избранное текущего соискателя. В списке вакансий (many=True)
+    карта строится один раз на все вакансии ответа; если сериализатор
+    вложен в другой (например, в избранное), родитель может заранее
+    положить карту в context['interactions'], иначе флаги считаются для
+    каждой вакансии отдельно.
+    """
+
+    def interaction_user(self):
+        request = self.context.get('request')
+        return request.user if request else None
+
+    def get_interactions(self, obj):
+        if 'interactions' in self.context:
+            return self.context['interactions']
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer) and parent.instance is not None:
+            vacancies = list(parent.instance)
+            if all(isinstance(vacancy, Vacancy) for vacancy in vacancies):
+                self.context['interactions'] = ApplicantInteractionMap.for_user(self.interaction_user(), vacancies)
+                return self.context['interactions']
+        if parent is None and self.instance is obj:
+            self.context['interactions'] = ApplicantInteractionMap.for_user(self.interaction_user(), [obj])
+            return self.context['interactions']
+        return ApplicantInteractionMap.for_user(self.interaction_user(), [obj])
+
+class VacancyListSerializer(ApplicantInteractionMixin, serializers.ModelSerializer):
     company_name = serializers.CharField(source='company.name', read_only=True)
     work_conditions_name = serializers.CharField(source='work_conditions.work_conditions_name', read_only=True)
     status_name = serializers.CharField(source='status.status_vacancies_name', read_only=True)
@@ -96,16 +124,9 @@ class VacancyListSerializer(serializers.ModelSerializer):
                  'status_name', 'views', 'created_date', 'is_favorite')
     
     def get_is_favorite(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            try:
-                applicant = request.user.applicant
-                return obj.favorites_set.filter(applicant=applicant).exists()
-            except Applicant.DoesNotExist:
-                return False
-        return False
-
-class VacancyDetailSerializer(serializers.ModelSerializer):
+        return self.get_interactions(obj).is_favorite(obj)
+
+class VacancyDetailSerializer(ApplicantInteractionMixin, serializers.ModelSerializer):
     company_name = serializers.CharField(source='company.name', read_only=True)
     work_conditions_name = serializers.CharField(source='work_conditions.work_conditions_name', read_only=True)
     status_name = serializers.CharField(source='status.status_vacancies_name', read_only=True)
@@ -117,24 +138,10 @@ class VacancyDetailSerializer(serializers.ModelSerializer):
         fields = '__all__'
     
     def get_has_applied(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            try:
-                applicant = request.user.applicant
-                return Response.objects.filter(applicants=applicant, vacancy=obj).exists()
-            except Applicant.DoesNotExist:
-                return False
-        return False
+        return self.get_interactions(obj).has_applied(obj)
     
     def get_is_favorite(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            try:
-                applicant = request.user.applicant
-                return Favorites.objects.filter(applicant=applicant, vacancy=obj).exists()
-            except Applicant.DoesNotExist:
-                return False
-        return False
+        return self.get_interactions(obj).is_favorite(obj)
 
 class ComplaintSerializer(serializers.ModelSerializer):
     complainant_email = serializers.CharField(source='complainant.email', read_only=True)
@@ -164,6 +171,17 @@ class FavoritesSerializer(serializers.ModelSerializer):
         model = Favorites
         fields = ('id', 'vacancy', 'vacancy_details', 'added_date')
         read_only_fields = ('added_date',)
+    
+    def to_representation(self, instance):
+        # В списке избранного карта взаимодействий строится сразу по всем вакансиям
+        parent = self.parent
+        if 'interactions' not in self.context and isinstance(parent, serializers.ListSerializer) \
+                and parent.instance is not None:
+            request = self.context.get('request')
+            self.context['interactions'] = ApplicantInteractionMap.for_user(
+                request.user if request else None, [favorite.vacancy_id for favorite in parent.instance]
+            )
+        return super().to_representation(instance)
 
 class AdminLogSerializer(serializers.ModelSerializer):
     admin_username = serializers.CharField(source='admin.username', read_only=True)
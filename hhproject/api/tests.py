@@ -281,6 +281,55 @@ class VacancyViewSetTest(BaseAPITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+class VacancySerializerInteractionTest(BaseAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.second_vacancy = Vacancy.objects.create(
+            company=self.company,
+            work_conditions=self.work_condition,
+            position='Java Developer',
+            description='Test description',
+            requirements='Test requirements',
+            salary_min=50000,
+            salary_max=100000,
+            status=self.vacancy_status
+        )
+        Favorites.objects.create(applicant=self.applicant, vacancy=self.second_vacancy)
+        Response.objects.create(applicants=self.applicant, vacancy=self.vacancy, status=self.response_status)
+        request = APIClient().get('/').wsgi_request
+        request.user = self.applicant_user
+        self.context = {'request': request}
+
+    def test_list_serializer_loads_favorites_once(self):
+        """Тест избранного в списке вакансий одним запросом"""
+        vacancies = list(Vacancy.objects.select_related('company', 'work_conditions', 'status').order_by('id'))
+        with self.assertNumQueries(2):
+            data = VacancyListSerializer(vacancies, many=True, context=self.context).data
+        self.assertEqual([item['is_favorite'] for item in data], [False, True])
+        print("✅ test_list_serializer_loads_favorites_once - ПРОЙДЕН")
+
+    def test_detail_serializer_interactions(self):
+        """Тест отклика и избранного в детальной вакансии"""
+        data = VacancyDetailSerializer(self.vacancy, context=self.context).data
+        self.assertTrue(data['has_applied'])
+        self.assertFalse(data['is_favorite'])
+        print("✅ test_detail_serializer_interactions - ПРОЙДЕН")
+
+    def test_favorites_serializer_interactions(self):
+        """Тест флагов вакансии, вложенной в избранное (список и одна запись)"""
+        favorite = Favorites.objects.get(vacancy=self.second_vacancy)
+        data = FavoritesSerializer(favorite, context=self.context).data
+        self.assertTrue(data['vacancy_details']['is_favorite'])
+
+        Favorites.objects.create(applicant=self.applicant, vacancy=self.vacancy)
+        favorites = list(Favorites.objects.select_related(
+            'vacancy__company', 'vacancy__work_conditions', 'vacancy__status'
+        ).order_by('id'))
+        with self.assertNumQueries(2):
+            data = FavoritesSerializer(favorites, many=True, context=dict(self.context)).data
+        self.assertEqual([item['vacancy_details']['is_favorite'] for item in data], [True, True])
+        print("✅ test_favorites_serializer_interactions - ПРОЙДЕН")
+
 class ApplicantViewSetTest(BaseAPITestCase):
     def test_list_applicants(self):
         """Тест получения списка соискателей"""
@@ -2,6 +2,7 @@ from rest_framework import viewsets
 from rest_framework.response import Response
 from .permissions import IsSuperUser
 from .serializers import *
+from home.search import VacancySearchService
 
 class CompanyViewSet(viewsets.ModelViewSet):
     queryset = Company.objects.all()
@@ -16,6 +17,17 @@ class VacancyViewSet(viewsets.ModelViewSet):
         if self.action == 'list':
             return VacancyListSerializer
         return VacancyDetailSerializer
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            return queryset
+        
+        # Те же параметры поиска и фильтров, что и на странице vakansii/
+        queryset = queryset.select_related('company', 'work_conditions', 'status')
+        queryset = VacancySearchService.apply_filters(queryset, self.request.query_params)
+        sort_by = VacancySearchService.get_sort(self.request.query_params)
+        return VacancySearchService.apply_sort(queryset, sort_by)
 
 class ApplicantViewSet(viewsets.ModelViewSet):
     queryset = Applicant.objects.all()
@@ -1,3 +1,253 @@
+from datetime import date
+from unittest.mock import patch
+
+from django.core import mail
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from home.models import *
+from home.response_counts import ResponseStatusChoices, ResponseStatusCounts
+
+
+class ResponsesListCountsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.company_user = User.objects.create_user(
+            email='company@example.com',
+            username='companyuser',
+            phone='+77777777777',
+            password='testpass123',
+            user_type='company'
+        )
+        self.company = Company.objects.create(
+            user=self.company_user,
+            name='Test Company',
+            number='1234567890',
+            industry='IT',
+            description='Test description',
+            status=Company.STATUS_APPROVED
+        )
+        work_condition = WorkConditions.objects.create(work_conditions_name='Офис')
+        vacancy_status = StatusVacancies.objects.create(status_vacancies_name='Активна')
+        self.vacancy = Vacancy.objects.create(
+            company=self.company,
+            work_conditions=work_condition,
+            position='Python Developer',
+            description='Test description',
+            requirements='Test requirements',
+            salary_min=50000,
+            salary_max=100000,
+            status=vacancy_status
+        )
+        self.statuses = {
+            key: StatusResponse.objects.create(status_response_name=name)
+            for key, name in ResponseStatusCounts.STATUSES.items()
+        }
+        self.responses = [self.create_response(i, 'new') for i in range(3)]
+        self.create_response(3, 'rejected')
+        self.client.force_login(self.company_user)
+
+    def create_response(self, index, status_key):
+        user = User.objects.create_user(
+            email=f'applicant{index}@example.com',
+            username=f'applicant{index}',
+            phone=f'+7666666666{index}',
+            password='testpass123',
+            user_type='applicant'
+        )
+        applicant = Applicant.objects.create(
+            user=user, first_name='John', last_name='Doe', birth_date=date(1990, 1, 1)
+        )
+        return Response.objects.create(applicants=applicant, vacancy=self.vacancy, status=self.statuses[status_key])
+
+    def test_counts_in_single_query(self):
+        """Тест подсчета откликов по статусам одним запросом"""
+        with self.assertNumQueries(1):
+            counts = ResponseStatusCounts.get(self.company.pk)
+        self.assertEqual(counts, {'total': 4, 'new': 3, 'viewed': 0, 'invited': 0, 'rejected': 1})
+        with self.assertNumQueries(0):
+            ResponseStatusCounts.get(self.company.pk)
+        print("✅ test_counts_in_single_query - ПРОЙДЕН")
+
+    def test_status_update_adjusts_counts(self):
+        """Тест изменения счетчиков при смене статуса отклика"""
+        response = self.client.get(reverse('responses_list'))
+        self.assertEqual(response.context['counts']['new'], 3)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse('responses_list'),
+                {'response_id': self.responses[0].pk, 'status': self.statuses['invited'].pk},
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+            )
+        # Счетчики меняются через incr/decr, без повторного подсчета откликов
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(
+            response.json()['counts'],
+            {'total': 4, 'new': 2, 'viewed': 0, 'invited': 1, 'rejected': 1}
+        )
+        self.assertEqual(ResponseStatusCounts.compute(self.company.pk), response.json()['counts'])
+        print("✅ test_status_update_adjusts_counts - ПРОЙДЕН")
+
+    def test_new_response_resets_counts(self):
+        """Тест пересчета счетчиков после нового отклика"""
+        ResponseStatusCounts.get(self.company.pk)
+        self.create_response(4, 'new')
+        self.assertEqual(ResponseStatusCounts.get(self.company.pk)['new'], 4)
+        print("✅ test_new_response_resets_counts - ПРОЙДЕН")
+
+    def test_status_change_outside_view_updates_counts(self):
+        """Тест обновления счетчиков при смене статуса отклика вне страницы откликов"""
+        ResponseStatusCounts.get(self.company.pk)
+        response = Response.objects.get(pk=self.responses[0].pk)
+        response.status = self.statuses['invited']
+        response.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(ResponseStatusCounts.get(self.company.pk)['invited'], 1)
+
+        # Каскадное удаление не загружает вакансию для каждого отклика
+        ResponseStatusCounts.get(self.company.pk)
+        with CaptureQueriesContext(connection) as queries:
+            self.vacancy.delete()
+        self.assertFalse(any(
+            query['sql'].startswith('SELECT') and 'FROM "vacancies"' in query['sql']
+            for query in queries.captured_queries
+        ))
+        self.assertEqual(ResponseStatusCounts.get(self.company.pk)['total'], 0)
+        print("✅ test_status_change_outside_view_updates_counts - ПРОЙДЕН")
+
+    def test_responses_paginated_by_cursor(self):
+        """Тест постраничной загрузки откликов по курсору"""
+        with patch('compani.views.RESPONSES_PER_PAGE', 3):
+            response = self.client.get(reverse('responses_list'))
+            first_page = list(response.context['responses'])
+            self.assertEqual(len(first_page), 3)
+            self.assertContains(response, '<select name="status"', count=3)
+            self.assertContains(response, 'load-more-responses')
+
+            data = self.client.get(
+                reverse('responses_list_page'),
+                {'cursor': response.context['page'].next_cursor},
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+            ).json()
+        self.assertIsNone(data['next_cursor'])
+        self.assertEqual(data['rows_html'].count('<tr>'), 1)
+        self.assertNotIn(f'data-response-id="{first_page[-1].pk}"', data['rows_html'])
+        print("✅ test_responses_paginated_by_cursor - ПРОЙДЕН")
+
+    def test_status_choices_cached(self):
+        """Тест кэширования вариантов статуса отклика"""
+        self.client.get(reverse('responses_list'))
+        with self.assertNumQueries(0):
+            choices = ResponseStatusChoices.get()
+        self.assertEqual([name for _, name in choices], list(ResponseStatusCounts.STATUSES.values()))
+
+        StatusResponse.objects.create(status_response_name='Принято')
+        self.assertEqual(len(ResponseStatusChoices.get()), len(ResponseStatusCounts.STATUSES) + 1)
+        print("✅ test_status_choices_cached - ПРОЙДЕН")
+
+    def test_bulk_status_update(self):
+        """Тест массовой смены статуса откликов одним UPDATE"""
+        ResponseStatusCounts.get(self.company.pk)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse('responses_bulk_update'),
+                {
+                    'response_ids': [r.pk for r in self.responses],
+                    'status': self.statuses['invited'].pk,
+                },
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+            )
+        data = response.json()
+        self.assertEqual(data['updated'], 3)
+        self.assertEqual(data['counts'], {'total': 4, 'new': 0, 'viewed': 0, 'invited': 3, 'rejected': 1})
+        self.assertEqual(data['counts'], ResponseStatusCounts.compute(self.company.pk))
+        updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "responses"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(AdminLog.objects.filter(action__code='response_status_updated').count(), 3)
+        self.assertEqual(EmailOutbox.objects.filter(status=EmailOutbox.STATUS_PENDING).count(), 3)
+        self.assertEqual(len(mail.outbox), 0)
+        print("✅ test_bulk_status_update - ПРОЙДЕН")
+
+
+class ChangePasswordRequestTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='company@example.com',
+            username='companyuser',
+            phone='+77777777777',
+            password='testpass123',
+            user_type='company'
+        )
+
+    def test_reset_link_queued(self):
+        """Тест постановки письма со ссылкой сброса пароля в очередь"""
+        response = self.client.post(reverse('change_password_request'), {'email': self.user.email})
+        self.assertRedirects(response, reverse('company_profile'), fetch_redirect_response=False)
+        self.assertIn('change-password', EmailOutbox.objects.get().body)
+        print("✅ test_reset_link_queued - ПРОЙДЕН")
+
+    def test_enqueue_failure_shows_form_error(self):
+        """Тест ошибки постановки письма в очередь без ошибки 500"""
+        # Шаблона формы запроса в проекте нет, проверяем только ответ представления
+        with patch('compani.views.EmailOutboxService.enqueue', side_effect=Exception('database is down')), \
+                patch('compani.views.render', return_value=HttpResponse()) as render:
+            response = self.client.post(reverse('change_password_request'), {'email': self.user.email})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(render.call_args.args[1], 'compani/profile/change_password_request.html')
+        self.assertIn(
+            'Не удалось поставить письмо в очередь отправки: database is down',
+            [str(message) for message in get_messages(render.call_args.args[0])]
+        )
+        self.assertFalse(AdminLog.objects.filter(action__code='password_reset_requested').exists())
+        print("✅ test_enqueue_failure_shows_form_error - ПРОЙДЕН")
+
+
+class VacancyListSearchTest(TestCase):
+    def setUp(self):
+        self.company_user = User.objects.create_user(
+            email='company@example.com',
+            username='companyuser',
+            phone='+77777777777',
+            password='testpass123',
+            user_type='company'
+        )
+        self.company = Company.objects.create(
+            user=self.company_user,
+            name='Программисты',
+            number='1234567890',
+            industry='IT',
+            description='Test description',
+            status=Company.STATUS_APPROVED
+        )
+        work_condition = WorkConditions.objects.create(work_conditions_name='Офис')
+        vacancy_status = StatusVacancies.objects.create(status_vacancies_name='Активна')
+        self.vacancies = {
+            position: Vacancy.objects.create(
+                company=self.company,
+                work_conditions=work_condition,
+                position=position,
+                description='Описание',
+                requirements='Требования',
+                salary_min=50000,
+                salary_max=100000,
+                status=vacancy_status
+            )
+            for position in ('Программист Python', 'Маркетолог', 'Дизайнер')
+        }
+        self.client.force_login(self.company_user)
+
+    def search(self, text):
+        response = self.client.get(reverse('vacancy_list'), {'search': text})
+        return {vacancy.position for vacancy in response.context['vacancies']}
 
-# Create your tests here.
+    def test_fuzzy_fallback_ignores_company_name(self):
+        """Тест нечеткого поиска в списке компании без учета ее названия"""
+        self.assertEqual(self.search('програмист'), {'Программист Python'})
+        self.assertEqual(self.search('програмисты'), {'Программист Python'})
+        print("✅ test_fuzzy_fallback_ignores_company_name - ПРОЙДЕН")
@@ -18,6 +18,8 @@ urlpatterns = [
     path('archive-vacancy/<int:vacancy_id>/', archive_vacancy, name='archive_vacancy'),
     path('unarchive-vacancy/<int:vacancy_id>/', unarchive_vacancy, name='unarchive_vacancy'),
     path('responses/', responses_list, name='responses_list'),
+    path('responses/page/', responses_list_page, name='responses_list_page'),
+    path('responses/bulk-status/', responses_bulk_update, name='responses_bulk_update'),
     path('account/pending/', account_pending, name='account_pending'),
     path('vacancy/<int:vacancy_id>/edit/', edit_vacancy, name='edit_vacancy'),
     path('employee/profile/', employee_profile, name='employee_profile'),
@@ -5,17 +5,25 @@ from home.models import *
 from django.views.generic import CreateView, UpdateView
 from django.contrib.auth import login, update_session_auth_hash, authenticate
 from django.contrib import messages
-from django.core.mail import send_mail, get_connection
 from django.conf import settings
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.contrib.auth.tokens import default_token_generator
-from smtplib import SMTPAuthenticationError, SMTPServerDisconnected, SMTPConnectError
 from .forms import *
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
-from better_profanity import profanity
+from django.template.loader import render_to_string
+from django.db import transaction
 from django.db.models import Count, Q
+from home.counters import PlatformCounters
+from home.detail_cache import VacancyDetailCache
+from home.email_outbox import EmailOutboxService
+from home.emails import EmailRenderer
+from home.moderation import VACANCY_TEXT_FIELDS, ProfanityMatcher
+from home.pagination import KeysetPaginator
+from home.response_counts import ResponseStatusChoices, ResponseStatusCounts
+from home.response_status import ResponseBulkStatusUpdate, ResponseStatusNotifications
+from home.search import VacancySearchService
 
 # Функции для логирования
 def get_client_ip(request):
@@ -78,16 +86,10 @@ def home_comp(request):
     """
     Главная страница для компаний и HR-агентов
     """
-    active_applicants_count = Applicant.objects.count()
-    print(active_applicants_count)
-    successful_hires_count = Response.objects.filter(
-        status__status_response_name='Приглашение'  
-    ).count()
+    counters = PlatformCounters.get()
     
-    total_companies = Company.objects.count()
-    returning_companies = Company.objects.annotate(
-        vacancy_count=Count('vacancy')
-    ).filter(vacancy_count__gt=1).count()
+    total_companies = counters['total_companies_count']
+    returning_companies = counters['returning_companies_count']
     
     if total_companies > 0:
         returning_companies_percentage = int((returning_companies / total_companies) * 100)
@@ -97,8 +99,8 @@ def home_comp(request):
     avg_hire_time = 48 
     
     context = {
-        'active_applicants_count': active_applicants_count,
-        'successful_hires_count': successful_hires_count,
+        'active_applicants_count': counters['applicants_count'],
+        'successful_hires_count': counters['successful_hires_count'],
         'returning_companies_percentage': returning_companies_percentage,
         'avg_hire_time': avg_hire_time,
     }
@@ -295,19 +297,10 @@ def change_password_request(request):
                     f'С уважением,\nКоманда HR-Lab'
                 )
                 try:
-                    print(f"Attempting to send email to {email} with host {settings.EMAIL_HOST}:{settings.EMAIL_PORT}")
-                    connection = get_connection()
-                    connection.open()
-                    send_mail(
-                        subject,
-                        message,
-                        settings.DEFAULT_FROM_EMAIL,
-                        [email],
-                        fail_silently=False,
-                        connection=connection,
-                    )
-                    connection.close()
-                    
+                    EmailOutboxService.enqueue(subject, message, email)
+                except Exception as e:
+                    messages.error(request, f'Не удалось поставить письмо в очередь отправки: {str(e)}')
+                else:
                     # Логирование запроса смены пароля
                     log_user_action(
                         user=user,
@@ -319,14 +312,6 @@ def change_password_request(request):
                     
                     messages.success(request, 'Письмо с инструкциями по сбросу пароля отправлено на ваш email.')
                     return redirect('company_profile')
-                except SMTPAuthenticationError as e:
-                    messages.error(request, 'Ошибка аутентификации SMTP. Проверьте email или пароль приложения в настройках Яндекса.')
-                except SMTPConnectError as e:
-                    messages.error(request, 'Не удалось подключиться к SMTP-серверу Яндекса. Проверьте настройки хоста и порта.')
-                except SMTPServerDisconnected as e:
-                    messages.error(request, 'Соединение с SMTP-сервером прервано. Попробуйте снова.')
-                except Exception as e:
-                    messages.error(request, f'Неизвестная ошибка при отправке письма: {str(e)}')
             else:
                 messages.error(request, 'Пользователь с таким email не найден.')
     else:
@@ -476,25 +461,6 @@ def hr_agent_edit(request, employee_id):
 
     return render(request, 'compani/hrCRUD/hr_agent_form.html', {'form': form, 'title': 'Редактировать HR-агента', 'employee': employee})
 
-def setup_profanity_filter():
-    """
-    Настройка фильтра нецензурной лексики
-    """
-    profanity.load_censor_words()
-    
-    russian_bad_words = [
-        'блять', 'блядь', 'хуй', 'пизда', 'ебать', 'ебал', 
-        'нахуй', 'нихуя', 'хуё', 'пиздец', 'оху', 'мудак',
-        'сука', 'бля', 'ебу', 'ёб', 'заеб', 'уеб', 'гандон',
-        'пидор', 'шлюха', 'долбоёб', 'мразь', 'ублюдок',
-        'фывфыв'
-    ]
-    
-    profanity.add_censor_words(russian_bad_words)
-    return profanity
-
-profanity_filter = setup_profanity_filter()
-
 @login_required
 def create_vacancy(request):
     """
@@ -555,21 +521,13 @@ def check_vacancy_for_profanity(data):
     """
     Проверка вакансии на нецензурную лексику
     """
-    fields_to_check = {
-        'position': 'Должность',
-        'description': 'Описание вакансии', 
-        'requirements': 'Требования',
-        'city': 'Город',
-        'work_conditions_details': 'Детали условий работы'
-    }
-    
     errors = {}
     
-    for field_key, field_name in fields_to_check.items():
+    for field_key, field_name in VACANCY_TEXT_FIELDS.items():
         if field_key in data and data[field_key]:
             field_value = str(data[field_key])
             
-            if profanity_filter.contains_profanity(field_value):
+            if ProfanityMatcher.default().contains_profanity(field_value):
                 errors[field_key] = f'Поле "{field_name}" содержит недопустимые слова. Пожалуйста, переформулируйте текст.'
     
     return errors
@@ -597,6 +555,7 @@ def edit_vacancy(request, vacancy_id):
             else:
                 vacancy.company = employee.company
             vacancy.save()
+            VacancyDetailCache.invalidate(vacancy)
             
             # Логирование редактирования вакансии
             log_user_action(
@@ -637,6 +596,7 @@ def archive_vacancy(request, vacancy_id):
         archived_status = StatusVacancies.objects.get(status_vacancies_name='Архивирована')
         vacancy.status = archived_status
         vacancy.save()
+        VacancyDetailCache.invalidate(vacancy)
         
         # Логирование архивирования вакансии
         log_user_action(
@@ -680,6 +640,7 @@ def unarchive_vacancy(request, vacancy_id):
         active_status = StatusVacancies.objects.get(status_vacancies_name='Активна')
         vacancy.status = active_status
         vacancy.save()
+        VacancyDetailCache.invalidate(vacancy)
         
         # Логирование разархивирования вакансии
         log_user_action(
@@ -713,12 +674,15 @@ def vacancy_list(request):
     
     search_query = request.GET.get('search', '')
     if search_query:
-        vacancies = vacancies.filter(
+        matched = vacancies.filter(
             Q(position__icontains=search_query) |
             Q(city__icontains=search_query) |
             Q(description__icontains=search_query) |
             Q(requirements__icontains=search_query)
         )
+        # При опечатке в запросе ("програмист") дополняем выдачу нечеткими совпадениями.
+        # Список уже ограничен одной компанией, поэтому ее название не учитывается
+        vacancies = VacancySearchService.with_fuzzy_fallback(vacancies, matched, search_query, ('position',))
     
     status_filter = request.GET.get('status', 'all')
     if status_filter != 'all':
@@ -753,6 +717,38 @@ def vacancy_list(request):
     }
     return render(request, 'compani/vacancy/vacancy_list.html', context)
 
+# Количество откликов, подгружаемых на странице откликов за один раз
+RESPONSES_PER_PAGE = 20
+
+
+def get_responses_company(user):
+    """Компания пользователя для работы с откликами или None"""
+    try:
+        if user.user_type == 'company':
+            return Company.objects.get(user=user)
+        if user.user_type == 'hragent':
+            return Employee.objects.select_related('company').get(user=user).company
+    except (Company.DoesNotExist, Employee.DoesNotExist):
+        pass
+    return None
+
+
+def get_responses_page(request, company, status_filter):
+    """
+    Страница откликов компании, упорядоченная по дате отклика.
+    Следующие страницы выбираются по курсору из GET-параметра cursor.
+    """
+    responses = Response.objects.filter(vacancy__company=company).select_related(
+        'applicants__user', 'vacancy__company', 'status'
+    )
+    if status_filter in ResponseStatusCounts.STATUSES:
+        responses = responses.filter(
+            status__status_response_name=ResponseStatusCounts.STATUSES[status_filter]
+        )
+    paginator = KeysetPaginator(responses, 'response_date', RESPONSES_PER_PAGE, with_count=False)
+    return paginator.get_page(request.GET.get('cursor'))
+
+
 @login_required
 def responses_list(request):
     """
@@ -762,44 +758,15 @@ def responses_list(request):
         messages.error(request, 'У вас нет доступа к просмотру откликов.')
         return redirect('home_comp')
 
-    try:
-        if request.user.user_type == 'company':
-            company = Company.objects.get(user=request.user)
-        elif request.user.user_type == 'hragent':
-            employee = Employee.objects.get(user=request.user)
-            company = employee.company
-    except (Company.DoesNotExist, Employee.DoesNotExist):
+    company = get_responses_company(request.user)
+    if company is None:
         messages.error(request, 'У вас нет компании для просмотра откликов.')
         return redirect('home_comp')
 
-    # Получаем все отклики на вакансии компании
-    responses = Response.objects.filter(vacancy__company=company).select_related(
-        'applicants', 'vacancy', 'status'
-    ).order_by('-response_date')
-
-    # Статистика по статусам
-    counts = {
-        'total': responses.count(),
-        'new': responses.filter(status__status_response_name='Новый').count(),
-        'viewed': responses.filter(status__status_response_name='Просмотрен').count(),
-        'invited': responses.filter(status__status_response_name='Приглашен').count(),
-        'rejected': responses.filter(status__status_response_name='Отклонен').count(),
-    }
-
     # Фильтрация по статусу
     status_filter = request.GET.get('status', 'all')
     current_status = status_filter
 
-    if status_filter != 'all':
-        status_mapping = {
-            'new': 'Новый',
-            'viewed': 'Просмотрен', 
-            'invited': 'Приглашен',
-            'rejected': 'Отклонен'
-        }
-        if status_filter in status_mapping:
-            responses = responses.filter(status__status_response_name=status_mapping[status_filter])
-
     # Обработка AJAX запросов для обновления статуса
     if request.method == 'POST':
         response_id = request.POST.get('response_id')
@@ -810,11 +777,17 @@ def responses_list(request):
         
         form = ResponseStatusUpdateForm(request.POST, instance=response)
         if form.is_valid():
-            form.save()
-            
-            # Получаем новый статус после сохранения
-            response.refresh_from_db()
-            new_status_name = response.status.status_response_name
+            # Письмо ставится в очередь в одной транзакции со сменой статуса
+            with transaction.atomic():
+                form.save()
+                
+                # Получаем новый статус после сохранения
+                response.refresh_from_db()
+                new_status_name = response.status.status_response_name
+                email_sent = False
+                if old_status_name != new_status_name:
+                    email_sent = send_response_status_email(response, old_status_name, new_status_name)
+            # Счетчики статусов обновляет сигнал post_save отклика через incr/decr
             
             # Логирование изменения статуса отклика
             log_user_action(
@@ -827,21 +800,10 @@ def responses_list(request):
                 request=request
             )
             
-            # Отправляем письмо только если статус действительно изменился
-            email_sent = False
-            if old_status_name != new_status_name:
-                email_sent = send_response_status_email(response, old_status_name, new_status_name)
-            
             # Для AJAX запросов
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                 # Обновляем статистику
-                updated_counts = {
-                    'total': Response.objects.filter(vacancy__company=company).count(),
-                    'new': Response.objects.filter(vacancy__company=company, status__status_response_name='Новый').count(),
-                    'viewed': Response.objects.filter(vacancy__company=company, status__status_response_name='Просмотрен').count(),
-                    'invited': Response.objects.filter(vacancy__company=company, status__status_response_name='Приглашен').count(),
-                    'rejected': Response.objects.filter(vacancy__company=company, status__status_response_name='Отклонен').count(),
-                }
+                updated_counts = ResponseStatusCounts.get(company.pk)
                 
                 if email_sent:
                     return JsonResponse({
@@ -880,32 +842,86 @@ def responses_list(request):
             return JsonResponse({'status': 'success'})
         return redirect('responses_list')
 
-    # Подготавливаем данные для шаблона
-    response_data = []
-    for response in responses:
-        form = ResponseStatusUpdateForm(instance=response)
-        response_data.append({
-            'response': response,
-            'form': form
-        })
+    # Статистика по статусам
+    counts = ResponseStatusCounts.get(company.pk)
+    page = get_responses_page(request, company, status_filter)
 
     context = {
         'company': company,
-        'response_data': response_data,
+        'responses': page.object_list,
+        'page': page,
+        'status_choices': ResponseStatusChoices.get(),
         'counts': counts,
         'current_status': current_status,
     }
     return render(request, 'compani/responses_list.html', context)
 
+
+@login_required
+def responses_list_page(request):
+    """
+    Следующая страница откликов для бесконечной прокрутки (AJAX)
+    """
+    if request.user.user_type not in ['company', 'hragent']:
+        return JsonResponse({'status': 'error', 'message': 'Нет доступа к откликам.'}, status=403)
+
+    company = get_responses_company(request.user)
+    if company is None:
+        return JsonResponse({'status': 'error', 'message': 'Компания не найдена.'}, status=404)
+
+    page = get_responses_page(request, company, request.GET.get('status', 'all'))
+    context = {
+        'responses': page.object_list,
+        'status_choices': ResponseStatusChoices.get(),
+    }
+    return JsonResponse({
+        'status': 'success',
+        'rows_html': render_to_string('compani/responses/_rows.html', context, request=request),
+        'modals_html': render_to_string('compani/responses/_modals.html', context, request=request),
+        'next_cursor': page.next_cursor,
+    })
+
+@login_required
+def responses_bulk_update(request):
+    """
+    Массовая смена статуса выбранных откликов (AJAX)
+    """
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': 'Метод не поддерживается.'}, status=405)
+    if request.user.user_type not in ['company', 'hragent']:
+        return JsonResponse({'status': 'error', 'message': 'Нет доступа к откликам.'}, status=403)
+
+    company = get_responses_company(request.user)
+    if company is None:
+        return JsonResponse({'status': 'error', 'message': 'Компания не найдена.'}, status=404)
+
+    try:
+        response_ids = [int(response_id) for response_id in request.POST.getlist('response_ids')]
+        new_status = StatusResponse.objects.get(pk=request.POST.get('status'))
+    except (ValueError, TypeError, StatusResponse.DoesNotExist):
+        return JsonResponse({'status': 'error', 'message': 'Некорректные отклики или статус.'}, status=400)
+
+    updated = ResponseBulkStatusUpdate.apply(
+        company,
+        response_ids,
+        new_status,
+        request.user,
+        ip_address=get_client_ip(request),
+        user_agent=request.META.get('HTTP_USER_AGENT', '')
+    )
+    return JsonResponse({
+        'status': 'success',
+        'message': f'Статус обновлен у откликов: {updated}.',
+        'updated': updated,
+        'counts': ResponseStatusCounts.get(company.pk),
+    })
+
 def send_response_status_email(response, old_status_name, new_status_name):
     """
     Отправляет письмо соискателю при изменении статуса отклика
     """
-    # ... существующий код отправки email без изменений ...
-    # (оставляю существующую функцию без изменений, так как она уже работает)
-    
     try:
-        # ... существующий код ...
+        EmailOutboxService.enqueue(*ResponseStatusNotifications.build_message(response, old_status_name, new_status_name))
         return True
     except Exception as e:
         print(f"❌ [EMAIL] ОШИБКА отправки уведомления о статусе отклика: {str(e)}")
@@ -964,11 +980,16 @@ def send_hr_agent_credentials(hr_agent, password, company_name):
     """
     Отправка учетных данных HR-агенту
     """
-    # ... существующий код отправки email без изменений ...
-    # (оставляю существующую функцию без изменений)
-    
     try:
-        # ... существующий код ...
+        subject = f'Доступ к кабинету компании {company_name} на HR-Lab'
+        body, _ = EmailRenderer.render('hr_agent_credentials', {
+            'first_name': hr_agent.first_name,
+            'company_name': company_name,
+            'login': hr_agent.user.email,
+            'password': password,
+        })
+        # Текст письма с паролем стирается из очереди после отправки
+        EmailOutboxService.enqueue(subject, body, hr_agent.user.email)
         return True
     except Exception as e:
         print(f"❌ [EMAIL] ОШИБКА отправки данных HR-агенту: {str(e)}")
@@ -33,6 +33,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'home',
     'phonenumber_field',
     'compani',
@@ -93,6 +94,9 @@ WSGI_APPLICATION = 'hhproject.wsgi.application'
 
 
 # Database
+# Порог оператора %> (pg_trgm) для нечеткого поиска вакансий, см. home/search.py
+TRIGRAM_WORD_SIMILARITY_THRESHOLD = config('TRIGRAM_WORD_SIMILARITY_THRESHOLD', default=0.4, cast=float)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -101,9 +105,57 @@ DATABASES = {
         'NAME': config('DB_NAME', default='kursa2'),
         'USER': config('DB_USER', default='postgres'),
         'PASSWORD': config('DB_PASSWORD', default=''),
+        'OPTIONS': {
+            'options': f'-c pg_trgm.word_similarity_threshold={TRIGRAM_WORD_SIMILARITY_THRESHOLD}',
+        },
+    }
+}
+
+# Cache
+# Счетчики просмотров, снимки статистики и кэши страниц должны быть общими
+# для всех процессов (веб-сервер, send_outbox_emails, process_statistics_exports,
+# flush_vacancy_views), поэтому в production указывается Redis или Memcached -
+# docker-compose поднимает Redis. LocMemCache по умолчанию годится только
+# для разработки и тестов в одном процессе
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
     }
 }
 
+# Буферизованный счетчик просмотров вакансий, см. home/view_counter.py
+VACANCY_VIEWS_FLUSH_INTERVAL = config('VACANCY_VIEWS_FLUSH_INTERVAL', default=60, cast=int)
+VACANCY_VIEWS_DEDUPE_WINDOW = config('VACANCY_VIEWS_DEDUPE_WINDOW', default=1800, cast=int)
+
+# Время жизни кэша страницы вакансии, см. home/detail_cache.py
+VACANCY_DETAIL_CACHE_TIMEOUT = config('VACANCY_DETAIL_CACHE_TIMEOUT', default=600, cast=int)
+
+# Время жизни счетчиков главных страниц, см. home/counters.py
+PLATFORM_COUNTERS_TIMEOUT = config('PLATFORM_COUNTERS_TIMEOUT', default=3600, cast=int)
+
+# Время жизни счетчиков откликов компании, см. home/response_counts.py
+RESPONSE_COUNTS_TIMEOUT = config('RESPONSE_COUNTS_TIMEOUT', default=3600, cast=int)
+
+# Снимок статистики админ-панели: сколько секунд он свежий и сколько
+# еще отдается устаревшим на время фонового пересчета,
+# см. admin_panel/statistics_service.py
+STATISTICS_SNAPSHOT_TIMEOUT = config('STATISTICS_SNAPSHOT_TIMEOUT', default=60, cast=int)
+STATISTICS_SNAPSHOT_STALE_TIMEOUT = config('STATISTICS_SNAPSHOT_STALE_TIMEOUT', default=600, cast=int)
+
+# Сколько секунд готовый экспорт статистики за тот же период отдается
+# повторно, см. admin_panel/statistics_export.py
+STATISTICS_EXPORT_REUSE_TIMEOUT = config('STATISTICS_EXPORT_REUSE_TIMEOUT', default=3600, cast=int)
+# Сколько секунд задание может формироваться, прежде чем считается зависшим,
+# и сколько секунд хранятся задания экспорта и их файлы
+STATISTICS_EXPORT_RUNNING_TIMEOUT = config('STATISTICS_EXPORT_RUNNING_TIMEOUT', default=600, cast=int)
+STATISTICS_EXPORT_RETENTION = config('STATISTICS_EXPORT_RETENTION', default=86400, cast=int)
+
+# Графики экспорта статистики: matplotlib (PNG, кэшируется) или векторные
+# графики reportlab, см. admin_panel/charts.py
+STATISTICS_CHART_BACKEND = config('STATISTICS_CHART_BACKEND', default='matplotlib')
+STATISTICS_CHART_CACHE_TIMEOUT = config('STATISTICS_CHART_CACHE_TIMEOUT', default=3600, cast=int)
+
 AUTH_USER_MODEL = 'home.User'  
 AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
@@ -147,11 +199,16 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # Backup settings
 DBBACKUP_STORAGE = 'django.core.files.storage.FileSystemStorage'
 DBBACKUP_STORAGE_OPTIONS = {'location': os.path.join(MEDIA_ROOT, 'backups')}
+# Сколько объектов читается из базы за раз при потоковом бэкапе,
+# см. admin_panel/procedure_manager.py
+BACKUP_CHUNK_SIZE = config('BACKUP_CHUNK_SIZE', default=2000, cast=int)
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Email settings
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Для работы без SMTP: django.core.mail.backends.console.EmailBackend или filebased
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = config('EMAIL_FILE_PATH', default=os.path.join(BASE_DIR, 'sent_emails'))
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.mail.ru')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
@@ -160,4 +217,15 @@ EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='')
 SERVER_EMAIL = config('SERVER_EMAIL', default='')
 EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
-EMAIL_USE_SSL = config('EMAIL_USE_SSL', default=False, cast=bool)
\ No newline at end of file
+EMAIL_USE_SSL = config('EMAIL_USE_SSL', default=False, cast=bool)
+
+# Очередь исходящих писем, см. home/email_outbox.py и команду send_outbox_emails
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', default=50, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+EMAIL_OUTBOX_RETRY_DELAY = config('EMAIL_OUTBOX_RETRY_DELAY', default=60, cast=int)
+# Сколько дней хранить отправленные письма (без текста) в email_outbox
+EMAIL_OUTBOX_RETENTION_DAYS = config('EMAIL_OUTBOX_RETENTION_DAYS', default=7, cast=int)
+
+# Администратор, от имени которого повторная модерация создает жалобы
+# (пусто - первый активный администратор)
+MODERATION_COMPLAINANT_EMAIL = config('MODERATION_COMPLAINANT_EMAIL', default='')
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import Applicant, Company, Response, Vacancy
+
+
+class PlatformCounters:
+    """
+    Общие счетчики платформы для главных страниц соискателя и компании.
+    Хранятся в кэше одним ключом, пересчитываются при первом чтении после
+    создания, удаления или смены статуса вакансий, компаний, соискателей и
+    откликов (см. signals.py) и командой refresh_platform_counters.
+    """
+
+    CACHE_KEY = 'platform_counters'
+
+    # Поля, от которых зависят счетчики: сохранение объекта без их изменения
+    # снимок не сбрасывает (создание и удаление сбрасывают всегда)
+    COUNTED_FIELDS = {
+        Vacancy: ('status_id', 'company_id'),
+        Company: ('status',),
+        Applicant: (),
+        Response: ('status_id',),
+    }
+
+    @staticmethod
+    def compute():
+        """Пересчет всех счетчиков по базе"""
+        companies = Company.objects.annotate(vacancy_count=Count('vacancy')).aggregate(
+            total=Count('id'),
+            approved=Count('id', filter=Q(status=Company.STATUS_APPROVED)),
+            returning=Count('id', filter=Q(vacancy_count__gt=1)),
+        )
+        responses = Response.objects.aggregate(
+            accepted=Count('id', filter=Q(status__status_response_name='Принято')),
+            invited=Count('id', filter=Q(status__status_response_name='Приглашение')),
+        )
+        return {
+            'active_vacancies_count': Vacancy.objects.filter(
+                status__status_vacancies_name='Активна'
+            ).count(),
+            'approved_companies_count': companies['approved'],
+            'total_companies_count': companies['total'],
+            'returning_companies_count': companies['returning'],
+            'applicants_count': Applicant.objects.count(),
+            'successful_responses_count': responses['accepted'],
+            'successful_hires_count': responses['invited'],
+        }
+
+    @staticmethod
+    def refresh():
+        counters = PlatformCounters.compute()
+        cache.set(PlatformCounters.CACHE_KEY, counters, settings.PLATFORM_COUNTERS_TIMEOUT)
+        return counters
+
+    @staticmethod
+    def get():
+        """Счетчики из кэша, при отсутствии - пересчет"""
+        counters = cache.get(PlatformCounters.CACHE_KEY)
+        if counters is None:
+            counters = PlatformCounters.refresh()
+        return counters
+
+    @staticmethod
+    def invalidate():
+        cache.delete(PlatformCounters.CACHE_KEY)
@@ -0,0 +1,69 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from .models import Vacancy
+
+
+class VacancyDetailCache:
+    """
+    Кэш публичной страницы вакансии.
+    Общие для всех посетителей фрагменты шаблона vacancy_detail.html
+    кэшируются тегом {% cache %} по id вакансии и версии: updated_date
+    вакансии и метке ее компании, которая меняется при изменении компании.
+    Отклик и избранное текущего пользователя в кэш не попадают.
+    """
+
+    VERSION_KEY = 'vacancy_detail_version:{}'
+    COMPANY_VERSION_KEY = 'vacancy_detail_company_version:{}'
+
+    # Имена фрагментов {% cache %} в vacancy_detail.html
+    FRAGMENTS = ('vacancy_detail_title', 'vacancy_detail_header', 'vacancy_detail_body')
+
+    @staticmethod
+    def _company_version(company_id):
+        """Метка компании; новая метка после сброса делает старые фрагменты недоступными"""
+        key = VacancyDetailCache.COMPANY_VERSION_KEY.format(company_id)
+        version = cache.get(key)
+        if version is None:
+            version = str(time.time_ns())
+            cache.add(key, version, settings.VACANCY_DETAIL_CACHE_TIMEOUT)
+            version = cache.get(key, version)
+        return version
+
+    @staticmethod
+    def get_version(vacancy_id):
+        """Версия вакансии для ключа кэша или None, если вакансии нет"""
+        version_key = VacancyDetailCache.VERSION_KEY.format(vacancy_id)
+        cached = cache.get(version_key)
+        if cached is None:
+            row = Vacancy.objects.filter(pk=vacancy_id).values_list('updated_date', 'company_id').first()
+            if row is None:
+                return None
+            cached = (row[0].isoformat(), row[1])
+            cache.set(version_key, cached, settings.VACANCY_DETAIL_CACHE_TIMEOUT)
+        updated_date, company_id = cached
+        return f'{updated_date}:{VacancyDetailCache._company_version(company_id)}'
+
+    @staticmethod
+    def invalidate(vacancy):
+        """Сброс кэша страницы вакансии после ее изменения"""
+        version_key = VacancyDetailCache.VERSION_KEY.format(vacancy.pk)
+        cached = cache.get(version_key)
+        keys = [version_key]
+        if cached is not None:
+            company_version = cache.get(VacancyDetailCache.COMPANY_VERSION_KEY.format(cached[1]))
+            if company_version is not None:
+                version = f'{cached[0]}:{company_version}'
+                keys += [
+                    make_template_fragment_key(fragment, [vacancy.pk, version])
+                    for fragment in VacancyDetailCache.FRAGMENTS
+                ]
+        cache.delete_many(keys)
+
+    @staticmethod
+    def invalidate_company(company_id):
+        """Сброс кэша страниц всех вакансий компании после изменения ее профиля"""
+        cache.delete(VacancyDetailCache.COMPANY_VERSION_KEY.format(company_id))
@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+
+class EmailOutboxService:
+    """
+    Очередь исходящих писем.
+    Письмо записывается в таблицу email_outbox в той же транзакции, что и
+    изменение, которое его вызвало, а отправляет его команда
+    send_outbox_emails пачками через одно SMTP-соединение с повторами.
+    Через очередь идут все письма, в том числе с паролями, кодами и
+    ссылками сброса пароля: после отправки или окончательной ошибки текст
+    письма стирается, а отправленные строки старше
+    EMAIL_OUTBOX_RETENTION_DAYS удаляются.
+    """
+
+    @staticmethod
+    def enqueue(subject, body, to_email, html_body=''):
+        """
+        Постановка письма в очередь. INSERT выполняется в отдельной точке
+        сохранения: если вызывающий код перехватит ошибку, его транзакция
+        останется рабочей.
+        """
+        with transaction.atomic():
+            return EmailOutbox.objects.create(
+                to_email=to_email,
+                subject=subject,
+                body=body,
+                html_body=html_body or '',
+            )
+
+    @staticmethod
+    def enqueue_many(messages):
+        """Постановка в очередь пачки писем одним INSERT: [(subject, body, to_email), ...]"""
+        return EmailOutbox.objects.bulk_create([
+            EmailOutbox(to_email=to_email, subject=subject, body=body)
+            for subject, body, to_email in messages
+        ])
+
+    @staticmethod
+    def purge_sent(days=None):
+        """Удаление отправленных писем старше days дней, возвращает число строк"""
+        days = settings.EMAIL_OUTBOX_RETENTION_DAYS if days is None else days
+        deleted, _ = EmailOutbox.objects.filter(
+            status=EmailOutbox.STATUS_SENT, sent_at__lt=timezone.now() - timedelta(days=days)
+        ).delete()
+        return deleted
+
+    @staticmethod
+    def _build_message(email, connection):
+        message = EmailMultiAlternatives(
+            email.subject, email.body, settings.DEFAULT_FROM_EMAIL, [email.to_email], connection=connection
+        )
+        if email.html_body:
+            message.attach_alternative(email.html_body, 'text/html')
+        return message
+
+    @staticmethod
+    def _mark_failed(email, error, now):
+        email.attempts += 1
+        email.last_error = error
+        if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            email.status = EmailOutbox.STATUS_FAILED
+            # Письмо больше не отправится, его текст не храним
+            email.body = email.html_body = ''
+        else:
+            # Экспоненциальная задержка: 1, 2, 4... интервала EMAIL_OUTBOX_RETRY_DELAY
+            delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (email.attempts - 1)
+            email.next_attempt_at = now + timedelta(seconds=delay)
+
+    @staticmethod
+    def process_batch(batch_size=None):
+        """
+        Отправка одной пачки писем, срок которых наступил.
+        Строки блокируются с SKIP LOCKED, поэтому несколько обработчиков
+        не отправят одно письмо дважды. Возвращает (отправлено, ошибок).
+        """
+        batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+        now = timezone.now()
+        sent = failed = 0
+
+        with transaction.atomic():
+            emails = list(
+                EmailOutbox.objects.select_for_update(skip_locked=True)
+                .filter(status=EmailOutbox.STATUS_PENDING, next_attempt_at__lte=now)
+                .order_by('next_attempt_at', 'id')[:batch_size]
+            )
+            if not emails:
+                return 0, 0
+
+            connection = get_connection()
+            try:
+                connection.open()
+            except Exception as e:
+                print(f"❌ [EMAIL] Не удалось подключиться к почтовому серверу: {str(e)}")
+                for email in emails:
+                    EmailOutboxService._mark_failed(email, str(e), now)
+                EmailOutbox.objects.bulk_update(
+                    emails, ['status', 'attempts', 'next_attempt_at', 'last_error', 'body', 'html_body']
+                )
+                return 0, len(emails)
+
+            try:
+                for email in emails:
+                    try:
+                        EmailOutboxService._build_message(email, connection).send()
+                    except Exception as e:
+                        EmailOutboxService._mark_failed(email, str(e), now)
+                        failed += 1
+                    else:
+                        email.status = EmailOutbox.STATUS_SENT
+                        email.attempts += 1
+                        email.sent_at = timezone.now()
+                        email.last_error = ''
+                        # Текст отправленного письма не храним
+                        email.body = email.html_body = ''
+                        sent += 1
+            finally:
+                connection.close()
+
+            EmailOutbox.objects.bulk_update(
+                emails, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'body', 'html_body']
+            )
+        return sent, failed
@@ -0,0 +1,41 @@
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+
+
+class EmailRenderer:
+    """
+    Рендеринг писем из шаблонов templates/emails/<name>.txt и <name>.html.
+    Шаблоны компилируются загрузчиком один раз и кэшируются, статическая
+    разметка и стили письма хранятся в скомпилированном шаблоне готовой
+    строкой, а при отправке подставляются только поля получателя.
+    """
+
+    TEMPLATE_DIR = 'emails'
+
+    @staticmethod
+    def _get_templates(name):
+        text_template = get_template(f'{EmailRenderer.TEMPLATE_DIR}/{name}.txt')
+        try:
+            html_template = get_template(f'{EmailRenderer.TEMPLATE_DIR}/{name}.html')
+        except TemplateDoesNotExist:
+            # Письмо только в текстовом виде
+            html_template = None
+        return text_template, html_template
+
+    @staticmethod
+    def _render(templates, context):
+        text_template, html_template = templates
+        text = text_template.render(context).strip() + '\n'
+        html = html_template.render(context) if html_template else ''
+        return text, html
+
+    @staticmethod
+    def render(name, context):
+        """Текст и HTML письма (HTML пустой, если шаблона нет)"""
+        return EmailRenderer._render(EmailRenderer._get_templates(name), context)
+
+    @staticmethod
+    def render_many(name, contexts):
+        """Рендеринг одного письма для многих получателей: [(текст, HTML), ...]"""
+        templates = EmailRenderer._get_templates(name)
+        return [EmailRenderer._render(templates, context) for context in contexts]
@@ -0,0 +1,131 @@
+from django.db import connections
+from django.db.models import BooleanField, Case, ExpressionWrapper, IntegerField, Value, When
+
+from .models import Vacancy
+
+
+class VacancyFacetService:
+    """
+    Счетчики фильтров (фасетов) для текущей выдачи вакансий.
+    Все фасеты считаются одним запросом GROUPING SETS с условной агрегацией
+    COUNT(*) FILTER, поэтому стоимость не зависит от числа значений фильтров.
+    """
+
+    # Фасет и столбец, по которому он группируется
+    FACET_COLUMNS = (
+        ('work_conditions', 'work_conditions_id'),
+        ('experience', 'experience'),
+        ('category', 'category'),
+        ('city', 'city'),
+        ('salary', 'salary_bucket'),
+    )
+
+    # Сколько самых частых городов показывать в фильтре
+    CITY_LIMIT = 10
+
+    # Границы корзин гистограммы по нижней границе зарплаты
+    SALARY_BUCKETS = (50000, 100000, 150000, 200000, 300000)
+
+    @staticmethod
+    def salary_bucket_expression():
+        bounds = VacancyFacetService.SALARY_BUCKETS
+        return Case(
+            *[When(salary_min__lt=bound, then=Value(index)) for index, bound in enumerate(bounds)],
+            default=Value(len(bounds)),
+            output_field=IntegerField(),
+        )
+
+    @staticmethod
+    def get_salary_buckets(counts):
+        """Корзины гистограммы с подписями и числом вакансий"""
+        bounds = (None,) + VacancyFacetService.SALARY_BUCKETS + (None,)
+        buckets = []
+        for index in range(len(bounds) - 1):
+            salary_from, salary_to = bounds[index], bounds[index + 1]
+            if salary_from is None:
+                label = f'до {salary_to:,}'.replace(',', ' ')
+            elif salary_to is None:
+                label = f'от {salary_from:,}'.replace(',', ' ')
+            else:
+                label = f'{salary_from:,} – {salary_to:,}'.replace(',', ' ')
+            buckets.append({
+                'label': label,
+                'salary_from': salary_from,
+                'salary_to': salary_to,
+                'count': counts.get(index, 0),
+            })
+        return buckets
+
+    @staticmethod
+    def get_facets(queryset, conditions=None):
+        """
+        Возвращает словарь {фасет: {значение: количество}} для фасетов
+        work_conditions, experience, category, city и корзин зарплаты salary.
+
+        queryset - выдача без фильтров боковой панели, conditions - условия
+        этих фильтров по фасетам. Счетчик каждого фасета учитывает все фильтры,
+        кроме собственного, чтобы при выборе значения были видны альтернативы.
+        """
+        conditions = conditions or {}
+        columns = dict(VacancyFacetService.FACET_COLUMNS)
+        annotations = {'salary_bucket': VacancyFacetService.salary_bucket_expression()}
+        for facet, condition in conditions.items():
+            annotations[f'match_{facet}'] = ExpressionWrapper(condition, output_field=BooleanField())
+        facet_queryset = queryset.order_by().annotate(**annotations).values(
+            *columns.values(), *[f'match_{facet}' for facet in conditions]
+        )
+        inner_sql, params = facet_queryset.query.sql_with_params()
+
+        counts = []
+        for facet in columns:
+            other_matches = [f'match_{other}' for other in conditions if other != facet]
+            if other_matches:
+                counts.append(f'COUNT(*) FILTER (WHERE {" AND ".join(other_matches)})')
+            else:
+                counts.append('COUNT(*)')
+
+        column_list = ', '.join(columns.values())
+        grouping_list = ', '.join(f'GROUPING({column})' for column in columns.values())
+        grouping_sets = ', '.join(f'({column})' for column in columns.values())
+        sql = (
+            f'SELECT {column_list}, {grouping_list}, {", ".join(counts)} '
+            f'FROM ({inner_sql}) AS facet_rows '
+            f'GROUP BY GROUPING SETS ({grouping_sets})'
+        )
+
+        size = len(columns)
+        facets = {facet: {} for facet in columns}
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(sql, params)
+            for row in cursor.fetchall():
+                values, grouping, facet_counts = row[:size], row[size:2 * size], row[2 * size:]
+                # GROUPING(column) = 0 у того поля, по которому сгруппирована строка
+                index = grouping.index(0)
+                if facet_counts[index]:
+                    facets[list(columns)[index]][values[index]] = facet_counts[index]
+
+        facets['salary'] = VacancyFacetService.get_salary_buckets(facets['salary'])
+        return facets
+
+    @staticmethod
+    def get_filter_options(facets, params):
+        """Значения фильтров боковой панели со счетчиками и отметкой выбора"""
+        def option(value, count, selected_values):
+            return {'value': value, 'count': count, 'selected': value in selected_values}
+
+        options = {}
+        for facet in ('experience', 'category'):
+            selected = params.getlist(facet)
+            choices = Vacancy._meta.get_field(facet).choices
+            options[facet] = [
+                option(value, facets[facet].get(value, 0), selected) for value, _ in choices
+            ]
+
+        selected_cities = params.getlist('city')
+        cities = sorted(facets['city'].items(), key=lambda item: (-item[1], item[0]))
+        cities = [city for city, _ in cities[:VacancyFacetService.CITY_LIMIT]]
+        cities += [city for city in selected_cities if city not in cities]
+        options['city'] = [
+            option(city, facets['city'].get(city, 0), selected_cities) for city in cities
+        ]
+        return options
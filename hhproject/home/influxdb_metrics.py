@@ -1,6 +1,7 @@
 import requests
 from django.db.models import Count
 from .models import Backup, Response, StatusResponse
+from .timeseries import TimeSeries
 import logging
 from datetime import datetime
 
@@ -74,15 +75,8 @@ class InfluxDBSender:
         try:
             metrics = []
             
-            responses_by_date = Response.objects.extra({
-                'response_day': "DATE(response_date)"
-            }).values('response_day').annotate(
-                count=Count('id')
-            ).order_by('response_day')
-
-            for item in responses_by_date:
-                date_str = item['response_day'].strftime('%Y-%m-%d')
-                count = item['count']
+            for day, count in TimeSeries.series(Response.objects.all(), 'response_date'):
+                date_str = day.strftime('%Y-%m-%d')
                 metric = f"response_daily,date={date_str} count={count}"
                 metrics.append(metric)
             
@@ -0,0 +1,44 @@
+from .models import Favorites, Response
+
+
+class ApplicantInteractionMap:
+    """
+    Отклики и избранное соискателя для набора вакансий.
+    Загружается одним запросом на каждый вид взаимодействия вместо
+    проверки exists() для каждой вакансии.
+    """
+
+    def __init__(self, applied_ids=frozenset(), favorite_ids=frozenset()):
+        self.applied_ids = frozenset(applied_ids)
+        self.favorite_ids = frozenset(favorite_ids)
+
+    @staticmethod
+    def for_user(user, vacancies):
+        """Карта взаимодействий пользователя с переданными вакансиями"""
+        if user is None or not user.is_authenticated or user.user_type != 'applicant':
+            return ApplicantInteractionMap()
+
+        vacancy_ids = [getattr(vacancy, 'pk', vacancy) for vacancy in vacancies]
+        if not vacancy_ids:
+            return ApplicantInteractionMap()
+
+        applied_ids = Response.objects.filter(
+            applicants__user=user, vacancy_id__in=vacancy_ids
+        ).values_list('vacancy_id', flat=True)
+        favorite_ids = Favorites.objects.filter(
+            applicant__user=user, vacancy_id__in=vacancy_ids
+        ).values_list('vacancy_id', flat=True)
+        return ApplicantInteractionMap(applied_ids, favorite_ids)
+
+    def has_applied(self, vacancy):
+        return getattr(vacancy, 'pk', vacancy) in self.applied_ids
+
+    def is_favorite(self, vacancy):
+        return getattr(vacancy, 'pk', vacancy) in self.favorite_ids
+
+    def annotate(self, vacancies):
+        """Проставляет вакансиям атрибуты has_response и is_favorite"""
+        for vacancy in vacancies:
+            vacancy.has_response = self.has_applied(vacancy)
+            vacancy.is_favorite = self.is_favorite(vacancy)
+        return vacancies
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from home.moderation import RUSSIAN_STEMS, ProfanityMatcher
+
+
+SAMPLE_PARAGRAPH = (
+    'Мы ищем опытного Python-разработчика в команду платформы найма. '
+    'Вы будете проектировать API на Django REST Framework, оптимизировать '
+    'запросы к PostgreSQL и участвовать в код-ревью. We offer a friendly team, '
+    'flexible schedule and a modern stack: Docker, Redis, Celery. '
+)
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает скорость ProfanityMatcher и better_profanity на длинном описании вакансии'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--paragraphs', type=int, default=50, help='Абзацев в тестовом описании')
+        parser.add_argument('--iterations', type=int, default=20, help='Повторов проверки')
+
+    def _measure(self, check, text, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            result = check(text)
+        return (time.perf_counter() - start) / iterations, result
+
+    def handle(self, *args, **options):
+        from better_profanity import profanity
+
+        text = SAMPLE_PARAGRAPH * options['paragraphs']
+        iterations = options['iterations']
+
+        start = time.perf_counter()
+        profanity.load_censor_words()
+        profanity.add_censor_words(list(RUSSIAN_STEMS))
+        legacy_setup = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ProfanityMatcher.default.cache_clear()
+        matcher = ProfanityMatcher.default()
+        matcher_setup = time.perf_counter() - start
+
+        legacy_time, legacy_result = self._measure(profanity.contains_profanity, text, iterations)
+        matcher_time, matcher_result = self._measure(matcher.contains_profanity, text, iterations)
+
+        self.stdout.write(f'Длина текста: {len(text)} символов, повторов: {iterations}')
+        self.stdout.write(
+            f'better_profanity: подготовка {legacy_setup * 1000:.1f} мс, '
+            f'проверка {legacy_time * 1000:.2f} мс, найдено: {legacy_result}'
+        )
+        self.stdout.write(
+            f'ProfanityMatcher: подготовка {matcher_setup * 1000:.1f} мс, '
+            f'проверка {matcher_time * 1000:.2f} мс, найдено: {matcher_result}'
+        )
+        if matcher_time:
+            self.stdout.write(self.style.SUCCESS(f'Ускорение проверки: {legacy_time / matcher_time:.1f}x'))
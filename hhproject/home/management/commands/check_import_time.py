@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Библиотеки, нужные только экспорту статистики: при старте воркера и
+# manage.py они загружаться не должны
+HEAVY_MODULES = ('matplotlib', 'reportlab', 'openpyxl', 'pandas', 'numpy')
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет время импорта проекта через python -X importtime и проверяет '
+        'бюджет времени и отсутствие тяжелых библиотек экспорта'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default=settings.ROOT_URLCONF, help='Модуль, который импортируется после django.setup()')
+        parser.add_argument('--budget-ms', type=int, default=1000, help='Допустимое суммарное время импорта, мс')
+        parser.add_argument('--top', type=int, default=10, help='Сколько самых долгих импортов показать')
+
+    def _measure(self, module):
+        code = f'import django; django.setup(); import {module}'
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'hhproject.settings'))
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f'Не удалось импортировать {module}:\n{result.stderr[-2000:]}')
+
+        imports = []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            imports.append((name.strip(), int(self_us), int(cumulative_us), not name[1:].startswith(' ')))
+        return imports
+
+    def handle(self, *args, **options):
+        imports = self._measure(options['module'])
+        total_ms = sum(self_us for _, self_us, _, _ in imports) / 1000
+        heavy = sorted({
+            name.split('.')[0] for name, _, _, _ in imports if name.split('.')[0] in HEAVY_MODULES
+        })
+
+        top_level = sorted((item for item in imports if item[3]), key=lambda item: item[2], reverse=True)
+        self.stdout.write(f'Импорт {options["module"]}: {total_ms:.0f} мс, модулей: {len(imports)}')
+        for name, _, cumulative_us, _ in top_level[:options['top']]:
+            self.stdout.write(f'  {cumulative_us / 1000:8.1f} мс  {name}')
+
+        errors = []
+        if heavy:
+            errors.append(f'при старте загружаются библиотеки экспорта: {", ".join(heavy)}')
+        if total_ms > options['budget_ms']:
+            errors.append(f'время импорта {total_ms:.0f} мс больше бюджета {options["budget_ms"]} мс')
+        if errors:
+            raise CommandError('; '.join(errors))
+        self.stdout.write(self.style.SUCCESS(f'Бюджет {options["budget_ms"]} мс соблюден'))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from home.shared_cache import is_shared_cache
+from home.view_counter import VacancyViewCounter
+
+
+class Command(BaseCommand):
+    help = 'Записывает накопленные в кэше просмотры вакансий в базу данных'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--allow-local-cache', action='store_true',
+            help='Запустить с кэшем в памяти процесса (видны только просмотры этого процесса)'
+        )
+
+    def handle(self, *args, **options):
+        # Просмотры копятся в кэше веб-воркеров: команда в отдельном процессе
+        # увидит их только в общем кэше (Redis, Memcached)
+        if not is_shared_cache() and not options['allow_local_cache']:
+            raise CommandError(
+                'Кэш по умолчанию хранится в памяти процесса, накопленные веб-воркерами просмотры '
+                'не видны команде. Укажите общий кэш в CACHE_BACKEND/CACHE_LOCATION.'
+            )
+        updated = VacancyViewCounter.flush()
+        self.stdout.write(self.style.SUCCESS(f'Обновлены счетчики просмотров у {updated} вакансий'))
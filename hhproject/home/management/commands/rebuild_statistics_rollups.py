@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from home.rollups import StatisticsRollup
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает дневные итоги статистики по базовым таблицам'
+
+    def handle(self, *args, **options):
+        rows = StatisticsRollup.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Записано строк дневных итогов: {rows}'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from home.counters import PlatformCounters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счетчики главных страниц платформы'
+
+    def handle(self, *args, **options):
+        counters = PlatformCounters.refresh()
+        for name, value in counters.items():
+            self.stdout.write(f'{name}: {value}')
+        self.stdout.write(self.style.SUCCESS('Счетчики обновлены'))
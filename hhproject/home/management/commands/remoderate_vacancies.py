@@ -0,0 +1,119 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from home.models import Complaint, User, Vacancy
+from home.moderation import VACANCY_TEXT_FIELDS, check_vacancy_rows
+from home.rollups import StatisticsRollup
+
+
+class Command(BaseCommand):
+    help = 'Повторно проверяет все вакансии на недопустимые слова и создает жалобы от имени администратора'
+
+    INSERT_BATCH_SIZE = 500
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Строк за одно чтение курсора')
+        parser.add_argument('--batch-size', type=int, default=500, help='Вакансий в одной задаче пула')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='Процессов проверки, 0 - проверять в текущем процессе')
+        parser.add_argument('--complainant', default=settings.MODERATION_COMPLAINANT_EMAIL,
+                            help='Email администратора, от имени которого создаются жалобы')
+
+    def get_complainant(self, email):
+        """Существующий администратор: по email или первый активный"""
+        admins = User.objects.filter(Q(is_superuser=True) | Q(user_type='adminsite'), is_active=True)
+        if email:
+            admins = admins.filter(email=email)
+        complainant = admins.order_by('id').first()
+        if complainant is None:
+            raise CommandError(
+                f'Администратор {email} не найден' if email else 'Нет активных администраторов для жалоб'
+            )
+        return complainant
+
+    def iter_batches(self, chunk_size, batch_size):
+        rows = Vacancy.objects.order_by().values_list('id', *VACANCY_TEXT_FIELDS).iterator(chunk_size=chunk_size)
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def check_in_pool(self, batches, workers):
+        """Проверка в пуле процессов; в очереди не больше двух задач на процесс"""
+        flagged = []
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as executor:
+            pending = set()
+            for batch in batches:
+                pending.add(executor.submit(check_vacancy_rows, batch))
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        flagged.extend(future.result())
+            for future in pending:
+                flagged.extend(future.result())
+        return flagged
+
+    def create_complaints(self, flagged, complainant):
+        """Создание жалоб, возвращает число действительно добавленных строк"""
+        table = connection.ops.quote_name(Complaint._meta.db_table)
+        now = timezone.now()
+        created = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            for start in range(0, len(flagged), self.INSERT_BATCH_SIZE):
+                rows = []
+                for vacancy_id, fields in flagged[start:start + self.INSERT_BATCH_SIZE]:
+                    found = '; '.join(
+                        f'{VACANCY_TEXT_FIELDS[field]}: {", ".join(words)}' for field, words in fields.items()
+                    )
+                    description = f'Автоматическая проверка: найдены недопустимые слова. {found}'
+                    rows.append((vacancy_id, complainant.pk, 'inappropriate', description, 'pending', now, ''))
+                values = ', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(rows))
+                # По одной жалобе администратора на вакансию (unique_together vacancy/complainant),
+                # rowcount учитывает только вставленные строки
+                cursor.execute(
+                    f'INSERT INTO {table} (vacancy_id, complainant_id, complaint_type, description, '
+                    f'status, created_at, admin_notes) VALUES {values} '
+                    f'ON CONFLICT (vacancy_id, complainant_id) DO NOTHING',
+                    [value for row in rows for value in row]
+                )
+                created += cursor.rowcount
+            # Вставка в обход ORM не вызывает сигналы, учитываем жалобы в итогах статистики сами
+            StatisticsRollup.apply([('complaint', StatisticsRollup.day_of(now), 'inappropriate', created)])
+        return created
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        checked = 0
+
+        def counted(batches):
+            nonlocal checked
+            for batch in batches:
+                checked += len(batch)
+                yield batch
+
+        complainant = self.get_complainant(options['complainant'])
+        batches = counted(self.iter_batches(options['chunk_size'], options['batch_size']))
+        if options['workers'] > 0:
+            flagged = self.check_in_pool(batches, options['workers'])
+        else:
+            flagged = [item for batch in batches for item in check_vacancy_rows(batch)]
+
+        created = self.create_complaints(flagged, complainant) if flagged else 0
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(f'Проверено вакансий: {checked} за {elapsed:.1f} с ({checked / elapsed:.0f} в секунду)')
+        self.stdout.write(self.style.SUCCESS(
+            f'Найдено вакансий с недопустимыми словами: {len(flagged)}, новых жалоб: {created}'
+        ))
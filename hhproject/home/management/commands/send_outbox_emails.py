@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from home.email_outbox import EmailOutboxService
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди email_outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Писем в одной пачке')
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно, опрашивая очередь')
+        parser.add_argument('--interval', type=int, default=5, help='Пауза между опросами пустой очереди, сек.')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        purged = EmailOutboxService.purge_sent()
+        while True:
+            sent, failed = EmailOutboxService.process_batch(options['batch_size'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if not options['loop']:
+                break
+            purged += EmailOutboxService.purge_sent()
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Отправлено писем: {total_sent}, ошибок: {total_failed}, удалено старых: {purged}'
+        ))
@@ -45,7 +45,7 @@ class ResponseByStatusCollector:
 class ResponseByDateCollector:
     def collect(self):
         from .models import Response
-        from django.db.models import Count
+        from .timeseries import TimeSeries
         
         metric = GaugeMetricFamily(
             'hh_responses_by_date',
@@ -53,14 +53,8 @@ class ResponseByDateCollector:
             labels=['date']
         )
 
-        responses_by_date = Response.objects.extra({
-            'response_day': "DATE(response_date)"
-        }).values('response_day').annotate(
-            count=Count('id')
-        ).order_by('response_day')
-
-        for item in responses_by_date:
-            date_str = item['response_day'].strftime('%Y-%m-%d')
-            metric.add_metric(labels=[date_str], value=item['count'])
+        for day, count in TimeSeries.series(Response.objects.all(), 'response_date'):
+            date_str = day.strftime('%Y-%m-%d')
+            metric.add_metric(labels=[date_str], value=count)
 
         yield metric
\ No newline at end of file
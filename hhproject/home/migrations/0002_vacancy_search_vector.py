@@ -0,0 +1,72 @@
+# Generated by Django 5.2.2 on 2026-10-17 20:15
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Вектор собирается из должности (вес A), названия компании (B) и описания (C)
+# сразу в двух конфигурациях, чтобы работал стемминг и русских, и английских слов.
+VACANCY_SEARCH_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION vacancies_search_vector_update() RETURNS trigger AS $$
+DECLARE
+    company_name text;
+BEGIN
+    SELECT name INTO company_name FROM companies WHERE id = NEW.company_id;
+    NEW.search_vector :=
+        setweight(to_tsvector('russian', coalesce(NEW.position, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.position, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(company_name, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(company_name, '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER vacancies_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF position, description, company_id ON vacancies
+    FOR EACH ROW EXECUTE FUNCTION vacancies_search_vector_update();
+
+CREATE OR REPLACE FUNCTION companies_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    IF NEW.name IS DISTINCT FROM OLD.name THEN
+        UPDATE vacancies SET company_id = company_id WHERE company_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER companies_search_vector_trigger
+    AFTER UPDATE OF name ON companies
+    FOR EACH ROW EXECUTE FUNCTION companies_search_vector_update();
+
+UPDATE vacancies SET position = position;
+"""
+
+VACANCY_SEARCH_TRIGGER_REVERSE_SQL = """
+DROP TRIGGER IF EXISTS companies_search_vector_trigger ON companies;
+DROP FUNCTION IF EXISTS companies_search_vector_update();
+DROP TRIGGER IF EXISTS vacancies_search_vector_trigger ON vacancies;
+DROP FUNCTION IF EXISTS vacancies_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacancy',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='vacancies_search_vector_gin'),
+        ),
+        migrations.RunSQL(VACANCY_SEARCH_TRIGGER_SQL, VACANCY_SEARCH_TRIGGER_REVERSE_SQL),
+    ]
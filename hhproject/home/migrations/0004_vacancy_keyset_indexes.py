@@ -0,0 +1,25 @@
+# Generated by Django 5.2.2 on 2026-10-17 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0003_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['created_date', 'id'], name='vacancies_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['salary_max', 'id'], name='vacancies_salary_max_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['salary_min', 'id'], name='vacancies_salary_min_id_idx'),
+        ),
+    ]
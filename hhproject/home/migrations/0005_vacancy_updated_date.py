@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-17 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0004_vacancy_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacancy',
+            name='updated_date',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.2 on 2026-10-17 20:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0005_vacancy_updated_date'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='response',
+            index=models.Index(fields=['response_date', 'id'], name='responses_date_id_idx'),
+        ),
+    ]
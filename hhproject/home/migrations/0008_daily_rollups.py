@@ -0,0 +1,62 @@
+# Generated by Django 5.2.2 on 2026-10-17 20:49
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+# Сущность: (модель, поле даты создания, поле разреза), как в home/rollups.py
+ROLLUP_SOURCES = {
+    'user': ('User', 'date_joined', 'user_type'),
+    'company': ('Company', 'created_at', 'status'),
+    'vacancy': ('Vacancy', 'created_date', 'category'),
+    'response': ('Response', 'response_date', 'status_id'),
+    'complaint': ('Complaint', 'created_at', 'complaint_type'),
+}
+
+
+def fill_rollups(apps, schema_editor):
+    DailyRollup = apps.get_model('home', 'DailyRollup')
+    rows = []
+    for entity, (model_name, date_field, key_field) in ROLLUP_SOURCES.items():
+        model = apps.get_model('home', model_name)
+        groups = model.objects.annotate(rollup_day=TruncDate(date_field)).values(
+            'rollup_day', key_field
+        ).annotate(total=Count('pk')).order_by()
+        rows += [
+            DailyRollup(
+                entity=entity,
+                day=group['rollup_day'],
+                key='' if group[key_field] is None else str(group[key_field]),
+                count=group['total'],
+            )
+            for group in groups
+        ]
+    DailyRollup.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0007_email_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('entity', models.CharField(max_length=20, verbose_name='Сущность')),
+                ('key', models.CharField(blank=True, max_length=100, verbose_name='Тип, статус или категория')),
+                ('count', models.IntegerField(default=0, verbose_name='Количество')),
+            ],
+            options={
+                'verbose_name': 'Дневной итог статистики',
+                'verbose_name_plural': 'Дневные итоги статистики',
+                'db_table': 'daily_rollups',
+                'constraints': [models.UniqueConstraint(fields=('entity', 'day', 'key'), name='daily_rollups_entity_day_key_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
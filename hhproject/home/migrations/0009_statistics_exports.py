@@ -0,0 +1,37 @@
+# Generated by Django 5.2.2 on 2026-10-17 20:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0008_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatisticsExport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('export_format', models.CharField(choices=[('pdf', 'PDF')], default='pdf', max_length=10, verbose_name='Формат')),
+                ('start_date', models.DateField(blank=True, null=True, verbose_name='Начало периода')),
+                ('end_date', models.DateField(blank=True, null=True, verbose_name='Конец периода')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Формируется'), ('done', 'Готов'), ('failed', 'Ошибка')], default='pending', max_length=20, verbose_name='Статус')),
+                ('file', models.FileField(blank=True, upload_to='statistics_exports/', verbose_name='Файл отчета')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Начало формирования')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Окончание формирования')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Кто запросил')),
+            ],
+            options={
+                'verbose_name': 'Экспорт статистики',
+                'verbose_name_plural': 'Экспорты статистики',
+                'db_table': 'statistics_exports',
+                'indexes': [models.Index(fields=['export_format', 'start_date', 'end_date', 'status'], name='statistics_exports_period_idx')],
+            },
+        ),
+    ]
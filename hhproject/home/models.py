@@ -5,6 +5,9 @@ from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.core.validators import FileExtensionValidator
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.utils import timezone
 
 class User(AbstractUser):
     email = models.EmailField(unique=True)
@@ -83,6 +86,9 @@ class Company(models.Model):
         db_table = 'companies'
         verbose_name = 'Компания'
         verbose_name_plural = 'Компании'
+        indexes = [
+            GinIndex(fields=['name'], name='companies_name_trgm', opclasses=['gin_trgm_ops']),
+        ]
     
     def __str__(self):
         return self.name
@@ -179,6 +185,8 @@ class Vacancy(models.Model):
     salary_min = models.DecimalField(max_digits=12, decimal_places=2)
     salary_max = models.DecimalField(max_digits=12, decimal_places=2)
     created_date = models.DateTimeField(auto_now_add=True)
+    # Версия для кэша страницы вакансии, меняется при каждом save()
+    updated_date = models.DateTimeField(auto_now=True)
     status = models.ForeignKey('StatusVacancies', on_delete=models.CASCADE)
     views = models.PositiveIntegerField(default=0)
     experience = models.CharField(max_length=20, choices=[
@@ -195,11 +203,21 @@ class Vacancy(models.Model):
         ('HR', 'HR'),
     ], default='IT') 
     work_conditions_details = models.TextField(blank=True, null=True) 
+    # Поддерживается триггером БД (см. миграцию 0002), вручную не заполняется
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         db_table = 'vacancies'
         verbose_name = 'Вакансия'
         verbose_name_plural = 'Вакансии'
+        indexes = [
+            GinIndex(fields=['search_vector'], name='vacancies_search_vector_gin'),
+            GinIndex(fields=['position'], name='vacancies_position_trgm', opclasses=['gin_trgm_ops']),
+            # Ключи keyset-пагинации списка вакансий
+            models.Index(fields=['created_date', 'id'], name='vacancies_created_id_idx'),
+            models.Index(fields=['salary_max', 'id'], name='vacancies_salary_max_id_idx'),
+            models.Index(fields=['salary_min', 'id'], name='vacancies_salary_min_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.position} - {self.company.name}"
@@ -257,6 +275,10 @@ class Response(models.Model):
         verbose_name = 'Отклик'
         verbose_name_plural = 'Отклики'
         unique_together = ['applicants', 'vacancy']
+        indexes = [
+            # Ключ keyset-пагинации списка откликов компании
+            models.Index(fields=['response_date', 'id'], name='responses_date_id_idx'),
+        ]
     
     def __str__(self):
         return f"Отклик {self.applicants} на {self.vacancy}"
@@ -307,6 +329,108 @@ class AdminLog(models.Model):
     def __str__(self):
         return f"{self.admin.username} - {self.action.name} - {self.created_at}"
 
+class EmailOutbox(models.Model):
+    """Исходящее письмо, ожидающее отправки командой send_outbox_emails"""
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Ожидает отправки'),
+        (STATUS_SENT, 'Отправлено'),
+        (STATUS_FAILED, 'Ошибка отправки'),
+    ]
+
+    to_email = models.EmailField(verbose_name='Получатель')
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст письма')
+    html_body = models.TextField(blank=True, verbose_name='HTML письма')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name='Статус')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Попыток отправки')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='Следующая попытка')
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name='Дата отправки')
+
+    class Meta:
+        db_table = 'email_outbox'
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='email_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.to_email} - {self.subject}"
+
+class StatisticsExport(models.Model):
+    """Задание на экспорт статистики, выполняется командой process_statistics_exports"""
+    FORMAT_PDF = 'pdf'
+
+    FORMAT_CHOICES = [
+        (FORMAT_PDF, 'PDF'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'В очереди'),
+        (STATUS_RUNNING, 'Формируется'),
+        (STATUS_DONE, 'Готов'),
+        (STATUS_FAILED, 'Ошибка'),
+    ]
+
+    export_format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default=FORMAT_PDF, verbose_name='Формат')
+    start_date = models.DateField(null=True, blank=True, verbose_name='Начало периода')
+    end_date = models.DateField(null=True, blank=True, verbose_name='Конец периода')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name='Статус')
+    file = models.FileField(upload_to='statistics_exports/', blank=True, verbose_name='Файл отчета')
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+    requested_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name='Кто запросил'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='Начало формирования')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Окончание формирования')
+
+    class Meta:
+        db_table = 'statistics_exports'
+        verbose_name = 'Экспорт статистики'
+        verbose_name_plural = 'Экспорты статистики'
+        indexes = [
+            models.Index(fields=['export_format', 'start_date', 'end_date', 'status'], name='statistics_exports_period_idx'),
+        ]
+
+    def __str__(self):
+        period = f"{self.start_date} - {self.end_date}" if self.start_date else "все время"
+        return f"{self.get_export_format_display()} ({period}) - {self.get_status_display()}"
+
+class DailyRollup(models.Model):
+    """
+    Дневной итог для статистики админ-панели: сколько объектов сущности
+    (пользователи, компании, вакансии, отклики, жалобы) создано за день
+    в разрезе типа, статуса или категории. Поддерживается сигналами,
+    см. home/rollups.py.
+    """
+    day = models.DateField(verbose_name='День')
+    entity = models.CharField(max_length=20, verbose_name='Сущность')
+    key = models.CharField(max_length=100, blank=True, verbose_name='Тип, статус или категория')
+    count = models.IntegerField(default=0, verbose_name='Количество')
+
+    class Meta:
+        db_table = 'daily_rollups'
+        verbose_name = 'Дневной итог статистики'
+        verbose_name_plural = 'Дневные итоги статистики'
+        constraints = [
+            models.UniqueConstraint(fields=['entity', 'day', 'key'], name='daily_rollups_entity_day_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.entity}:{self.key} = {self.count}"
+
 class Backup(models.Model):
     BACKUP_TYPES = [
         ('full', 'Полный бэкап'),
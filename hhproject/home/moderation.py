@@ -0,0 +1,160 @@
+import re
+from collections import deque
+from functools import lru_cache
+
+from better_profanity.utils import get_complete_path_of_file, read_wordlist
+
+
+# Основы русских слов: совпадают с началом слова, поэтому ловят и
+# производные формы («бляд» - «блядь», «блядский»), но не середину слова
+# («корабля»)
+RUSSIAN_STEMS = (
+    'блят', 'бляд', 'хуй', 'пизда', 'ебать', 'ебал', 'ебан', 'ебуч',
+    'ебет', 'ебут', 'ебля', 'еблан', 'ебну',
+    'нахуй', 'нихуя', 'хуе', 'пиздец', 'охуе', 'охуи', 'мудак',
+    'сука', 'заеб', 'уебок', 'уебищ', 'уебан', 'гандон',
+    'пидор', 'шлюха', 'долбоеб', 'мразь', 'ублюдок',
+    'фывфыв',
+)
+
+# Короткие слова совпадают только целиком: как основы они ловили бы
+# обычные слова («бля» - «бляха»)
+RUSSIAN_WORDS = ('бля', 'еб', 'ебу', 'уеб')
+
+# Замены символов, которыми маскируют буквы в словах с кириллицей
+CYRILLIC_LOOKALIKES = str.maketrans({
+    'a': 'а', 'b': 'в', 'c': 'с', 'e': 'е', 'h': 'н', 'k': 'к', 'm': 'м',
+    'o': 'о', 'p': 'р', 't': 'т', 'x': 'х', 'y': 'у',
+    '0': 'о', '3': 'з', '6': 'б', '@': 'а',
+})
+
+# То же для латиницы (как в better_profanity: a→@/4, s→$/5 и т.д.)
+LATIN_LOOKALIKES = str.maketrans({
+    '@': 'a', '4': 'a', '1': 'i', '!': 'i', '0': 'o', '3': 'e', '$': 's', '5': 's', '7': 't',
+})
+
+# Текстовые поля вакансии, проверяемые модерацией, и их названия
+VACANCY_TEXT_FIELDS = {
+    'position': 'Должность',
+    'description': 'Описание вакансии',
+    'requirements': 'Требования',
+    'city': 'Город',
+    'work_conditions_details': 'Детали условий работы',
+}
+
+TOKEN_RE = re.compile(r'[\w@$!]+')
+CYRILLIC_RE = re.compile(r'[а-я]')
+# Слово, разбитое на отдельные буквы: «х.у.й», «f u c k»
+SPACED_LETTERS_RE = re.compile(r'\b(?:\w[ .\-_*]){2,}\w\b')
+SEPARATOR_RE = re.compile(r'[ .\-_*]')
+
+
+class ProfanityMatcher:
+    """
+    Поиск нецензурной лексики по автомату Ахо-Корасик.
+    Весь словарь компилируется в один автомат, и текст любой длины
+    проверяется за один проход после нормализации регистра, «ё» и
+    типичных подмен символов.
+    """
+
+    def __init__(self, words=(), stems=()):
+        """words совпадают только целым словом, stems - с начала слова"""
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        # Разные написания слова из словаря сводятся к одной форме
+        for word in {self.normalize(word) for word in words}:
+            self._add(word, True)
+        for stem in {self.normalize(stem) for stem in stems}:
+            self._add(stem, False)
+        self._build_failure_links()
+
+    @staticmethod
+    def _map_token(match):
+        token = match.group()
+        if CYRILLIC_RE.search(token):
+            return token.translate(CYRILLIC_LOOKALIKES)
+        return token.translate(LATIN_LOOKALIKES)
+
+    @staticmethod
+    def normalize(text):
+        text = text.lower().replace('ё', 'е')
+        text = SPACED_LETTERS_RE.sub(lambda match: SEPARATOR_RE.sub('', match.group()), text)
+        return TOKEN_RE.sub(ProfanityMatcher._map_token, text)
+
+    def _add(self, word, whole_word):
+        if not word:
+            return
+        node = 0
+        for char in word:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+                self._goto[node][char] = next_node
+            node = next_node
+        self._output[node] += ((word, whole_word),)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] += self._output[self._fail[child]]
+
+    def iter_matches(self, text):
+        """Найденные слова словаря в порядке их появления в тексте"""
+        text = self.normalize(text)
+        goto, fail, output = self._goto, self._fail, self._output
+        last = len(text) - 1
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for word, whole_word in output[node]:
+                start = position - len(word) + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if whole_word and position < last and text[position + 1].isalnum():
+                    continue
+                yield word
+
+    def contains_profanity(self, text):
+        return next(self.iter_matches(text), None) is not None
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def default():
+        """Общий автомат: английский словарь better_profanity, RUSSIAN_WORDS и RUSSIAN_STEMS"""
+        words = read_wordlist(get_complete_path_of_file('profanity_wordlist.txt'))
+        return ProfanityMatcher(list(words) + list(RUSSIAN_WORDS), RUSSIAN_STEMS)
+
+
+def check_vacancy_rows(rows):
+    """
+    Проверка пачки вакансий [(id, поле1, поле2, ...), ...] в порядке
+    VACANCY_TEXT_FIELDS. Возвращает [(id, {поле: [слова]}), ...] только
+    для вакансий с найденными словами. Функция уровня модуля, чтобы ее
+    можно было выполнять в пуле процессов.
+    """
+    matcher = ProfanityMatcher.default()
+    flagged = []
+    for vacancy_id, *values in rows:
+        fields = {}
+        for field, value in zip(VACANCY_TEXT_FIELDS, values):
+            if value:
+                words = sorted(set(matcher.iter_matches(str(value))))
+                if words:
+                    fields[field] = words
+        if fields:
+            flagged.append((vacancy_id, fields))
+    return flagged
+
@@ -0,0 +1,129 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+
+
+class KeysetPage:
+    """Страница keyset-пагинации: элементы и курсоры соседних страниц"""
+
+    def __init__(self, object_list, next_cursor, previous_cursor, count, count_is_estimate):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+        self.count_is_estimate = count_is_estimate
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Пагинация по курсору (seek) для упорядочивания (field, id).
+    Страница выбирается условием WHERE по ключу последней показанной записи,
+    поэтому глубокие страницы стоят столько же, сколько первая, а вместо
+    COUNT(*) используется оценка планировщика PostgreSQL.
+    """
+
+    # Ниже этой оценки точный COUNT(*) дешев, а оценка планировщика неточна
+    EXACT_COUNT_THRESHOLD = 1000
+
+    DIRECTION_NEXT = 'n'
+    DIRECTION_PREVIOUS = 'p'
+
+    def __init__(self, queryset, field, per_page, descending=True, with_count=True):
+        self.queryset = queryset
+        self.field = field
+        self.per_page = per_page
+        self.descending = descending
+        # Без подсчета страница не выполняет EXPLAIN/COUNT, count будет None
+        self.with_count = with_count
+        self.model_field = queryset.model._meta.get_field(field)
+
+    def encode_cursor(self, obj, direction):
+        value = self.model_field.value_to_string(obj)
+        data = json.dumps([direction, value, obj.pk])
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """Разбор курсора; некорректный курсор означает первую страницу"""
+        try:
+            direction, value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if direction not in (self.DIRECTION_NEXT, self.DIRECTION_PREVIOUS):
+                return None
+            return direction, self.model_field.to_python(value), int(pk)
+        except (ValueError, TypeError, ValidationError):
+            return None
+
+    def _seek_filter(self, value, pk, forward):
+        """Условие «после ключа (value, pk)» в порядке выдачи или обратном ему"""
+        lookup = 'lt' if forward == self.descending else 'gt'
+        bound = 'lte' if lookup == 'lt' else 'gte'
+        # Условие по одному полю позволяет планировщику сделать range scan по индексу
+        return Q(**{f'{self.field}__{bound}': value}) & (
+            Q(**{f'{self.field}__{lookup}': value}) |
+            Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+
+    def _ordering(self, forward):
+        descending = self.descending == forward
+        if descending:
+            return F(self.field).desc(), F('pk').desc()
+        return F(self.field).asc(), F('pk').asc()
+
+    def estimate_count(self):
+        """Оценка числа строк по плану запроса, точный подсчет для малых выборок"""
+        queryset = self.queryset.order_by()
+        plan = json.loads(queryset.explain(format='json'))
+        estimate = plan[0]['Plan']['Plan Rows']
+        if estimate < self.EXACT_COUNT_THRESHOLD:
+            return queryset.count(), False
+        return estimate, True
+
+    def get_page(self, cursor=None):
+        decoded = self.decode_cursor(cursor) if cursor else None
+        forward = decoded is None or decoded[0] == self.DIRECTION_NEXT
+
+        queryset = self.queryset
+        if decoded:
+            queryset = queryset.filter(self._seek_filter(decoded[1], decoded[2], forward))
+        rows = list(queryset.order_by(*self._ordering(forward))[:self.per_page + 1])
+
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+
+        if forward:
+            has_next, has_previous = has_more, decoded is not None
+        else:
+            has_next, has_previous = True, has_more
+
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.encode_cursor(rows[-1], self.DIRECTION_NEXT)
+        if rows and has_previous:
+            previous_cursor = self.encode_cursor(rows[0], self.DIRECTION_PREVIOUS)
+
+        if not self.with_count:
+            count, count_is_estimate = None, False
+        elif decoded is None and not has_more:
+            # Вся выборка уместилась на первой странице
+            count, count_is_estimate = len(rows), False
+        else:
+            count, count_is_estimate = self.estimate_count()
+        return KeysetPage(rows, next_cursor, previous_cursor, count, count_is_estimate)
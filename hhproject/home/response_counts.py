@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import Response, StatusResponse
+
+
+class ResponseStatusCounts:
+    """
+    Счетчики откликов компании по статусам для страницы откликов.
+    Считаются одним запросом с условной агрегацией и хранятся в кэше
+    по ключу на каждый статус, чтобы смена статуса отклика меняла их
+    через incr/decr без пересчета.
+    """
+
+    # Ключ счетчика и название статуса отклика
+    STATUSES = {
+        'new': 'Новый',
+        'viewed': 'Просмотрен',
+        'invited': 'Приглашен',
+        'rejected': 'Отклонен',
+    }
+
+    FIELDS = ('total',) + tuple(STATUSES)
+
+    @staticmethod
+    def _key(company_id, field):
+        return f'response_counts:{company_id}:{field}'
+
+    @staticmethod
+    def status_key(status_name):
+        """Ключ счетчика для названия статуса или None, если статус не выводится"""
+        for key, name in ResponseStatusCounts.STATUSES.items():
+            if name == status_name:
+                return key
+        return None
+
+    @staticmethod
+    def compute(company_id):
+        """Подсчет всех счетчиков компании одним запросом"""
+        aggregates = {'total': Count('id')}
+        for key, name in ResponseStatusCounts.STATUSES.items():
+            aggregates[key] = Count('id', filter=Q(status__status_response_name=name))
+        return Response.objects.filter(vacancy__company_id=company_id).aggregate(**aggregates)
+
+    @staticmethod
+    def get(company_id):
+        keys = {field: ResponseStatusCounts._key(company_id, field) for field in ResponseStatusCounts.FIELDS}
+        cached = cache.get_many(keys.values())
+        if len(cached) == len(keys):
+            return {field: cached[key] for field, key in keys.items()}
+
+        counts = ResponseStatusCounts.compute(company_id)
+        cache.set_many(
+            {keys[field]: value for field, value in counts.items()},
+            settings.RESPONSE_COUNTS_TIMEOUT
+        )
+        return counts
+
+    @staticmethod
+    def apply_status_change(company_id, old_status_name, new_status_name, count=1):
+        """Перенос count откликов между счетчиками статусов после их обновления"""
+        old_key = ResponseStatusCounts.status_key(old_status_name)
+        new_key = ResponseStatusCounts.status_key(new_status_name)
+        if old_key == new_key:
+            return
+        try:
+            if old_key:
+                cache.decr(ResponseStatusCounts._key(company_id, old_key), count)
+            if new_key:
+                cache.incr(ResponseStatusCounts._key(company_id, new_key), count)
+        except ValueError:
+            # Часть счетчиков вытеснена из кэша - пересчитаем при следующем чтении
+            ResponseStatusCounts.invalidate(company_id)
+
+    @staticmethod
+    def invalidate(company_id):
+        cache.delete_many([
+            ResponseStatusCounts._key(company_id, field) for field in ResponseStatusCounts.FIELDS
+        ])
+
+
+class ResponseStatusChoices:
+    """
+    Варианты статуса отклика для выпадающего списка на странице откликов.
+    Справочник меняется редко, поэтому хранится в кэше и не запрашивается
+    формой на каждую строку списка.
+    """
+
+    CACHE_KEY = 'response_status_choices'
+
+    @staticmethod
+    def get():
+        """Список пар (id, название) статусов"""
+        choices = cache.get(ResponseStatusChoices.CACHE_KEY)
+        if choices is None:
+            choices = list(StatusResponse.objects.order_by('pk').values_list('pk', 'status_response_name'))
+            cache.set(ResponseStatusChoices.CACHE_KEY, choices, settings.RESPONSE_COUNTS_TIMEOUT)
+        return choices
+
+    @staticmethod
+    def invalidate():
+        cache.delete(ResponseStatusChoices.CACHE_KEY)
@@ -0,0 +1,124 @@
+from collections import Counter
+
+from django.db import transaction
+
+from .counters import PlatformCounters
+from .email_outbox import EmailOutboxService
+from .emails import EmailRenderer
+from .models import ActionType, AdminLog, Response
+from .response_counts import ResponseStatusCounts
+from .rollups import StatisticsRollup
+
+
+class ResponseStatusNotifications:
+    """Письма соискателям о смене статуса отклика"""
+
+    TEMPLATE = 'response_status'
+
+    @staticmethod
+    def _subject(response):
+        return f'Статус вашего отклика на вакансию "{response.vacancy.position}" изменен'
+
+    @staticmethod
+    def _context(response, old_status_name, new_status_name):
+        return {
+            'first_name': response.applicants.first_name,
+            'position': response.vacancy.position,
+            'old_status': old_status_name,
+            'new_status': new_status_name,
+        }
+
+    @staticmethod
+    def build_message(response, old_status_name, new_status_name):
+        """Письмо в виде (тема, текст, получатель) для очереди EmailOutboxService"""
+        body, _ = EmailRenderer.render(
+            ResponseStatusNotifications.TEMPLATE,
+            ResponseStatusNotifications._context(response, old_status_name, new_status_name)
+        )
+        return ResponseStatusNotifications._subject(response), body, response.applicants.user.email
+
+    @staticmethod
+    def build_messages(changes):
+        """Письма для пачки изменений [(отклик, старый статус, новый статус), ...]"""
+        rendered = EmailRenderer.render_many(
+            ResponseStatusNotifications.TEMPLATE,
+            [ResponseStatusNotifications._context(*change) for change in changes]
+        )
+        return [
+            (ResponseStatusNotifications._subject(response), body, response.applicants.user.email)
+            for (response, _, _), (body, _) in zip(changes, rendered)
+        ]
+
+
+class ResponseBulkStatusUpdate:
+    """
+    Массовая смена статуса откликов компании: один UPDATE, одна пачка
+    записей журнала AdminLog и одна пачка писем в очереди email_outbox.
+    """
+
+    ACTION_CODE = 'response_status_updated'
+    ACTION_NAME = 'Статус отклика обновлен'
+
+    # Ограничение числа откликов в одном запросе
+    MAX_RESPONSES = 500
+
+    @staticmethod
+    def apply(company, response_ids, new_status, user, ip_address=None, user_agent=''):
+        """
+        Перевод откликов компании в статус new_status.
+        Отклики других компаний и отклики, уже имеющие этот статус,
+        пропускаются. Возвращает число измененных откликов.
+        """
+        responses = list(
+            Response.objects.filter(pk__in=response_ids[:ResponseBulkStatusUpdate.MAX_RESPONSES],
+                                    vacancy__company=company)
+            .exclude(status=new_status)
+            .select_related('applicants__user', 'vacancy', 'status')
+        )
+        if not responses:
+            return 0
+
+        new_status_name = new_status.status_response_name
+        action_type, _ = ActionType.objects.get_or_create(
+            code=ResponseBulkStatusUpdate.ACTION_CODE,
+            defaults={'name': ResponseBulkStatusUpdate.ACTION_NAME}
+        )
+
+        with transaction.atomic():
+            Response.objects.filter(pk__in=[response.pk for response in responses]).update(status=new_status)
+            AdminLog.objects.bulk_create([
+                AdminLog(
+                    admin=user,
+                    action=action_type,
+                    target_company=company,
+                    target_object_id=response.pk,
+                    target_content_type=Response.__name__,
+                    details=(
+                        f'Статус отклика на вакансию "{response.vacancy.position}" изменен '
+                        f'с "{response.status.status_response_name}" на "{new_status_name}"'
+                    ),
+                    ip_address=ip_address,
+                    user_agent=user_agent,
+                )
+                for response in responses
+            ])
+            # QuerySet.update не вызывает сигналы, итоги статистики переносим сами
+            StatisticsRollup.apply(
+                change
+                for response in responses
+                for change in (
+                    ('response', StatisticsRollup.day_of(response.response_date), response.status_id, -1),
+                    ('response', StatisticsRollup.day_of(response.response_date), new_status.pk, 1),
+                )
+            )
+            EmailOutboxService.enqueue_many(ResponseStatusNotifications.build_messages([
+                (response, response.status.status_response_name, new_status_name)
+                for response in responses
+            ]))
+
+        old_statuses = Counter(response.status.status_response_name for response in responses)
+        for old_status_name, count in old_statuses.items():
+            ResponseStatusCounts.apply_status_change(company.pk, old_status_name, new_status_name, count)
+        # QuerySet.update не вызывает сигналы post_save
+        PlatformCounters.invalidate()
+        return len(responses)
@@ -0,0 +1,118 @@
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Company, Complaint, DailyRollup, Response, User, Vacancy
+from .timeseries import TimeSeries
+
+
+class StatisticsRollup:
+    """
+    Дневные итоги для статистики админ-панели (таблица daily_rollups).
+    Создание, удаление и смена типа/статуса/категории объекта учитываются
+    инкрементально (см. signals.py), поэтому статистика за любой период
+    считается суммированием нескольких сотен строк итогов, а не COUNT по
+    базовым таблицам с приведением даты.
+    """
+
+    # Сущность: (модель, поле даты создания, поле разреза)
+    SOURCES = {
+        'user': (User, 'date_joined', 'user_type'),
+        'company': (Company, 'created_at', 'status'),
+        'vacancy': (Vacancy, 'created_date', 'category'),
+        'response': (Response, 'response_date', 'status_id'),
+        'complaint': (Complaint, 'created_at', 'complaint_type'),
+    }
+
+    @staticmethod
+    def source_for(model):
+        """(сущность, поле даты, поле разреза) для модели или None"""
+        for entity, (source_model, date_field, key_field) in StatisticsRollup.SOURCES.items():
+            if source_model is model:
+                return entity, date_field, key_field
+        return None
+
+    @staticmethod
+    def day_of(value):
+        """День в часовом поясе проекта, как у фильтров __date"""
+        return timezone.localdate(value) if value else timezone.localdate()
+
+    @staticmethod
+    def key_of(value):
+        return '' if value is None else str(value)
+
+    @staticmethod
+    def apply(changes):
+        """
+        Применение изменений [(сущность, день, ключ, +-количество), ...]
+        одним INSERT ... ON CONFLICT DO UPDATE.
+        """
+        merged = Counter()
+        for entity, day, key, delta in changes:
+            merged[(entity, day, StatisticsRollup.key_of(key))] += delta
+        rows = [(entity, day, key, delta) for (entity, day, key), delta in merged.items() if delta]
+        if not rows:
+            return
+
+        table = connection.ops.quote_name(DailyRollup._meta.db_table)
+        values = ', '.join(['(%s, %s, %s, %s)'] * len(rows))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (entity, day, key, count) VALUES {values} '
+                f'ON CONFLICT (entity, day, key) DO UPDATE SET count = {table}.count + EXCLUDED.count',
+                [value for row in rows for value in row]
+            )
+
+    @staticmethod
+    def rebuild():
+        """Полный пересчет итогов по базовым таблицам, возвращает число строк"""
+        rows = []
+        for entity, (model, date_field, key_field) in StatisticsRollup.SOURCES.items():
+            groups = model.objects.annotate(rollup_day=TruncDate(date_field)).values(
+                'rollup_day', key_field
+            ).annotate(total=Count('pk')).order_by()
+            rows += [
+                DailyRollup(
+                    entity=entity,
+                    day=group['rollup_day'],
+                    key=StatisticsRollup.key_of(group[key_field]),
+                    count=group['total'],
+                )
+                for group in groups
+            ]
+        with transaction.atomic():
+            DailyRollup.objects.all().delete()
+            DailyRollup.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+    @staticmethod
+    def period_filter(start_date=None, end_date=None):
+        if start_date and end_date:
+            return Q(day__range=[start_date, end_date])
+        return Q()
+
+    @staticmethod
+    def total(entity, *conditions):
+        """Выражение Sum для aggregate по итогам сущности с условиями"""
+        condition = Q(entity=entity)
+        for extra in conditions:
+            condition &= extra
+        return Sum('count', filter=condition, default=0)
+
+    @staticmethod
+    def distribution(entity, start_date=None, end_date=None):
+        """[(ключ, количество), ...] за период по убыванию количества"""
+        rows = DailyRollup.objects.filter(
+            StatisticsRollup.period_filter(start_date, end_date), entity=entity
+        ).values('key').annotate(total=Sum('count')).filter(total__gt=0).order_by('-total', 'key')
+        return [(row['key'], row['total']) for row in rows]
+
+    @staticmethod
+    def series(entity, start_date, end_date, period='day'):
+        """[(начало интервала, количество), ...] за период с нулями в пропусках"""
+        return TimeSeries.series(
+            DailyRollup.objects.filter(entity=entity), 'day', period, start_date, end_date, value=Sum('count')
+        )
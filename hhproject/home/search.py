@@ -0,0 +1,207 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.core.paginator import Paginator
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+
+from .pagination import KeysetPaginator
+
+
+class VacancySearchService:
+    """Поиск и фильтрация публичного списка вакансий"""
+
+    # Те же конфигурации, что и в триггере search_vector (миграция 0002)
+    SEARCH_CONFIGS = ('russian', 'english')
+
+    SORT_RELEVANCE = 'relevance'
+    SORT_NEWEST = 'newest'
+    SORT_SALARY_HIGH = 'salary_high'
+    SORT_SALARY_LOW = 'salary_low'
+
+    SEARCH_MODE_AUTO = 'auto'
+    SEARCH_MODE_EXACT = 'exact'
+    SEARCH_MODE_FUZZY = 'fuzzy'
+
+    # Поле ключа и направление keyset-пагинации для каждой сортировки
+    KEYSET_SORTS = {
+        SORT_NEWEST: ('created_date', True),
+        SORT_SALARY_HIGH: ('salary_max', True),
+        SORT_SALARY_LOW: ('salary_min', False),
+    }
+
+    # Если точный поиск нашел меньше вакансий, выдача дополняется нечеткими совпадениями
+    FUZZY_MIN_RESULTS = 3
+
+    # Поля нечеткого поиска (с GIN-индексами gin_trgm_ops)
+    FUZZY_FIELDS = ('position', 'company__name')
+
+    @staticmethod
+    def build_query(search_text):
+        """Запрос в формате websearch сразу для всех конфигураций"""
+        query = None
+        for config in VacancySearchService.SEARCH_CONFIGS:
+            config_query = SearchQuery(search_text, config=config, search_type='websearch')
+            query = config_query if query is None else query | config_query
+        return query
+
+    @staticmethod
+    def search(queryset, search_text):
+        """Полнотекстовый поиск по GIN-индексу с аннотацией релевантности rank"""
+        query = VacancySearchService.build_query(search_text)
+        return queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query)
+        )
+
+    @staticmethod
+    def fuzzy_search(queryset, search_text, extra_ids=(), fields=FUZZY_FIELDS):
+        """
+        Нечеткий поиск по триграммам полей fields (должность и название компании).
+        Оператор %> обслуживается GIN-индексами gin_trgm_ops, порог задается
+        настройкой TRIGRAM_WORD_SIMILARITY_THRESHOLD. Вакансии из extra_ids
+        включаются в выдачу с максимальной релевантностью.
+        """
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f'{field}__trigram_word_similar': search_text})
+        similarities = [TrigramWordSimilarity(search_text, field) for field in fields]
+        similarity = Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+        if extra_ids:
+            condition |= Q(pk__in=extra_ids)
+            similarity = Case(
+                When(pk__in=extra_ids, then=Value(1.0)),
+                default=similarity,
+                output_field=FloatField(),
+            )
+        return queryset.filter(condition).annotate(rank=similarity)
+
+    @staticmethod
+    def with_fuzzy_fallback(queryset, matched, search_text, fields=FUZZY_FIELDS):
+        """Дополнение слишком короткой выдачи нечеткими совпадениями"""
+        min_results = VacancySearchService.FUZZY_MIN_RESULTS
+        matched_ids = list(matched.values_list('pk', flat=True)[:min_results])
+        if len(matched_ids) >= min_results:
+            return matched
+        return VacancySearchService.fuzzy_search(queryset, search_text, matched_ids, fields)
+
+    @staticmethod
+    def apply_search(queryset, search_text, mode=SEARCH_MODE_AUTO, extra_ids=()):
+        """
+        Поиск в выбранном режиме: auto, exact или fuzzy.
+        extra_ids - вакансии, которые нечеткий поиск оставляет в выдаче
+        """
+        if mode == VacancySearchService.SEARCH_MODE_FUZZY:
+            return VacancySearchService.fuzzy_search(queryset, search_text, extra_ids)
+
+        matched = VacancySearchService.search(queryset, search_text)
+        if mode == VacancySearchService.SEARCH_MODE_EXACT:
+            return matched
+        return VacancySearchService.with_fuzzy_fallback(queryset, matched, search_text)
+
+    @staticmethod
+    def resolve_search_mode(queryset, params):
+        """
+        Режим поиска для выдачи queryset и id вакансий для нечеткого поиска.
+        В режиме auto точный поиск проверяется один раз, чтобы список и фасеты
+        использовали одно и то же решение о нечетком поиске.
+        """
+        search_query = params.get('search', '')
+        mode = params.get('search_mode', VacancySearchService.SEARCH_MODE_AUTO)
+        if not search_query or mode != VacancySearchService.SEARCH_MODE_AUTO:
+            return mode, ()
+
+        min_results = VacancySearchService.FUZZY_MIN_RESULTS
+        matched = VacancySearchService.search(queryset, search_query)
+        matched_ids = list(matched.values_list('pk', flat=True)[:min_results])
+        if len(matched_ids) >= min_results:
+            return VacancySearchService.SEARCH_MODE_EXACT, ()
+        return VacancySearchService.SEARCH_MODE_FUZZY, tuple(matched_ids)
+
+    @staticmethod
+    def get_filter_conditions(params):
+        """Условия фильтров боковой панели по фасетам (без поиска)"""
+        conditions = {}
+        employment_filters = params.getlist('employment')
+        if employment_filters:
+            conditions['work_conditions'] = Q(work_conditions__work_conditions_name__in=employment_filters)
+
+        for facet in ('experience', 'category', 'city'):
+            values = params.getlist(facet)
+            if values:
+                conditions[facet] = Q(**{f'{facet}__in': values})
+
+        salary_from = params.get('salary_from')
+        salary_to = params.get('salary_to')
+        salary_condition = Q()
+        if salary_from:
+            salary_condition &= Q(salary_min__gte=salary_from)
+        if salary_to:
+            salary_condition &= Q(salary_max__lte=salary_to)
+        if salary_condition:
+            conditions['salary'] = salary_condition
+        return conditions
+
+    @staticmethod
+    def apply_sidebar_filters(queryset, params):
+        """Фильтры боковой панели из GET-запроса без поиска"""
+        for condition in VacancySearchService.get_filter_conditions(params).values():
+            queryset = queryset.filter(condition)
+        return queryset
+
+    @staticmethod
+    def apply_filters(queryset, params):
+        """Применение параметров поиска и фильтров из GET-запроса"""
+        # Поиск выполняется последним, чтобы решение о нечетком поиске
+        # принималось по уже отфильтрованной выдаче
+        queryset = VacancySearchService.apply_sidebar_filters(queryset, params)
+        return VacancySearchService.apply_search_params(queryset, params)
+
+    @staticmethod
+    def apply_search_params(queryset, params, mode=None, extra_ids=()):
+        """
+        Поиск по параметрам search и search_mode, если они заданы.
+        mode и extra_ids - заранее выбранный resolve_search_mode режим
+        """
+        search_query = params.get('search', '')
+        if search_query:
+            if mode is None:
+                mode = params.get('search_mode', VacancySearchService.SEARCH_MODE_AUTO)
+            queryset = VacancySearchService.apply_search(queryset, search_query, mode, extra_ids)
+        return queryset
+
+    @staticmethod
+    def get_sort(params):
+        """Сортировка по умолчанию: по релевантности при поиске, иначе новые"""
+        sort_by = params.get('sort')
+        if sort_by == VacancySearchService.SORT_RELEVANCE and not params.get('search'):
+            sort_by = None
+        if not sort_by:
+            if params.get('search'):
+                return VacancySearchService.SORT_RELEVANCE
+            return VacancySearchService.SORT_NEWEST
+        return sort_by
+
+    @staticmethod
+    def apply_sort(queryset, sort_by):
+        """Упорядочивание списка вакансий"""
+        if sort_by == VacancySearchService.SORT_RELEVANCE:
+            return queryset.order_by('-rank', '-created_date', '-id')
+        if sort_by == VacancySearchService.SORT_SALARY_HIGH:
+            return queryset.order_by('-salary_max', '-id')
+        if sort_by == VacancySearchService.SORT_SALARY_LOW:
+            return queryset.order_by('salary_min', 'id')
+        return queryset.order_by('-created_date', '-id')
+
+    @staticmethod
+    def paginate(queryset, sort_by, params, per_page):
+        """
+        Страница списка вакансий. Для сортировок по дате и зарплате используется
+        keyset-пагинация по параметру cursor, выдача по релевантности ограничена
+        результатами поиска и листается обычным Paginator по параметру page.
+        """
+        keyset = VacancySearchService.KEYSET_SORTS.get(sort_by)
+        if keyset is None:
+            queryset = VacancySearchService.apply_sort(queryset, sort_by)
+            return Paginator(queryset, per_page).get_page(params.get('page'))
+
+        field, descending = keyset
+        paginator = KeysetPaginator(queryset, field, per_page, descending=descending)
+        return paginator.get_page(params.get('cursor'))
@@ -0,0 +1,13 @@
+from django.conf import settings
+
+
+# Бэкенды, данные которых видны только текущему процессу
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_shared_cache(alias='default'):
+    """Виден ли кэш другим процессам (веб-воркерам и командам)"""
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_BACKENDS
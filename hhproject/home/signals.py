@@ -0,0 +1,157 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .counters import PlatformCounters
+from .detail_cache import VacancyDetailCache
+from .models import Applicant, Company, Complaint, Response, StatusResponse, User, Vacancy
+from .response_counts import ResponseStatusChoices, ResponseStatusCounts
+from .rollups import StatisticsRollup
+
+
+@receiver(post_save, sender=Vacancy)
+@receiver(post_save, sender=Company)
+@receiver(post_save, sender=Applicant)
+@receiver(post_save, sender=Response)
+def invalidate_platform_counters_on_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Сброс счетчиков главных страниц при создании объекта или изменении
+    учитываемых полей (статусов, компании вакансии). Прочие сохранения
+    снимок счетчиков не сбрасывают.
+    """
+    if raw:
+        return
+    old_values = getattr(instance, '_old_values', {})
+    if created or any(
+        field in old_values and old_values[field] != getattr(instance, field)
+        for field in PlatformCounters.COUNTED_FIELDS[sender]
+    ):
+        PlatformCounters.invalidate()
+
+
+@receiver(post_delete, sender=Vacancy)
+@receiver(post_delete, sender=Company)
+@receiver(post_delete, sender=Applicant)
+@receiver(post_delete, sender=Response)
+def invalidate_platform_counters_on_delete(sender, **kwargs):
+    """Сброс счетчиков главных страниц при удалении учитываемых объектов"""
+    PlatformCounters.invalidate()
+
+
+def _response_company_id(instance, origin=None):
+    """Компания отклика без загрузки вакансии, если она уже известна"""
+    if isinstance(origin, Company):
+        return origin.pk
+    if isinstance(origin, Vacancy):
+        return origin.company_id
+    if Response.vacancy.is_cached(instance):
+        return instance.vacancy.company_id
+    return Vacancy.objects.filter(pk=instance.vacancy_id).values_list('company_id', flat=True).first()
+
+
+@receiver(post_save, sender=Response)
+def update_response_counts_on_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Счетчики откликов компании: появление отклика сбрасывает их, смена
+    статуса (прежний статус запоминает remember_old_values) переносит отклик
+    между счетчиками через incr/decr без пересчета. Массовая смена статуса
+    через QuerySet.update учитывается в ResponseBulkStatusUpdate.
+    """
+    if raw:
+        return
+    if created:
+        ResponseStatusCounts.invalidate(_response_company_id(instance))
+        return
+    old_status_id = getattr(instance, '_old_values', {}).get('status_id', instance.status_id)
+    if old_status_id != instance.status_id:
+        names = dict(ResponseStatusChoices.get())
+        ResponseStatusCounts.apply_status_change(
+            _response_company_id(instance), names.get(old_status_id), names.get(instance.status_id)
+        )
+
+
+@receiver(post_delete, sender=Response)
+def invalidate_response_counts_on_delete(sender, instance, origin=None, **kwargs):
+    """Сброс счетчиков откликов компании при удалении отклика"""
+    ResponseStatusCounts.invalidate(_response_company_id(instance, origin))
+
+
+@receiver(post_save, sender=Company)
+def invalidate_company_vacancy_pages(sender, instance, created, raw=False, **kwargs):
+    """Сброс кэша страниц вакансий компании: в них выводятся ее название и описание"""
+    if raw or created:
+        return
+    VacancyDetailCache.invalidate_company(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=StatusResponse)
+def invalidate_response_status_choices(sender, **kwargs):
+    """Сброс кэша вариантов статуса отклика при изменении справочника"""
+    ResponseStatusChoices.invalidate()
+
+
+def _rollup_day(instance, date_field):
+    return StatisticsRollup.day_of(getattr(instance, date_field))
+
+
+def _tracked_fields(sender):
+    """Поля, прежние значения которых нужны обработчикам post_save"""
+    fields = list(PlatformCounters.COUNTED_FIELDS.get(sender, ()))
+    source = StatisticsRollup.source_for(sender)
+    if source and source[2] not in fields:
+        fields.append(source[2])
+    return fields
+
+
+@receiver(pre_save, sender=User)
+@receiver(pre_save, sender=Company)
+@receiver(pre_save, sender=Vacancy)
+@receiver(pre_save, sender=Response)
+@receiver(pre_save, sender=Complaint)
+def remember_old_values(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Запоминает прежние значения разреза статистики и учитываемых счетчиками
+    полей перед изменением объекта - одним запросом на сохранение.
+    """
+    instance.__dict__.pop('_old_values', None)
+    if raw or instance._state.adding:
+        return
+    fields = [
+        field for field in _tracked_fields(sender)
+        if update_fields is None or sender._meta.get_field(field).name in update_fields
+    ]
+    if not fields:
+        return
+    row = sender.objects.filter(pk=instance.pk).values_list(*fields).first()
+    if row is not None:
+        instance._old_values = dict(zip(fields, row))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Company)
+@receiver(post_save, sender=Vacancy)
+@receiver(post_save, sender=Response)
+@receiver(post_save, sender=Complaint)
+def update_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    """Учет нового объекта или смены его разреза в дневных итогах"""
+    if raw:
+        return
+    entity, date_field, key_field = StatisticsRollup.source_for(sender)
+    day = _rollup_day(instance, date_field)
+    key = getattr(instance, key_field)
+    if created:
+        StatisticsRollup.apply([(entity, day, key, 1)])
+    elif key_field in getattr(instance, '_old_values', {}):
+        old_key = instance._old_values[key_field]
+        if StatisticsRollup.key_of(old_key) != StatisticsRollup.key_of(key):
+            StatisticsRollup.apply([(entity, day, old_key, -1), (entity, day, key, 1)])
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Company)
+@receiver(post_delete, sender=Vacancy)
+@receiver(post_delete, sender=Response)
+@receiver(post_delete, sender=Complaint)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    entity, date_field, key_field = StatisticsRollup.source_for(sender)
+    StatisticsRollup.apply([(entity, _rollup_day(instance, date_field), getattr(instance, key_field), -1)])
+
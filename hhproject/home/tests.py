@@ -1,3 +1,767 @@
-from django.test import TestCase
+from datetime import date, datetime, timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .counters import PlatformCounters
+from .detail_cache import VacancyDetailCache
+from .email_outbox import EmailOutboxService
+from .emails import EmailRenderer
+from .facets import VacancyFacetService
+from .interactions import ApplicantInteractionMap
+from .models import *
+from .moderation import ProfanityMatcher
+from .rollups import StatisticsRollup
+from .search import VacancySearchService
+from .timeseries import TimeSeries
+from .view_counter import VacancyViewCounter
+from .views import send_reset_code_email
+
+
+class VacancyTestDataMixin:
+    def create_test_data(self):
+        """Создание тестовых данных"""
+        self.company_user = User.objects.create_user(
+            email='company@example.com',
+            username='companyuser',
+            phone='+77777777777',
+            password='testpass123',
+            user_type='company'
+        )
+        self.company = Company.objects.create(
+            user=self.company_user,
+            name='Яндекс',
+            number='1234567890',
+            industry='IT',
+            description='Test description',
+            status=Company.STATUS_APPROVED
+        )
+        self.work_condition = WorkConditions.objects.create(work_conditions_name='Офис')
+        self.remote_condition = WorkConditions.objects.create(work_conditions_name='Удаленно')
+        self.active_status = StatusVacancies.objects.create(status_vacancies_name='Активна')
+
+    def create_vacancy(self, position, description='Описание', **kwargs):
+        data = {
+            'company': self.company,
+            'work_conditions': self.work_condition,
+            'position': position,
+            'description': description,
+            'requirements': 'Требования',
+            'salary_min': 50000,
+            'salary_max': 100000,
+            'status': self.active_status,
+            'experience': '1-3 года',
+            'city': 'Москва',
+            'category': 'IT',
+        }
+        data.update(kwargs)
+        return Vacancy.objects.create(**data)
+
+
+class VacancySearchTest(VacancyTestDataMixin, TestCase):
+    def setUp(self):
+        self.create_test_data()
+        self.python_vacancy = self.create_vacancy(
+            'Программист Python',
+            description='Разработка backend сервисов'
+        )
+        self.english_vacancy = self.create_vacancy(
+            'Senior Java Developer',
+            description='Building payment services',
+            work_conditions=self.remote_condition
+        )
+        self.marketing_vacancy = self.create_vacancy(
+            'Маркетолог',
+            description='Продвижение продуктов',
+            category='Маркетинг'
+        )
+
+    def search(self, text):
+        return set(VacancySearchService.search(Vacancy.objects.all(), text))
+
+    def test_russian_stemming(self):
+        """Тест поиска по словоформе на русском"""
+        self.assertEqual(self.search('программисты'), {self.python_vacancy})
+        print("✅ test_russian_stemming - ПРОЙДЕН")
+
+    def test_english_stemming(self):
+        """Тест поиска по словоформе на английском"""
+        self.assertEqual(self.search('developers'), {self.english_vacancy})
+        print("✅ test_english_stemming - ПРОЙДЕН")
+
+    def test_company_name_search_follows_rename(self):
+        """Тест поиска по названию компании после переименования"""
+        self.assertEqual(len(self.search('Яндекс')), 3)
+        self.company.name = 'Тинькофф'
+        self.company.save()
+        self.assertEqual(self.search('Яндекс'), set())
+        self.assertEqual(len(self.search('Тинькофф')), 3)
+        print("✅ test_company_name_search_follows_rename - ПРОЙДЕН")
+
+    def test_filters_with_search(self):
+        """Тест совместной работы поиска и фильтров"""
+        params = QueryDict(mutable=True)
+        params.update({'search': 'services'})
+        params.setlist('employment', ['Удаленно'])
+        result = VacancySearchService.apply_filters(Vacancy.objects.all(), params)
+        self.assertEqual(list(result), [self.english_vacancy])
+        print("✅ test_filters_with_search - ПРОЙДЕН")
+
+    def test_vakansii_page_search(self):
+        """Тест страницы вакансий с поисковым запросом"""
+        response = self.client.get(reverse('vakansi_page'), {'search': 'маркетологи'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['page_obj']), [self.marketing_vacancy])
+        self.assertEqual(response.context['current_sort'], 'relevance')
+        print("✅ test_vakansii_page_search - ПРОЙДЕН")
+
+
+class VacancyFuzzySearchTest(VacancyTestDataMixin, TestCase):
+    def setUp(self):
+        self.create_test_data()
+        self.python_vacancy = self.create_vacancy('Программист Python')
+        self.marketing_vacancy = self.create_vacancy('Интернет-маркетолог', category='Маркетинг')
+
+    def search(self, text, mode=VacancySearchService.SEARCH_MODE_AUTO):
+        return list(VacancySearchService.apply_search(Vacancy.objects.all(), text, mode))
+
+    def test_typo_falls_back_to_fuzzy(self):
+        """Тест поиска с опечаткой в режиме auto"""
+        self.assertEqual(self.search('програмист'), [self.python_vacancy])
+        self.assertEqual(self.search('маркитолог'), [self.marketing_vacancy])
+        print("✅ test_typo_falls_back_to_fuzzy - ПРОЙДЕН")
+
+    def test_exact_mode_has_no_fallback(self):
+        """Тест режима exact без нечеткого поиска"""
+        self.assertEqual(self.search('програмист', VacancySearchService.SEARCH_MODE_EXACT), [])
+        print("✅ test_exact_mode_has_no_fallback - ПРОЙДЕН")
+
+    def test_fallback_keeps_exact_matches_first(self):
+        """Тест того, что точные совпадения остаются первыми в выдаче"""
+        self.create_vacancy('Программист 1С')
+        result = VacancySearchService.apply_search(Vacancy.objects.all(), 'Python')
+        result = result.order_by('-rank')
+        self.assertEqual(result[0], self.python_vacancy)
+        print("✅ test_fallback_keeps_exact_matches_first - ПРОЙДЕН")
+
+
+class VacancyKeysetPaginationTest(VacancyTestDataMixin, TestCase):
+    def setUp(self):
+        self.create_test_data()
+        # Одинаковые зарплаты у части вакансий проверяют разрешение ничьих по id
+        self.vacancies = [
+            self.create_vacancy(f'Вакансия {i}', salary_min=1000 * (i // 2), salary_max=2000 * (i // 2))
+            for i in range(7)
+        ]
+
+    def walk(self, sort_by):
+        """Проход по всем страницам вперед и обратно"""
+        queryset = Vacancy.objects.all()
+        params = {}
+        forward = []
+        while True:
+            page = VacancySearchService.paginate(queryset, sort_by, params, 3)
+            forward.append([v.pk for v in page])
+            if not page.has_next():
+                break
+            params = {'cursor': page.next_cursor}
+        backward = [[v.pk for v in page]]
+        while page.has_previous():
+            page = VacancySearchService.paginate(queryset, sort_by, {'cursor': page.previous_cursor}, 3)
+            backward.insert(0, [v.pk for v in page])
+        return forward, backward
+
+    def test_pages_follow_sort_order(self):
+        """Тест обхода страниц для всех keyset-сортировок"""
+        expected = {
+            'newest': VacancySearchService.apply_sort(Vacancy.objects.all(), 'newest'),
+            'salary_high': VacancySearchService.apply_sort(Vacancy.objects.all(), 'salary_high'),
+            'salary_low': VacancySearchService.apply_sort(Vacancy.objects.all(), 'salary_low'),
+        }
+        for sort_by, queryset in expected.items():
+            ids = [v.pk for v in queryset]
+            forward, backward = self.walk(sort_by)
+            self.assertEqual(forward, [ids[0:3], ids[3:6], ids[6:7]], sort_by)
+            self.assertEqual(backward, forward, sort_by)
+        print("✅ test_pages_follow_sort_order - ПРОЙДЕН")
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Тест некорректного курсора"""
+        page = VacancySearchService.paginate(Vacancy.objects.all(), 'newest', {'cursor': 'garbage'}, 3)
+        self.assertFalse(page.has_previous())
+        self.assertEqual(page.count, 7)
+        self.assertFalse(page.count_is_estimate)
+        print("✅ test_invalid_cursor_returns_first_page - ПРОЙДЕН")
+
+    def test_vakansii_page_uses_cursor(self):
+        """Тест страницы вакансий с курсором"""
+        response = self.client.get(reverse('vakansi_page'))
+        page = response.context['page_obj']
+        self.assertEqual(len(page), 7)
+        self.assertContains(response, 'Найдено вакансий: <strong>7</strong>')
+        print("✅ test_vakansii_page_uses_cursor - ПРОЙДЕН")
+
+
+class VacancyFacetTest(VacancyTestDataMixin, TestCase):
+    def setUp(self):
+        self.create_test_data()
+        self.create_vacancy('Программист Python', salary_min=40000)
+        self.create_vacancy('Программист Java', salary_min=120000, work_conditions=self.remote_condition)
+        self.create_vacancy('Программист Go', salary_min=120000, city='Казань', experience=None)
+        self.create_vacancy('Маркетолог', category='Маркетинг', work_conditions=self.remote_condition)
+
+    def get_facets(self, **params):
+        query = QueryDict(mutable=True)
+        for key, value in params.items():
+            query.setlist(key, value if isinstance(value, list) else [value])
+        queryset = VacancySearchService.apply_search_params(Vacancy.objects.all(), query)
+        conditions = VacancySearchService.get_filter_conditions(query)
+        return VacancyFacetService.get_facets(queryset, conditions)
+
+    def test_facet_counts(self):
+        """Тест счетчиков всех фасетов без фильтров"""
+        facets = self.get_facets()
+        self.assertEqual(facets['work_conditions'], {self.work_condition.pk: 2, self.remote_condition.pk: 2})
+        self.assertEqual(facets['experience'], {'1-3 года': 3, None: 1})
+        self.assertEqual(facets['category'], {'IT': 3, 'Маркетинг': 1})
+        self.assertEqual(facets['city'], {'Москва': 3, 'Казань': 1})
+        self.assertEqual([bucket['count'] for bucket in facets['salary']], [1, 1, 2, 0, 0, 0])
+        print("✅ test_facet_counts - ПРОЙДЕН")
+
+    def test_facet_ignores_own_filter(self):
+        """Тест того, что фасет учитывает все фильтры, кроме собственного"""
+        facets = self.get_facets(search='программист', employment='Удаленно')
+        self.assertEqual(facets['work_conditions'], {self.work_condition.pk: 2, self.remote_condition.pk: 1})
+        self.assertEqual(facets['city'], {'Москва': 1})
+        self.assertEqual(facets['category'], {'IT': 1})
+        print("✅ test_facet_ignores_own_filter - ПРОЙДЕН")
+
+    def test_facets_in_single_query(self):
+        """Тест подсчета всех фасетов за один запрос"""
+        with self.assertNumQueries(1):
+            self.get_facets(search='программист', search_mode='exact', employment='Офис', city=['Москва', 'Казань'], salary_from='10000')
+        print("✅ test_facets_in_single_query - ПРОЙДЕН")
+
+    def test_vakansii_page_shows_counts(self):
+        """Тест вывода счетчиков на странице вакансий"""
+        response = self.client.get(reverse('vakansi_page'), {'category': 'Маркетинг'})
+        self.assertEqual([v.position for v in response.context['page_obj']], ['Маркетолог'])
+        categories = {o['value']: o['count'] for o in response.context['filter_options']['category']}
+        self.assertEqual(categories, {'IT': 3, 'Маркетинг': 1, 'Продажи': 0, 'HR': 0})
+        print("✅ test_vakansii_page_shows_counts - ПРОЙДЕН")
+
+    def test_vakansii_page_decides_search_mode_once(self):
+        """Тест единого режима поиска для списка и счетчиков фильтров"""
+        params = {'search': 'программист', 'city': 'Казань'}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('vakansi_page'), params)
+        probes = [q['sql'] for q in queries.captured_queries if '@@' in q['sql'] and 'LIMIT 3' in q['sql']]
+        self.assertEqual(len(probes), 1)
+
+        # Точный поиск по Казани нашел одну вакансию, поэтому и список,
+        # и счетчики используют нечеткий режим
+        query = QueryDict(mutable=True)
+        query.update(params)
+        filtered = VacancySearchService.apply_sidebar_filters(Vacancy.objects.all(), query)
+        self.assertEqual(
+            VacancySearchService.resolve_search_mode(filtered, query)[0],
+            VacancySearchService.SEARCH_MODE_FUZZY
+        )
+        self.assertEqual([v.position for v in response.context['page_obj']], ['Программист Go'])
+        cities = {o['value']: o['count'] for o in response.context['filter_options']['city']}
+        self.assertEqual(cities['Казань'], 1)
+        print("✅ test_vakansii_page_decides_search_mode_once - ПРОЙДЕН")
+
+
+class ApplicantInteractionTest(VacancyTestDataMixin, TestCase):
+    def setUp(self):
+        self.create_test_data()
+        self.applicant_user = User.objects.create_user(
+            email='applicant@example.com',
+            username='applicantuser',
+            phone='+76666666666',
+            password='testpass123',
+            user_type='applicant'
+        )
+        self.applicant = Applicant.objects.create(
+            user=self.applicant_user,
+            first_name='Иван',
+            last_name='Иванов',
+            birth_date='1990-01-01'
+        )
+        self.vacancies = [self.create_vacancy(f'Вакансия {i}') for i in range(5)]
+        status = StatusResponse.objects.create(status_response_name='Новый')
+        Response.objects.create(applicants=self.applicant, vacancy=self.vacancies[1], status=status)
+        Favorites.objects.create(applicant=self.applicant, vacancy=self.vacancies[2])
+        self.client.force_login(self.applicant_user)
+
+    def test_vakansii_page_marks_responses(self):
+        """Тест отметки откликов на странице вакансий"""
+        response = self.client.get(reverse('vakansi_page'))
+        marked = {v.pk for v in response.context['page_obj'] if v.has_response}
+        self.assertEqual(marked, {self.vacancies[1].pk})
+        print("✅ test_vakansii_page_marks_responses - ПРОЙДЕН")
+
+    def test_queries_do_not_grow_with_page(self):
+        """Тест того, что число запросов не зависит от размера страницы"""
+        with self.assertNumQueries(2):
+            interactions = ApplicantInteractionMap.for_user(self.applicant_user, self.vacancies)
+        self.assertTrue(interactions.is_favorite(self.vacancies[2]))
+        self.assertFalse(interactions.has_applied(self.vacancies[0]))
+        print("✅ test_queries_do_not_grow_with_page - ПРОЙДЕН")
+
+    def test_vacancy_detail_flags(self):
+        """Тест отметок отклика и избранного в детальной вакансии"""
+        response = self.client.get(reverse('vacancy_detail', args=[self.vacancies[2].pk]))
+        self.assertTrue(response.context['is_favorite'])
+        self.assertFalse(response.context['has_response'])
+        print("✅ test_vacancy_detail_flags - ПРОЙДЕН")
+
+
+class VacancyViewCounterTest(VacancyTestDataMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.create_test_data()
+        self.vacancy = self.create_vacancy('Программист Python')
+        self.other_vacancy = self.create_vacancy('Маркетолог')
+
+    def test_repeated_views_are_deduplicated(self):
+        """Тест того, что повторный просмотр посетителя не учитывается"""
+        self.assertTrue(VacancyViewCounter.register_view(self.vacancy.pk, 'ip:1.1.1.1'))
+        self.assertFalse(VacancyViewCounter.register_view(self.vacancy.pk, 'ip:1.1.1.1'))
+        self.assertTrue(VacancyViewCounter.register_view(self.vacancy.pk, 'ip:2.2.2.2'))
+        self.assertEqual(VacancyViewCounter.get_pending(self.vacancy.pk), 2)
+        self.vacancy.refresh_from_db()
+        self.assertEqual(self.vacancy.views, 0)
+        print("✅ test_repeated_views_are_deduplicated - ПРОЙДЕН")
+
+    def test_flush_writes_views_in_one_update(self):
+        """Тест пакетной записи просмотров командой flush_vacancy_views"""
+        for visitor in ('ip:1.1.1.1', 'ip:2.2.2.2', 'ip:3.3.3.3'):
+            VacancyViewCounter.register_view(self.vacancy.pk, visitor)
+        VacancyViewCounter.register_view(self.other_vacancy.pk, 'ip:1.1.1.1')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(VacancyViewCounter.flush(), 2)
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.vacancy.refresh_from_db()
+        self.other_vacancy.refresh_from_db()
+        self.assertEqual((self.vacancy.views, self.other_vacancy.views), (3, 1))
+        self.assertEqual(VacancyViewCounter.get_pending(self.vacancy.pk), 0)
+
+        VacancyViewCounter.register_view(self.vacancy.pk, 'ip:4.4.4.4')
+        # С кэшем в памяти процесса команда без явного флага не запускается
+        with self.assertRaises(CommandError):
+            call_command('flush_vacancy_views', stdout=StringIO())
+        call_command('flush_vacancy_views', '--allow-local-cache', stdout=StringIO())
+        self.vacancy.refresh_from_db()
+        self.assertEqual(self.vacancy.views, 4)
+        print("✅ test_flush_writes_views_in_one_update - ПРОЙДЕН")
+
+    def test_vacancy_detail_counts_view(self):
+        """Тест учета просмотра на странице вакансии"""
+        url = reverse('vacancy_detail', args=[self.vacancy.pk])
+        self.client.get(url)
+        self.client.get(url)
+        self.assertEqual(VacancyViewCounter.get_pending(self.vacancy.pk), 1)
+        print("✅ test_vacancy_detail_counts_view - ПРОЙДЕН")
+
+
+class VacancyDetailCacheTest(VacancyTestDataMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.create_test_data()
+        self.vacancy = self.create_vacancy('Программист Python', description='Разработка сервисов')
+        self.url = reverse('vacancy_detail', args=[self.vacancy.pk])
+
+    def test_anonymous_hit_skips_database(self):
+        """Тест повторного просмотра вакансии без запросов к базе"""
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Разработка сервисов')
+        print("✅ test_anonymous_hit_skips_database - ПРОЙДЕН")
+
+    def test_invalidate_after_edit(self):
+        """Тест сброса кэша после изменения вакансии"""
+        self.client.get(self.url)
+        self.vacancy.position = 'Программист Go'
+        self.vacancy.save()
+        self.assertNotContains(self.client.get(self.url), 'Программист Go')
+
+        VacancyDetailCache.invalidate(self.vacancy)
+        self.assertContains(self.client.get(self.url), 'Программист Go')
+        print("✅ test_invalidate_after_edit - ПРОЙДЕН")
+
+    def test_company_edit_invalidates_cache(self):
+        """Тест сброса кэша страницы вакансии после изменения компании"""
+        self.client.get(self.url)
+        self.company.name = 'Тинькофф'
+        self.company.description = 'Новое описание компании'
+        self.company.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Тинькофф')
+        self.assertContains(response, 'Новое описание компании')
+        print("✅ test_company_edit_invalidates_cache - ПРОЙДЕН")
+
+    def test_archive_view_invalidates_cache(self):
+        """Тест сброса кэша при архивировании вакансии компанией"""
+        StatusVacancies.objects.create(status_vacancies_name='Архивирована')
+        self.client.get(self.url)
+        old_version = cache.get(VacancyDetailCache.VERSION_KEY.format(self.vacancy.pk))
+
+        self.client.force_login(self.company_user)
+        self.client.get(reverse('archive_vacancy', args=[self.vacancy.pk]))
+        self.client.logout()
+
+        self.assertIsNone(cache.get(VacancyDetailCache.VERSION_KEY.format(self.vacancy.pk)))
+        self.client.get(self.url)
+        self.assertNotEqual(cache.get(VacancyDetailCache.VERSION_KEY.format(self.vacancy.pk)), old_version)
+        print("✅ test_archive_view_invalidates_cache - ПРОЙДЕН")
+
+    def test_user_flags_are_not_cached(self):
+        """Тест того, что отметки пользователя не попадают в общий кэш"""
+        self.client.get(self.url)
+        user = User.objects.create_user(
+            email='applicant@example.com',
+            username='applicantuser',
+            phone='+76666666666',
+            password='testpass123',
+            user_type='applicant'
+        )
+        applicant = Applicant.objects.create(user=user, first_name='Иван', last_name='Иванов', birth_date='1990-01-01')
+        Favorites.objects.create(applicant=applicant, vacancy=self.vacancy)
+        self.client.force_login(user)
+        self.assertContains(self.client.get(self.url), 'В избранном')
+        print("✅ test_user_flags_are_not_cached - ПРОЙДЕН")
+
+
+class PlatformCountersTest(VacancyTestDataMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.create_test_data()
+        self.create_vacancy('Программист Python')
+        self.create_vacancy('Маркетолог')
+
+    def test_counters_follow_model_changes(self):
+        """Тест пересчета счетчиков после изменения вакансий"""
+        counters = PlatformCounters.get()
+        self.assertEqual(counters['active_vacancies_count'], 2)
+        self.assertEqual(counters['approved_companies_count'], 1)
+        self.assertEqual(counters['returning_companies_count'], 1)
+
+        self.create_vacancy('Аналитик')
+        self.assertEqual(PlatformCounters.get()['active_vacancies_count'], 3)
+
+        # Сохранение без изменения учитываемых полей снимок не сбрасывает
+        vacancy = Vacancy.objects.get(position='Аналитик')
+        vacancy.description = 'Новое описание'
+        vacancy.save()
+        self.assertIsNotNone(cache.get(PlatformCounters.CACHE_KEY))
+
+        vacancy.status = StatusVacancies.objects.create(status_vacancies_name='Архивирована')
+        vacancy.save()
+        self.assertEqual(PlatformCounters.get()['active_vacancies_count'], 2)
+        print("✅ test_counters_follow_model_changes - ПРОЙДЕН")
+
+    def test_home_page_reads_cached_counters(self):
+        """Тест главной страницы без запросов COUNT"""
+        self.client.get(reverse('home_page'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home_page'))
+        self.assertEqual(response.context['active_vacancies_count'], 2)
+        print("✅ test_home_page_reads_cached_counters - ПРОЙДЕН")
+
+    def test_refresh_command(self):
+        """Тест команды refresh_platform_counters"""
+        archived = StatusVacancies.objects.create(status_vacancies_name='Архивирована')
+        PlatformCounters.get()
+        # update() не вызывает сигналы, счетчики остаются прежними до пересчета
+        Vacancy.objects.update(status=archived)
+        self.assertEqual(PlatformCounters.get()['active_vacancies_count'], 2)
+        call_command('refresh_platform_counters', stdout=StringIO())
+        self.assertEqual(PlatformCounters.get()['active_vacancies_count'], 0)
+        print("✅ test_refresh_command - ПРОЙДЕН")
+
+
+class EmailOutboxTest(TestCase):
+    def test_worker_sends_pending_emails(self):
+        """Тест отправки писем из очереди командой send_outbox_emails"""
+        EmailOutboxService.enqueue('Тема 1', 'Текст', 'first@example.com', '<p>Текст</p>')
+        EmailOutboxService.enqueue('Тема 2', 'Текст', 'second@example.com')
+        self.assertEqual(len(mail.outbox), 0)
+
+        out = StringIO()
+        call_command('send_outbox_emails', stdout=out)
+        self.assertIn('Отправлено писем: 2', out.getvalue())
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['first@example.com', 'second@example.com'])
+        self.assertEqual(EmailOutbox.objects.filter(status=EmailOutbox.STATUS_SENT).count(), 2)
+
+        call_command('send_outbox_emails', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+        print("✅ test_worker_sends_pending_emails - ПРОЙДЕН")
+
+    def test_failed_enqueue_keeps_transaction(self):
+        """Тест: ошибка постановки письма не ломает транзакцию вызывающего кода"""
+        from django.db import DatabaseError, transaction
+
+        with transaction.atomic():
+            with self.assertRaises(DatabaseError):
+                EmailOutboxService.enqueue('Тема', 'Текст', 'x' * 300 + '@example.com')
+            WorkConditions.objects.create(work_conditions_name='Офис')
+        self.assertTrue(WorkConditions.objects.exists())
+        print("✅ test_failed_enqueue_keeps_transaction - ПРОЙДЕН")
+
+    @override_settings(EMAIL_OUTBOX_RETENTION_DAYS=7)
+    def test_sent_emails_are_not_kept(self):
+        """Тест очистки текста отправленных писем и удаления старых строк"""
+        email = EmailOutboxService.enqueue('Тема', 'Текст', 'user@example.com', '<p>Текст</p>')
+        EmailOutboxService.process_batch()
+        email.refresh_from_db()
+        self.assertEqual((email.body, email.html_body), ('', ''))
+
+        EmailOutbox.objects.filter(pk=email.pk).update(sent_at=timezone.now() - timedelta(days=8))
+        self.assertEqual(EmailOutboxService.purge_sent(), 1)
+
+        # Код восстановления идет через очередь и не остается в ней после отправки
+        send_reset_code_email(User(email='reset@example.com', username='reset'), '123456')
+        self.assertEqual(len(mail.outbox), 1)
+        EmailOutboxService.process_batch()
+        self.assertIn('123456', mail.outbox[-1].body)
+        reset = EmailOutbox.objects.get(to_email='reset@example.com')
+        self.assertNotIn('123456', reset.subject + reset.body + reset.html_body)
+        print("✅ test_sent_emails_are_not_kept - ПРОЙДЕН")
+
+    @override_settings(
+        EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+        EMAIL_HOST='127.0.0.1', EMAIL_PORT=1, EMAIL_USE_TLS=False, EMAIL_TIMEOUT=1,
+        EMAIL_OUTBOX_MAX_ATTEMPTS=2, EMAIL_OUTBOX_RETRY_DELAY=60,
+    )
+    def test_failed_send_retried_with_backoff(self):
+        """Тест повтора отправки с задержкой при недоступном SMTP"""
+        email = EmailOutboxService.enqueue('Тема', 'Текст', 'user@example.com')
+
+        self.assertEqual(EmailOutboxService.process_batch(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, EmailOutbox.STATUS_PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, email.created_at)
+        self.assertEqual(EmailOutboxService.process_batch(), (0, 0))
+
+        EmailOutbox.objects.filter(pk=email.pk).update(next_attempt_at=email.created_at)
+        EmailOutboxService.process_batch()
+        email.refresh_from_db()
+        self.assertEqual(email.status, EmailOutbox.STATUS_FAILED)
+        self.assertEqual(email.body, '')
+        print("✅ test_failed_send_retried_with_backoff - ПРОЙДЕН")
+
+
+class EmailRendererTest(TestCase):
+    def test_render_text_and_html(self):
+        """Тест рендеринга текстовой и HTML-версии письма из шаблонов"""
+        text, html = EmailRenderer.render('vacancy_archive', {
+            'company_name': 'ООО <Тест>',
+            'vacancy_title': 'Python Developer',
+            'archive_reason': '',
+            'archived_at': None,
+        })
+        self.assertIn('Уважаемый представитель компании "ООО <Тест>"!', text)
+        self.assertIn('ООО &lt;Тест&gt;', html)
+        self.assertNotIn('Причина архивации', html)
+        self.assertTrue(html.lstrip().startswith('<!DOCTYPE html>'))
+        print("✅ test_render_text_and_html - ПРОЙДЕН")
+
+    def test_render_many_per_recipient(self):
+        """Тест пакетного рендеринга письма для нескольких получателей"""
+        contexts = [
+            {'first_name': name, 'position': 'Python Developer', 'old_status': 'Новый', 'new_status': 'Приглашен'}
+            for name in ('Анна', 'Иван')
+        ]
+        rendered = EmailRenderer.render_many('response_status', contexts)
+        self.assertEqual(len(rendered), 2)
+        self.assertTrue(rendered[0][0].startswith('Здравствуйте, Анна!'))
+        self.assertTrue(rendered[1][0].startswith('Здравствуйте, Иван!'))
+        self.assertEqual(rendered[0][1], '')
+        print("✅ test_render_many_per_recipient - ПРОЙДЕН")
+
+
+class ProfanityMatcherTest(TestCase):
+    def test_detects_obfuscated_words(self):
+        """Тест поиска слов с подменой символов и разбивкой на буквы"""
+        matcher = ProfanityMatcher.default()
+        for text in ('Ты СУКА', 'cука', 'х.у.й', 'блядский', 'what the f u c k', 'sh1t happens'):
+            self.assertTrue(matcher.contains_profanity(text), text)
+        print("✅ test_detects_obfuscated_words - ПРОЙДЕН")
+
+    def test_ignores_words_inside_other_words(self):
+        """Тест отсутствия ложных срабатываний на обычных словах"""
+        matcher = ProfanityMatcher.default()
+        text = 'Ищем ассистента (assistant) на борт корабля, classic Scunthorpe. ' * 100
+        self.assertFalse(matcher.contains_profanity(text))
+        self.assertEqual(list(matcher.iter_matches(text + ' Мразь!')), ['мразь'])
+        print("✅ test_ignores_words_inside_other_words - ПРОЙДЕН")
+
+    def test_short_words_match_whole_word_only(self):
+        """Тест коротких слов, которые не должны совпадать с началом обычных слов"""
+        matcher = ProfanityMatcher.default()
+        for text in ('Бляха на ремне', 'блямба', 'без охулки', 'Ебург'):
+            self.assertFalse(matcher.contains_profanity(text), text)
+        for text in ('Бля, опять', 'ебу', 'уеб', 'уебок', 'охуеть', 'ебаный', 'ебёт'):
+            self.assertTrue(matcher.contains_profanity(text), text)
+        print("✅ test_short_words_match_whole_word_only - ПРОЙДЕН")
+
+
+class VacancyRemoderationTest(VacancyTestDataMixin, TestCase):
+    def setUp(self):
+        self.create_test_data()
+        self.admin = User.objects.create_user(
+            username='moderator@example.com', email='moderator@example.com',
+            password='pass', user_type='adminsite'
+        )
+        self.clean = self.create_vacancy('Python разработчик')
+        self.flagged = self.create_vacancy('Менеджер', description='Начальник - СуКа, но платят хорошо')
+
+    def test_flagged_vacancies_get_admin_complaint(self):
+        """Тест создания жалобы администратора на вакансию с недопустимыми словами"""
+        users = User.objects.count()
+        out = StringIO()
+        call_command('remoderate_vacancies', workers=0, batch_size=1, stdout=out)
+        self.assertIn('Проверено вакансий: 2', out.getvalue())
+        self.assertIn('новых жалоб: 1', out.getvalue())
+
+        complaint = Complaint.objects.get()
+        self.assertEqual(complaint.vacancy, self.flagged)
+        self.assertEqual(complaint.complaint_type, 'inappropriate')
+        self.assertIn('Описание вакансии', complaint.description)
+        self.assertEqual(complaint.complainant, self.admin)
+        self.assertEqual(User.objects.count(), users)
+
+        out = StringIO()
+        call_command('remoderate_vacancies', workers=0, stdout=out)
+        self.assertIn('новых жалоб: 0', out.getvalue())
+        self.assertEqual(Complaint.objects.count(), 1)
+        print("✅ test_flagged_vacancies_get_admin_complaint - ПРОЙДЕН")
+
+    def test_counts_only_inserted_complaints(self):
+        """Тест подсчета жалоб по вставленным строкам, а не по разнице COUNT"""
+        other = self.create_vacancy('Курьер', description='Полный пиздец, а не работа')
+        Complaint.objects.create(vacancy=other, complainant=self.admin, complaint_type='spam')
+        out = StringIO()
+        call_command('remoderate_vacancies', workers=0, stdout=out)
+        self.assertIn('Найдено вакансий с недопустимыми словами: 2, новых жалоб: 1', out.getvalue())
+        self.assertEqual(Complaint.objects.get(vacancy=other).complaint_type, 'spam')
+        print("✅ test_counts_only_inserted_complaints - ПРОЙДЕН")
+
+    def test_requires_existing_admin(self):
+        """Тест остановки команды без администратора"""
+        with self.assertRaises(CommandError):
+            call_command('remoderate_vacancies', workers=0, complainant='missing@example.com', stdout=StringIO())
+        self.admin.is_active = False
+        self.admin.save()
+        with self.assertRaises(CommandError):
+            call_command('remoderate_vacancies', workers=0, stdout=StringIO())
+        self.assertFalse(Complaint.objects.exists())
+        print("✅ test_requires_existing_admin - ПРОЙДЕН")
+
+    def test_process_pool(self):
+        """Тест проверки вакансий в пуле процессов"""
+        out = StringIO()
+        call_command('remoderate_vacancies', workers=2, batch_size=1, stdout=out)
+        self.assertIn('новых жалоб: 1', out.getvalue())
+        print("✅ test_process_pool - ПРОЙДЕН")
+
+
+class StatisticsRollupTest(VacancyTestDataMixin, TestCase):
+    def setUp(self):
+        self.create_test_data()
+        self.create_vacancy('Программист Python')
+        self.marketer = self.create_vacancy('Маркетолог', category='Маркетинг')
+
+    def rollup_counts(self):
+        return {
+            (row.entity, row.day, row.key): row.count
+            for row in DailyRollup.objects.exclude(count=0)
+        }
+
+    def test_rollups_follow_model_changes(self):
+        """Тест инкрементального обновления итогов при создании, изменении и удалении"""
+        self.assertEqual(dict(StatisticsRollup.distribution('vacancy')), {'IT': 1, 'Маркетинг': 1})
+        self.assertEqual(dict(StatisticsRollup.distribution('company')), {Company.STATUS_APPROVED: 1})
+
+        self.marketer.category = 'IT'
+        self.marketer.save()
+        self.company.status = Company.STATUS_REJECTED
+        self.company.save(update_fields=['status'])
+        self.assertEqual(dict(StatisticsRollup.distribution('vacancy')), {'IT': 2})
+        self.assertEqual(dict(StatisticsRollup.distribution('company')), {Company.STATUS_REJECTED: 1})
+
+        self.marketer.delete()
+        self.assertEqual(dict(StatisticsRollup.distribution('vacancy')), {'IT': 1})
+
+        incremental = self.rollup_counts()
+        StatisticsRollup.rebuild()
+        self.assertEqual(self.rollup_counts(), incremental)
+        print("✅ test_rollups_follow_model_changes - ПРОЙДЕН")
+
+    def test_main_statistics_from_rollups(self):
+        """Тест основной статистики по итогам одним запросом к daily_rollups"""
+        from admin_panel.statistics_service import StatisticsService
+
+        today = StatisticsRollup.day_of(None).isoformat()
+        with self.assertNumQueries(3):
+            stats = StatisticsService.get_main_statistics(today, today)
+        self.assertEqual(stats['total_vacancies'], 2)
+        self.assertEqual(stats['total_companies'], 1)
+        self.assertEqual(stats['active_companies'], 1)
+        self.assertEqual(stats['new_users_week'], 1)
+        self.assertEqual(stats['total_complaints'], 0)
+
+        stats = StatisticsService.get_main_statistics('2000-01-01', '2000-01-31')
+        self.assertEqual(stats['total_vacancies'], 0)
+        print("✅ test_main_statistics_from_rollups - ПРОЙДЕН")
+
+
+class TimeSeriesTest(VacancyTestDataMixin, TestCase):
+    def setUp(self):
+        self.create_test_data()
+        moments = [
+            datetime(2025, 3, 3, 10, 0),
+            datetime(2025, 3, 4, 0, 30),  # 3 марта по UTC
+            datetime(2025, 3, 12, 18, 0),
+        ]
+        for index, moment in enumerate(moments):
+            vacancy = self.create_vacancy(f'Вакансия {index}')
+            Vacancy.objects.filter(pk=vacancy.pk).update(created_date=timezone.make_aware(moment))
+
+    def test_series_fills_missing_buckets(self):
+        """Тест группировки по дням, неделям и месяцам с нулями в пропусках"""
+        queryset = Vacancy.objects.all()
+        with self.assertNumQueries(1):
+            days = TimeSeries.series(queryset, 'created_date', 'day', date(2025, 3, 3), date(2025, 3, 5))
+        self.assertEqual(days, [(date(2025, 3, 3), 1), (date(2025, 3, 4), 1), (date(2025, 3, 5), 0)])
+
+        weeks = TimeSeries.series(queryset, 'created_date', 'week', date(2025, 3, 1), date(2025, 3, 16))
+        self.assertEqual(weeks, [(date(2025, 2, 24), 0), (date(2025, 3, 3), 2), (date(2025, 3, 10), 1)])
+
+        self.assertEqual(TimeSeries.series(queryset, 'created_date', 'month'), [(date(2025, 3, 1), 3)])
+        self.assertEqual(len(TimeSeries.series(queryset, 'created_date')), 10)
+        print("✅ test_series_fills_missing_buckets - ПРОЙДЕН")
+
+
+class ImportTimeTest(SimpleTestCase):
+    def test_startup_does_not_load_export_libraries(self):
+        """Тест запуска проекта без matplotlib, reportlab и openpyxl"""
+        out = StringIO()
+        # Бюджет с запасом для медленных машин, главное - отсутствие тяжелых библиотек
+        call_command('check_import_time', budget_ms=5000, stdout=out)
+        self.assertIn('Импорт hhproject.urls', out.getvalue())
+        print("✅ test_startup_does_not_load_export_libraries - ПРОЙДЕН")
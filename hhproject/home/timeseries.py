@@ -0,0 +1,102 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, DateField, DateTimeField
+from django.db.models.functions import Trunc, TruncDate
+from django.utils import timezone
+
+
+class TimeSeries:
+    """
+    Временные ряды по дате любой модели: группировка по дню, неделе или
+    месяцу одним GROUP BY и заполнение пропущенных интервалов нулями.
+    Интервал обозначается датой его начала (для недели - понедельник, для
+    месяца - первое число) в часовом поясе проекта.
+    """
+
+    PERIODS = ('day', 'week', 'month')
+
+    @staticmethod
+    def bucket_start(day, period='day'):
+        """Начало интервала, в который попадает день"""
+        if period == 'week':
+            return day - timedelta(days=day.weekday())
+        if period == 'month':
+            return day.replace(day=1)
+        return day
+
+    @staticmethod
+    def next_bucket(day, period='day'):
+        if period == 'week':
+            return day + timedelta(days=7)
+        if period == 'month':
+            return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return day + timedelta(days=1)
+
+    @staticmethod
+    def buckets(start_date, end_date, period='day'):
+        """Начала всех интервалов от start_date до end_date включительно"""
+        bucket = TimeSeries.bucket_start(start_date, period)
+        result = []
+        while bucket <= end_date:
+            result.append(bucket)
+            bucket = TimeSeries.next_bucket(bucket, period)
+        return result
+
+    @staticmethod
+    def _is_datetime(queryset, field):
+        return isinstance(queryset.model._meta.get_field(field), DateTimeField)
+
+    @staticmethod
+    def _truncate(queryset, field, period):
+        if period not in TimeSeries.PERIODS:
+            raise ValueError(f'Неизвестный интервал: {period}')
+        if period == 'day' and TimeSeries._is_datetime(queryset, field):
+            return TruncDate(field)
+        return Trunc(field, period, output_field=DateField())
+
+    @staticmethod
+    def filter_period(queryset, field, start_date=None, end_date=None):
+        """
+        Фильтр по дням start_date..end_date. Для DateTimeField границы
+        переводятся в моменты времени, чтобы условие использовало индекс
+        по полю, а не приведение к дате каждой строки.
+        """
+        if TimeSeries._is_datetime(queryset, field):
+            if start_date:
+                start = timezone.make_aware(datetime.combine(start_date, time.min))
+                queryset = queryset.filter(**{f'{field}__gte': start})
+            if end_date:
+                end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+                queryset = queryset.filter(**{f'{field}__lt': end})
+            return queryset
+        if start_date:
+            queryset = queryset.filter(**{f'{field}__gte': start_date})
+        if end_date:
+            queryset = queryset.filter(**{f'{field}__lte': end_date})
+        return queryset
+
+    @staticmethod
+    def counts(queryset, field, period='day', start_date=None, end_date=None, value=None):
+        """
+        {начало интервала: значение} одним запросом. По умолчанию значение -
+        число строк, для готовых итогов можно передать, например, Sum('count').
+        """
+        queryset = TimeSeries.filter_period(queryset, field, start_date, end_date)
+        rows = queryset.annotate(bucket=TimeSeries._truncate(queryset, field, period)).values(
+            'bucket'
+        ).annotate(value=value if value is not None else Count('pk')).order_by()
+        return {row['bucket']: row['value'] for row in rows}
+
+    @staticmethod
+    def series(queryset, field, period='day', start_date=None, end_date=None, value=None):
+        """
+        [(начало интервала, значение), ...] по порядку, пропущенные интервалы
+        заполнены нулями. Без границ ряд строится от первого до последнего
+        интервала с данными.
+        """
+        counts = TimeSeries.counts(queryset, field, period, start_date, end_date, value)
+        if not counts and not (start_date and end_date):
+            return []
+        start = start_date or min(counts)
+        end = end_date or max(counts)
+        return [(bucket, counts.get(bucket, 0)) for bucket in TimeSeries.buckets(start, end, period)]
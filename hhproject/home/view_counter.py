@@ -0,0 +1,146 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from .models import Vacancy
+
+
+class VacancyViewCounter:
+    """
+    Буферизованный счетчик просмотров вакансий.
+    Просмотры накапливаются в кэше и периодически записываются в
+    Vacancy.views одним запросом UPDATE ... FROM (VALUES ...), вместо
+    блокировки строки вакансии на каждый просмотр.
+    """
+
+    KEY_PREFIX = 'vacancy_views'
+
+    # Сколько вакансий записывать одним запросом UPDATE
+    FLUSH_BATCH_SIZE = 500
+
+    # Время жизни блокировки сброса на случай падения процесса
+    FLUSH_LOCK_TIMEOUT = 60
+
+    @staticmethod
+    def _key(*parts):
+        return ':'.join([VacancyViewCounter.KEY_PREFIX, *map(str, parts)])
+
+    @staticmethod
+    def _register_pending(vacancy_id):
+        """Запись вакансии в журнал ожидающих сброса"""
+        seq_key = VacancyViewCounter._key('seq')
+        cache.add(seq_key, 0, None)
+        slot = cache.incr(seq_key)
+        cache.set(VacancyViewCounter._key('slot', slot), vacancy_id, None)
+
+    @staticmethod
+    def register_view(vacancy_id, visitor):
+        """
+        Учет просмотра вакансии посетителем (сессия, пользователь или IP).
+        Повторные просмотры того же посетителя в пределах
+        VACANCY_VIEWS_DEDUPE_WINDOW не учитываются. Возвращает True,
+        если просмотр засчитан.
+        """
+        seen_key = VacancyViewCounter._key('seen', vacancy_id, visitor)
+        if not cache.add(seen_key, 1, settings.VACANCY_VIEWS_DEDUPE_WINDOW):
+            return False
+
+        count_key = VacancyViewCounter._key('count', vacancy_id)
+        cache.add(count_key, 0, None)
+        if cache.incr(count_key) == 1:
+            VacancyViewCounter._register_pending(vacancy_id)
+
+        VacancyViewCounter.flush_if_due()
+        return True
+
+    @staticmethod
+    def get_pending(vacancy_id):
+        """Число просмотров, еще не записанных в базу"""
+        return cache.get(VacancyViewCounter._key('count', vacancy_id), 0)
+
+    @staticmethod
+    def flush_if_due():
+        """Сброс, если с прошлого прошло VACANCY_VIEWS_FLUSH_INTERVAL секунд"""
+        last_flush_key = VacancyViewCounter._key('last_flush')
+        last_flush = cache.get(last_flush_key)
+        now = time.time()
+        if last_flush is None:
+            cache.add(last_flush_key, now, None)
+        elif now - last_flush >= settings.VACANCY_VIEWS_FLUSH_INTERVAL:
+            VacancyViewCounter.flush()
+
+    @staticmethod
+    def _collect_pending():
+        """Забирает из кэша накопленные просмотры: {vacancy_id: количество}"""
+        seq = cache.get(VacancyViewCounter._key('seq'), 0)
+        flushed_key = VacancyViewCounter._key('flushed')
+        flushed = cache.get(flushed_key, 0)
+        if seq <= flushed:
+            return {}
+
+        slot_keys = [VacancyViewCounter._key('slot', slot) for slot in range(flushed + 1, seq + 1)]
+        vacancy_ids = set(cache.get_many(slot_keys).values())
+        cache.delete_many(slot_keys)
+        cache.set(flushed_key, seq, None)
+
+        deltas = {}
+        for vacancy_id in vacancy_ids:
+            count_key = VacancyViewCounter._key('count', vacancy_id)
+            count = cache.get(count_key, 0)
+            if not count:
+                continue
+            deltas[vacancy_id] = count
+            # Просмотры, пришедшие между get и decr, остаются до следующего сброса
+            if cache.decr(count_key, count) > 0:
+                VacancyViewCounter._register_pending(vacancy_id)
+        return deltas
+
+    @staticmethod
+    def _write(deltas):
+        """Пакетное увеличение Vacancy.views"""
+        items = list(deltas.items())
+        table = connection.ops.quote_name(Vacancy._meta.db_table)
+        with transaction.atomic(), connection.cursor() as cursor:
+            for start in range(0, len(items), VacancyViewCounter.FLUSH_BATCH_SIZE):
+                batch = items[start:start + VacancyViewCounter.FLUSH_BATCH_SIZE]
+                values = ', '.join(['(%s::bigint, %s::integer)'] * len(batch))
+                params = [value for item in batch for value in item]
+                cursor.execute(
+                    f'UPDATE {table} AS v SET views = v.views + d.delta '
+                    f'FROM (VALUES {values}) AS d(id, delta) '
+                    f'WHERE v.id = d.id',
+                    params
+                )
+
+    @staticmethod
+    def _restore(deltas):
+        """Возврат просмотров в кэш, если запись в базу не удалась"""
+        for vacancy_id, count in deltas.items():
+            count_key = VacancyViewCounter._key('count', vacancy_id)
+            cache.add(count_key, 0, None)
+            if cache.incr(count_key, count) == count:
+                VacancyViewCounter._register_pending(vacancy_id)
+
+    @staticmethod
+    def flush():
+        """
+        Запись накопленных просмотров в базу. Возвращает число
+        вакансий, у которых обновлен счетчик.
+        """
+        lock_key = VacancyViewCounter._key('flush_lock')
+        if not cache.add(lock_key, 1, VacancyViewCounter.FLUSH_LOCK_TIMEOUT):
+            return 0
+        try:
+            cache.set(VacancyViewCounter._key('last_flush'), time.time(), None)
+            deltas = VacancyViewCounter._collect_pending()
+            if deltas:
+                try:
+                    VacancyViewCounter._write(deltas)
+                except Exception:
+                    VacancyViewCounter._restore(deltas)
+                    raise
+            return len(deltas)
+        finally:
+            cache.delete(lock_key)
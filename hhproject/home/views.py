@@ -1,5 +1,5 @@
 import random
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 import requests
 from .models import *
 from .forms import *
@@ -8,13 +8,20 @@ from django.contrib.auth import login, authenticate, logout, get_user_model
 from django.contrib.auth.decorators import login_required
 from django.views.generic import CreateView
 from django.db.models import Q
-from django.core.paginator import Paginator
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
-from django.core.mail import send_mail
 from django.conf import settings
+from django.utils.functional import SimpleLazyObject
 from django.contrib import messages
+from .counters import PlatformCounters
+from .detail_cache import VacancyDetailCache
+from .email_outbox import EmailOutboxService
+from .emails import EmailRenderer
+from .facets import VacancyFacetService
+from .interactions import ApplicantInteractionMap
+from .search import VacancySearchService
+from .view_counter import VacancyViewCounter
 
 def get_client_ip(request):
     """Получение IP-адреса клиента"""
@@ -64,25 +71,13 @@ def home_page(request):
     """
     Отображение главной страницы со статистикой
     """
-    active_vacancies_count = Vacancy.objects.filter(
-        status__status_vacancies_name='Активна'
-    ).count()
-    
-    approved_companies_count = Company.objects.filter(
-        status=Company.STATUS_APPROVED
-    ).count()
-    
-    applicants_count = Applicant.objects.count()
-    
-    successful_responses_count = Response.objects.filter(
-        status__status_response_name='Принято'
-    ).count()
+    counters = PlatformCounters.get()
     
     context = {
-        'active_vacancies_count': active_vacancies_count,
-        'approved_companies_count': approved_companies_count,
-        'applicants_count': applicants_count,
-        'successful_responses_count': successful_responses_count,
+        'active_vacancies_count': counters['active_vacancies_count'],
+        'approved_companies_count': counters['approved_companies_count'],
+        'applicants_count': counters['applicants_count'],
+        'successful_responses_count': counters['successful_responses_count'],
     }
     
     return render(request, 'home.html', context)
@@ -224,56 +219,28 @@ def vakansii_page(request):
         'status'
     ).filter(status__status_vacancies_name='Активна')
     
-    search_query = request.GET.get('search', '')
-    if search_query:
-        vacancies = vacancies.filter(
-            Q(position__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(company__name__icontains=search_query)
-        )
+    # Режим поиска выбирается один раз по отфильтрованной выдаче,
+    # чтобы список и счетчики фильтров совпадали
+    filtered = VacancySearchService.apply_sidebar_filters(vacancies, request.GET)
+    search_mode, extra_ids = VacancySearchService.resolve_search_mode(filtered, request.GET)
+
+    # Счетчики фильтров считаются по выдаче поиска одним запросом
+    facets = VacancyFacetService.get_facets(
+        VacancySearchService.apply_search_params(vacancies, request.GET, search_mode, extra_ids),
+        VacancySearchService.get_filter_conditions(request.GET)
+    )
+    vacancies = VacancySearchService.apply_search_params(filtered, request.GET, search_mode, extra_ids)
+    
+    sort_by = VacancySearchService.get_sort(request.GET)
+    page_obj = VacancySearchService.paginate(vacancies, sort_by, request.GET, 10)
     
-    employment_filters = request.GET.getlist('employment')
-    if employment_filters:
-        vacancies = vacancies.filter(work_conditions__work_conditions_name__in=employment_filters)
-    
-    experience_filters = request.GET.getlist('experience')
-    if experience_filters:
-        vacancies = vacancies.filter(experience__in=experience_filters)
-    
-    salary_from = request.GET.get('salary_from')
-    salary_to = request.GET.get('salary_to')
-    if salary_from:
-        vacancies = vacancies.filter(salary_min__gte=salary_from)
-    if salary_to:
-        vacancies = vacancies.filter(salary_max__lte=salary_to)
-    
-    sort_by = request.GET.get('sort', 'newest')
-    if sort_by == 'salary_high':
-        vacancies = vacancies.order_by('-salary_max')
-    elif sort_by == 'salary_low':
-        vacancies = vacancies.order_by('salary_min')
-    else: 
-        vacancies = vacancies.order_by('-created_date')
-    
-    paginator = Paginator(vacancies, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    work_conditions = WorkConditions.objects.all()
+    work_conditions = list(WorkConditions.objects.all())
+    for condition in work_conditions:
+        condition.facet_count = facets['work_conditions'].get(condition.pk, 0)
     selected_employments = request.GET.getlist('employment')
     selected_experiences = request.GET.getlist('experience')
     
-    if request.user.is_authenticated and request.user.user_type == 'applicant':
-        try:
-            applicant = Applicant.objects.get(user=request.user)
-            for vacancy in page_obj.object_list:
-                vacancy.has_response = vacancy.response_set.filter(applicants=applicant).exists()
-        except Applicant.DoesNotExist:
-            for vacancy in page_obj.object_list:
-                vacancy.has_response = False
-    else:
-        for vacancy in page_obj.object_list:
-            vacancy.has_response = False
+    ApplicantInteractionMap.for_user(request.user, page_obj.object_list).annotate(page_obj.object_list)
     
     context = {
         'page_obj': page_obj,
@@ -282,6 +249,9 @@ def vakansii_page(request):
         'selected_experiences': selected_experiences,
         'salary_from': request.GET.get('salary_from', ''),
         'salary_to': request.GET.get('salary_to', ''),
+        'current_sort': sort_by,
+        'filter_options': VacancyFacetService.get_filter_options(facets, request.GET),
+        'salary_buckets': facets['salary'],
     }
     return render(request, 'vakans.html', context)
 
@@ -289,9 +259,23 @@ def vacancy_detail(request, vacancy_id):
     """
     Детальное отображение вакансии
     """
-    vacancy = get_object_or_404(Vacancy.objects.select_related('company', 'work_conditions', 'status'), id=vacancy_id)
-    vacancy.views += 1
-    vacancy.save(update_fields=['views'])
+    vacancy_version = VacancyDetailCache.get_version(vacancy_id)
+    if vacancy_version is None:
+        raise Http404('Вакансия не найдена')
+    
+    # Вакансия загружается только при промахе кэша фрагментов или для лога
+    vacancy = SimpleLazyObject(lambda: get_object_or_404(
+        Vacancy.objects.select_related('company', 'work_conditions', 'status'), id=vacancy_id
+    ))
+    
+    # Просмотр учитывается в буфере и записывается в базу пакетно
+    if request.user.is_authenticated:
+        visitor = f'user:{request.user.pk}'
+    elif request.session.session_key:
+        visitor = f'session:{request.session.session_key}'
+    else:
+        visitor = f'ip:{get_client_ip(request)}'
+    VacancyViewCounter.register_view(vacancy_id, visitor)
     
     # Логирование просмотра вакансии
     if request.user.is_authenticated:
@@ -305,21 +289,15 @@ def vacancy_detail(request, vacancy_id):
             request=request
         )
     
-    is_favorite = False
-    has_response = False
-    
-    if request.user.is_authenticated and request.user.user_type == 'applicant':
-        try:
-            applicant = Applicant.objects.get(user=request.user)
-            is_favorite = vacancy.favorites_set.filter(applicant=applicant).exists()
-            has_response = vacancy.response_set.filter(applicants=applicant).exists()
-        except Applicant.DoesNotExist:
-            pass 
+    interactions = ApplicantInteractionMap.for_user(request.user, [vacancy_id])
     
     context = {
         'vacancy': vacancy,
-        'is_favorite': is_favorite,
-        'has_response': has_response,
+        'vacancy_id': vacancy_id,
+        'vacancy_version': vacancy_version,
+        'cache_timeout': settings.VACANCY_DETAIL_CACHE_TIMEOUT,
+        'is_favorite': interactions.is_favorite(vacancy_id),
+        'has_response': interactions.has_applied(vacancy_id),
     }
     return render(request, 'vacancy_detail.html', context)
 
@@ -647,138 +625,17 @@ def send_reset_code_email(user, code):
     first_name = user.first_name or 'Пользователь'
     
     try:
-        subject = f'Код восстановления пароля: {code}'
-        
-        html_message = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <style>
-                body {{
-                    font-family: 'Inter', 'Arial', sans-serif;
-                    line-height: 1.6;
-                    color: #1e293b;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 0;
-                    background: linear-gradient(135deg, #2563eb 0%, #1e293b 100%);
-                }}
-                .container {{
-                    background: white;
-                    margin: 20px;
-                    border-radius: 20px;
-                    overflow: hidden;
-                    box-shadow: 0 15px 35px rgba(0, 0, 0, 0.2);
-                }}
-                .header {{
-                    background: linear-gradient(135deg, #2563eb 0%, #1e293b 100%);
-                    color: white;
-                    padding: 40px 30px;
-                    text-align: center;
-                }}
-                .header h1 {{
-                    margin: 0;
-                    font-size: 28px;
-                    font-weight: 700;
-                }}
-                .content {{
-                    padding: 40px 30px;
-                }}
-                .code-section {{
-                    text-align: center;
-                    margin: 30px 0;
-                }}
-                .code {{
-                    background: linear-gradient(45deg, #2563eb, #1e40af);
-                    color: white;
-                    font-size: 32px;
-                    font-weight: bold;
-                    padding: 20px;
-                    border-radius: 15px;
-                    letter-spacing: 8px;
-                    margin: 20px 0;
-                    display: inline-block;
-                    min-width: 200px;
-                }}
-                .security-note {{
-                    background: rgba(245, 158, 11, 0.1);
-                    border: 1px solid rgba(245, 158, 11, 0.3);
-                    border-radius: 10px;
-                    padding: 15px;
-                    margin: 20px 0;
-                    text-align: center;
-                    font-size: 14px;
-                    color: #92400e;
-                }}
-                .footer {{
-                    background: #f1f5f9;
-                    padding: 30px;
-                    text-align: center;
-                    border-top: 1px solid #e2e8f0;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>HR-Lab</h1>
-                    <p>Восстановление пароля</p>
-                </div>
-                
-                <div class="content">
-                    <h2 style="color: #1e293b; text-align: center;">Здравствуйте, {first_name}!</h2>
-                    <p style="color: #64748b; text-align: center;">
-                        Для восстановления пароля используйте следующий код:
-                    </p>
-                    
-                    <div class="code-section">
-                        <div class="code">{code}</div>
-                        <p style="color: #64748b; font-size: 14px;">
-                            Код действителен в течение 10 минут
-                        </p>
-                    </div>
-                    
-                    <div class="security-note">
-                        ⚠️ <strong>Никому не сообщайте этот код!</strong><br>
-                        Если вы не запрашивали восстановление пароля, проигнорируйте это письмо.
-                    </div>
-                </div>
-                
-                <div class="footer">
-                    <p><strong>С уважением, команда HR-Lab</strong></p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        plain_message = f"""
-        Здравствуйте, {first_name}!
-
-        Код для восстановления пароля: {code}
-
-        Код действителен в течение 10 минут.
-
-        ⚠️ Никому не сообщайте этот код!
-
-        Если вы не запрашивали восстановление пароля, проигнорируйте это письмо.
-
-        ---
-        С уважением,
-        Команда HR-Lab
-        """
+        # Код только в тексте письма: тема остается в очереди после отправки
+        subject = 'Код восстановления пароля'
         
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user_email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+        plain_message, html_message = EmailRenderer.render('reset_code', {
+            'first_name': first_name,
+            'code': code,
+        })
+        # Текст письма с кодом стирается из очереди после отправки
+        EmailOutboxService.enqueue(subject, plain_message, user_email, html_message)
         
-        print(f"✅ [EMAIL] Код восстановления отправлен: {user_email} - {code}")
+        print(f"✅ [EMAIL] Код восстановления поставлен в очередь: {user_email}")
         return True
         
     except Exception as e: